@@ -1,5 +1,9 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, stream_with_context
 from flask_cors import CORS
+import csv
+import io
+import json
+import math
 import sys
 import os
 
@@ -7,10 +11,30 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database.db_manager import db_manager
+from database.rule_snapshot import RuleSnapshotStore
+from database.simulation_export import FORMATOS, exportar
 
 app = Flask(__name__)
 CORS(app)  # Permitir requisições do frontend
 
+# Campos obrigatórios de uma simulação
+CAMPOS_SIMULACAO = ['estado_id', 'distribuidor_id', 'perfil_consumidor', 'kwh_consumido']
+
+# Quantidade máxima de linhas aceitas em /api/simular/lote
+MAX_ITENS_LOTE = 50000
+
+# Tamanho máximo de página em /api/simulacoes
+MAX_LIMITE_SIMULACOES = 1000
+
+# Histórico de simulações gravado em segundo plano (opcional); com
+# SINERGIA_WRITE_BEHIND_FSYNC=1 o spill sobrevive também a quedas do sistema
+if os.environ.get('SINERGIA_WRITE_BEHIND') == '1':
+    db_manager.ativar_write_behind(sincronizar=os.environ.get('SINERGIA_WRITE_BEHIND_FSYNC') == '1')
+
+# Regras de simulação mantidas em memória (carregadas uma vez por processo)
+regras_store = RuleSnapshotStore(db_manager)
+regras_store.recarregar()
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Endpoint para verificar se a API está funcionando"""
@@ -79,6 +103,55 @@ def get_regras_distribuidor(distribuidor_id):
             'error': str(e)
         }), 500
 
+@app.route('/api/cotacao/<distribuidor_id>', methods=['GET'])
+def cotar_distribuidora(distribuidor_id):
+    """Cotação por faixa e tipo de bônus (?kwh=350&tipo_bonus=B) pela tabela pré-calculada"""
+    try:
+        try:
+            kwh_consumido = float(request.args['kwh'])
+            if not math.isfinite(kwh_consumido) or kwh_consumido < 0:
+                raise ValueError
+        except (KeyError, ValueError):
+            return jsonify({
+                'success': False,
+                'error': 'Informe kwh como um número não negativo'
+            }), 400
+
+        snapshot = regras_store.snapshot
+
+        try:
+            tipo_bonus = snapshot.buscar_tipo_bonus(request.args.get('tipo_bonus', ''))
+        except ValueError:
+            tipo_bonus = None
+        if not tipo_bonus:
+            return jsonify({
+                'success': False,
+                'error': 'Tipo de bônus não encontrado'
+            }), 400
+
+        cotacao = snapshot.cotar(int(distribuidor_id), kwh_consumido, tipo_bonus['id'])
+        if cotacao is None:
+            return jsonify({
+                'success': False,
+                'error': 'Distribuidora não encontrada'
+            }), 404
+
+        return jsonify({
+            'success': True,
+            'data': {
+                'distribuidora_id': int(distribuidor_id),
+                'tipo_bonus': tipo_bonus['codigo'],
+                'consumo_kwh': kwh_consumido,
+                **cotacao._asdict()
+            }
+        })
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @app.route('/api/simular', methods=['POST'])
 def simular_desconto():
     """Simula desconto baseado nos parâmetros fornecidos"""
@@ -86,8 +159,7 @@ def simular_desconto():
         data = request.get_json()
         
         # Validar dados obrigatórios
-        required_fields = ['estado_id', 'distribuidor_id', 'perfil_consumidor', 'kwh_consumido']
-        for field in required_fields:
+        for field in CAMPOS_SIMULACAO:
             if field not in data:
                 return jsonify({
                     'success': False,
@@ -99,8 +171,11 @@ def simular_desconto():
         perfil_consumidor = data['perfil_consumidor']
         kwh_consumido = float(data['kwh_consumido'])
         
+        # Todas as leituras vêm do snapshot em memória
+        snapshot = regras_store.snapshot
+        
         # Buscar informações da distribuidora
-        distribuidora = db_manager.get_distributor_by_id(distribuidor_id)
+        distribuidora = snapshot.get_distributor_by_id(distribuidor_id)
         if not distribuidora:
             return jsonify({
                 'success': False,
@@ -108,7 +183,7 @@ def simular_desconto():
             }), 404
         
         # Buscar regras de desconto
-        regras = db_manager.get_discount_rules_by_distributor(distribuidor_id)
+        regras = snapshot.get_discount_rules_by_distributor(distribuidor_id)
         
         # Calcular desconto
         resultado_simulacao = calcular_desconto(
@@ -135,6 +210,116 @@ def simular_desconto():
             'error': str(e)
         }), 500
 
+def ler_itens_lote():
+    """Lê os itens do lote: JSON (lista ou {'simulacoes': [...]}) ou arquivo CSV/JSONL"""
+    arquivo = request.files.get('arquivo')
+    if arquivo is not None:
+        conteudo = arquivo.read().decode('utf-8-sig')
+        nome = (arquivo.filename or '').lower()
+        if nome.endswith('.jsonl') or nome.endswith('.ndjson'):
+            return [json.loads(linha) for linha in conteudo.splitlines() if linha.strip()]
+        return list(csv.DictReader(io.StringIO(conteudo)))
+    
+    data = request.get_json()
+    if isinstance(data, dict):
+        data = data.get('simulacoes')
+    if not isinstance(data, list):
+        raise ValueError('Envie uma lista de simulações ou um arquivo CSV/JSONL no campo "arquivo"')
+    return data
+
+@app.route('/api/simular/lote', methods=['POST'])
+def simular_desconto_lote():
+    """Simula um lote de contas contra um único snapshot de regras"""
+    try:
+        try:
+            itens = ler_itens_lote()
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        
+        if len(itens) > MAX_ITENS_LOTE:
+            return jsonify({
+                'success': False,
+                'error': f'Lote excede o limite de {MAX_ITENS_LOTE} itens'
+            }), 400
+        
+        # O mesmo snapshot vale para o lote inteiro
+        snapshot = regras_store.snapshot
+        
+        resultados = []
+        registros = []  # (posição no resultado, linha para simulacoes)
+        for item in itens:
+            faltando = [field for field in CAMPOS_SIMULACAO if not isinstance(item, dict) or item.get(field) in (None, '')]
+            if faltando:
+                resultados.append({
+                    'success': False,
+                    'error': f'Campo obrigatório ausente: {faltando[0]}'
+                })
+                continue
+            
+            try:
+                kwh_consumido = float(item['kwh_consumido'])
+                distribuidor_id = int(item['distribuidor_id'])
+                # nan/inf ou negativo derrubariam o lote inteiro no INSERT
+                if not math.isfinite(kwh_consumido) or kwh_consumido < 0:
+                    raise ValueError
+            except (TypeError, ValueError):
+                resultados.append({
+                    'success': False,
+                    'error': 'Valor inválido para distribuidor_id ou kwh_consumido'
+                })
+                continue
+            
+            if not isinstance(item['perfil_consumidor'], str):
+                resultados.append({
+                    'success': False,
+                    'error': 'Valor inválido para perfil_consumidor'
+                })
+                continue
+            
+            distribuidora = snapshot.get_distributor_by_id(distribuidor_id)
+            if not distribuidora:
+                resultados.append({
+                    'success': False,
+                    'error': 'Distribuidora não encontrada'
+                })
+                continue
+            
+            regras = snapshot.get_discount_rules_by_distributor(distribuidor_id)
+            resultado_simulacao = calcular_desconto(
+                distribuidora, regras, item['perfil_consumidor'], kwh_consumido
+            )
+            
+            registros.append((len(resultados), (
+                distribuidor_id, kwh_consumido,
+                resultado_simulacao['desconto_percentual'],
+                resultado_simulacao['valor_desconto']
+            )))
+            resultados.append({
+                'success': True,
+                'data': resultado_simulacao
+            })
+        
+        # Todas as simulações do lote em uma única transação
+        ids = db_manager.create_simulations_batch([linha for _, linha in registros])
+        for (posicao, _), simulacao_id in zip(registros, ids):
+            resultados[posicao]['data']['simulacao_id'] = simulacao_id
+        
+        return jsonify({
+            'success': True,
+            'data': resultados,
+            'total': len(resultados),
+            'total_sucesso': len(registros)
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 def calcular_desconto(distribuidora, regras, perfil_consumidor, kwh_consumido):
     """Calcula o desconto baseado nas regras da distribuidora"""
     
@@ -204,14 +389,72 @@ def calcular_desconto(distribuidora, regras, perfil_consumidor, kwh_consumido):
         'consumo_kwh': kwh_consumido
     }
 
+@app.route('/api/regras/recarregar', methods=['POST'])
+def recarregar_regras():
+    """Recarrega o snapshot de regras após uma importação"""
+    try:
+        snapshot = regras_store.recarregar()
+        return jsonify({
+            'success': True,
+            'data': {
+                'versao': snapshot.versao,
+                'carregado_em': snapshot.carregado_em.isoformat(),
+                'distribuidoras': len(snapshot.distribuidoras)
+            }
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @app.route('/api/simulacoes', methods=['GET'])
 def get_simulacoes():
-    """Retorna histórico de simulações"""
+    """
+    Retorna histórico de simulações paginado por cursor
+    
+    Parâmetros: limite, cursor, distribuidora_id, estado_id, data_inicio,
+    data_fim e campos (lista separada por vírgulas).
+    """
+    try:
+        try:
+            limite = min(max(request.args.get('limite', 100, type=int), 1), MAX_LIMITE_SIMULACOES)
+            campos = request.args.get('campos')
+            simulacoes, proximo_cursor = db_manager.listar_simulacoes_paginado(
+                limite=limite,
+                cursor=request.args.get('cursor'),
+                distribuidora_id=request.args.get('distribuidora_id', type=int),
+                estado_id=request.args.get('estado_id', type=int),
+                data_inicio=request.args.get('data_inicio'),
+                data_fim=request.args.get('data_fim'),
+                campos=[c.strip() for c in campos.split(',') if c.strip()] if campos else None
+            )
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        
+        return jsonify({
+            'success': True,
+            'data': simulacoes,
+            'proximo_cursor': proximo_cursor
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/estatisticas', methods=['GET'])
+def get_estatisticas():
+    """Contadores de simulações (geral e por distribuidora) a partir dos agregados"""
     try:
-        simulacoes = db_manager.get_all_simulations()
+        estatisticas = db_manager.obter_estatisticas_simulacoes()
+        estatisticas['por_distribuidora'] = db_manager.obter_estatisticas_por_distribuidora()
         return jsonify({
             'success': True,
-            'data': simulacoes
+            'data': estatisticas
         })
     except Exception as e:
         return jsonify({
@@ -219,6 +462,23 @@ def get_simulacoes():
             'error': str(e)
         }), 500
 
+@app.route('/api/simulacoes/exportar', methods=['GET'])
+def exportar_simulacoes():
+    """Exporta todo o histórico em NDJSON ou CSV, em streaming"""
+    formato = request.args.get('formato', 'ndjson')
+    if formato not in FORMATOS:
+        return jsonify({
+            'success': False,
+            'error': f"Formato inválido: {formato} (use {' ou '.join(FORMATOS)})"
+        }), 400
+    
+    blocos = exportar(db_manager.iterar_simulacoes(), formato, db_manager.colunas_simulacoes())
+    return Response(
+        stream_with_context(blocos),
+        mimetype=FORMATOS[formato],
+        headers={'Content-Disposition': f'attachment; filename=simulacoes.{formato}'}
+    )
+
 if __name__ == '__main__':
     print("Iniciando API Sinergia...")
     print("Endpoints disponíveis:")
@@ -227,8 +487,12 @@ if __name__ == '__main__':
     print("  GET  /api/distribuidoras/<estado_id> - Distribuidoras por estado")
     print("  GET  /api/distribuidoras - Todas as distribuidoras")
     print("  GET  /api/regras/<distribuidor_id> - Regras de uma distribuidora")
+    print("  POST /api/regras/recarregar - Recarregar regras em memória")
     print("  POST /api/simular - Simular desconto")
-    print("  GET  /api/simulacoes - Histórico de simulações")
+    print("  POST /api/simular/lote - Simular lote (JSON, CSV ou JSONL)")
+    print("  GET  /api/simulacoes - Histórico de simulações (paginado por cursor)")
+    print("  GET  /api/estatisticas - Contadores de simulações")
+    print("  GET  /api/simulacoes/exportar - Exportação completa (NDJSON ou CSV)")
     print("\nAPI rodando em: http://localhost:5000")
     
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
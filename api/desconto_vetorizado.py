@@ -0,0 +1,118 @@
+"""Versão vetorizada (NumPy) de calcular_desconto para re-precificação em lote.
+
+Recebe arrays de kWh, IDs de distribuidora e perfis e calcula todas as linhas
+de uma vez. Os resultados são idênticos aos de calcular_desconto em app.py
+linha a linha; check_desconto_vetorizado.py compara as duas implementações.
+"""
+
+from typing import Dict, Mapping, Sequence
+
+import numpy as np
+
+# Mesma tarifa média usada por calcular_desconto (R$ por kWh)
+TARIFA_KWH = 0.75
+
+# Desconto padrão por perfil quando a distribuidora não tem regras:
+# (limite_alto, desconto_alto, limite_medio, desconto_medio, desconto_base)
+DESCONTO_POR_PERFIL = {
+    'residencial': (500, 15, 300, 12, 8),
+    'comercial': (1000, 20, 500, 15, 10),
+    'industrial': (2000, 25, 1000, 20, 15),
+}
+
+def _arredondar(valores: np.ndarray) -> np.ndarray:
+    """Equivalente a round(valor, 2) do Python, elemento a elemento"""
+    arredondado = np.round(valores, 2)
+    # np.round escala por 100 antes de arredondar; nos raros empates
+    # aparentes o resultado pode divergir de round(), então esses são refeitos
+    escalado = valores * 100
+    empate = np.abs(escalado - np.floor(escalado) - 0.5) < 1e-6
+    if empate.any():
+        arredondado[empate] = [round(float(v), 2) for v in valores[empate]]
+    return arredondado
+
+class TabelaDescontos:
+    """Parâmetros por distribuidora em arrays densos indexados pelo ID"""
+
+    def __init__(self, distribuidoras: Mapping[int, Mapping],
+                 regras_desconto: Mapping[int, Sequence[Mapping]]):
+        tamanho = max(distribuidoras, default=0) + 1
+        self.existe = np.zeros(tamanho, dtype=bool)
+        self.consumo_minimo = np.zeros(tamanho, dtype=np.float64)
+        self.tem_regra = np.zeros(tamanho, dtype=bool)
+        self.desconto_regra = np.zeros(tamanho, dtype=np.float64)
+
+        for distribuidora_id, distribuidora in distribuidoras.items():
+            self.existe[distribuidora_id] = True
+            self.consumo_minimo[distribuidora_id] = distribuidora.get('consumo_minimo', 0) or 0
+            regras = regras_desconto.get(distribuidora_id, ())
+            if regras:
+                self.tem_regra[distribuidora_id] = True
+                # Mesma escolha de calcular_desconto: primeira regra com desconto
+                for regra in regras:
+                    if regra.get('desconto_percentual'):
+                        self.desconto_regra[distribuidora_id] = regra['desconto_percentual']
+                        break
+
+    @classmethod
+    def do_snapshot(cls, snapshot) -> 'TabelaDescontos':
+        """Monta a tabela a partir de um RuleSnapshot"""
+        return cls(snapshot.distribuidoras, snapshot.regras_desconto)
+
+def calcular_desconto_vetorizado(tabela: TabelaDescontos, kwh_consumido,
+                                 distribuidor_ids, perfis) -> Dict[str, np.ndarray]:
+    """
+    Calcula o desconto de N simulações de uma vez
+
+    Args:
+        tabela: parâmetros por distribuidora (TabelaDescontos)
+        kwh_consumido: array de consumos em kWh
+        distribuidor_ids: array de IDs de distribuidora
+        perfis: array de perfis ('residencial', 'comercial', 'industrial')
+
+    Returns:
+        dict de arrays com os mesmos campos numéricos de calcular_desconto, mais
+        'distribuidora_encontrada' (linhas False equivalem ao 404 da API)
+    """
+    kwh = np.asarray(kwh_consumido, dtype=np.float64)
+    ids = np.asarray(distribuidor_ids, dtype=np.int64)
+    # Normaliza só os perfis distintos e expande pelo índice inverso
+    unicos, inverso = np.unique(np.asarray(perfis, dtype=str), return_inverse=True)
+    perfis = np.char.lower(unicos)[inverso.reshape(-1)]
+
+    dentro = (ids >= 0) & (ids < len(tabela.existe))
+    ids_validos = np.where(dentro, ids, 0)
+    encontrada = dentro & tabela.existe[ids_validos]
+
+    valor_conta = kwh * TARIFA_KWH
+    elegivel = encontrada & (kwh >= tabela.consumo_minimo[ids_validos])
+
+    # Desconto padrão por perfil para distribuidoras sem regras
+    desconto_perfil = np.zeros(len(kwh), dtype=np.float64)
+    for perfil, (alto, d_alto, medio, d_medio, d_base) in DESCONTO_POR_PERFIL.items():
+        mascara = perfis == perfil
+        desconto_perfil[mascara] = np.select(
+            [kwh[mascara] >= alto, kwh[mascara] >= medio],
+            [d_alto, d_medio],
+            default=d_base
+        )
+
+    desconto_percentual = np.where(
+        tabela.tem_regra[ids_validos], tabela.desconto_regra[ids_validos], desconto_perfil
+    )
+    desconto_percentual = np.where(elegivel, desconto_percentual, 0.0)
+
+    valor_desconto = valor_conta * (desconto_percentual / 100)
+    valor_final = valor_conta - valor_desconto
+
+    # Linhas não elegíveis devolvem os valores sem arredondamento, como o escalar
+    return {
+        'distribuidora_encontrada': encontrada,
+        'elegivel': elegivel,
+        'desconto_percentual': desconto_percentual,
+        'valor_desconto': np.where(elegivel, _arredondar(valor_desconto), 0.0),
+        'valor_original': np.where(elegivel, _arredondar(valor_conta), valor_conta),
+        'valor_final': np.where(elegivel, _arredondar(valor_final), valor_conta),
+        'economia_mensal': np.where(elegivel, _arredondar(valor_desconto), 0.0),
+        'economia_anual': np.where(elegivel, _arredondar(valor_desconto * 12), 0.0),
+    }
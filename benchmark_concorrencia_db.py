@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Mede leituras por segundo pelo ORM com N threads enquanto uma importação de
+regras.json roda em paralelo, para cada modo de pool de DatabaseConfig
+
+Cada cenário usa uma cópia nova do sinergia.db em um diretório temporário.
+As threads de leitura compartilham um engine (como a API) e a importação roda
+em outro processo com o seu próprio engine (como load_regras_json.py),
+repetindo a importação bulk em transações longas durante toda a medição.
+
+    python benchmark_concorrencia_db.py [--threads 1,4,8] [--duracao 3]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+
+from sqlalchemy.exc import OperationalError
+
+from database.db_config import DatabaseConfig, DatabaseSession
+from load_regras_json import OPCOES_BANCO_IMPORTACAO, _em_lotes, _importar_entradas
+from models import Distribuidora, FaixaConsumo, RegraDesconto
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+
+# (nome, opções do engine das leituras, opções do engine da importação)
+CENARIOS = [
+    ('StaticPool, journal DELETE (antes)',
+     {'modo_pool': 'estatico', 'wal': False}, {'modo_pool': 'estatico', 'wal': False}),
+    ('QueuePool, journal DELETE',
+     {'modo_pool': 'fila', 'wal': False}, dict(OPCOES_BANCO_IMPORTACAO, wal=False)),
+    ('QueuePool + WAL',
+     {'modo_pool': 'fila'}, OPCOES_BANCO_IMPORTACAO),
+    ('SingletonThreadPool + WAL',
+     {'modo_pool': 'thread'}, OPCOES_BANCO_IMPORTACAO),
+]
+
+# Pausa entre lotes dentro da transação de importação, simulando um arquivo grande
+PAUSA_LOTE = 0.05
+
+def _importar_em_loop(caminho, opcoes, entradas, parar, resultado):
+    """Processo de importação: repete a importação bulk até o fim da medição"""
+    config = DatabaseConfig(caminho, **opcoes)
+    while not parar.is_set():
+        try:
+            with DatabaseSession(config) as session:
+                for lote in _em_lotes(iter(entradas), 5):
+                    _importar_entradas(session, lote, [], [])
+                    session.flush()
+                    time.sleep(PAUSA_LOTE)
+            resultado['importacoes'] += 1
+        except OperationalError:
+            resultado['erros_importacao'] += 1
+    config.close_all_sessions()
+
+def _ler_em_loop(config, distribuidoras, parar, resultado, semente):
+    """Consulta as regras de distribuidoras aleatórias até o fim da medição"""
+    rng = random.Random(semente)
+    latencias = []
+    erros = 0
+    while not parar.is_set():
+        inicio = time.perf_counter()
+        try:
+            with DatabaseSession(config) as session:
+                session.query(RegraDesconto).join(FaixaConsumo).filter(
+                    FaixaConsumo.distribuidora_id == rng.choice(distribuidoras)
+                ).all()
+            latencias.append(time.perf_counter() - inicio)
+        except OperationalError:
+            erros += 1
+    resultado.append((latencias, erros))
+
+def medir(opcoes_leitura, opcoes_importacao, threads, duracao, entradas):
+    """Roda um cenário em uma cópia do banco e devolve as métricas"""
+    diretorio = tempfile.mkdtemp(prefix='sinergia-bench-')
+    try:
+        caminho = os.path.join(diretorio, 'sinergia.db')
+        shutil.copyfile(os.path.join(RAIZ, 'database', 'sinergia.db'), caminho)
+
+        # + 1: a thread principal também usa o engine (no modo 'thread' cada
+        # thread precisa da sua conexão, senão o pool fecha as de outras)
+        config_leitura = DatabaseConfig(caminho, tamanho_pool=threads + 1, **opcoes_leitura)
+        with DatabaseSession(config_leitura) as session:
+            distribuidoras = [id_ for (id_,) in session.query(Distribuidora.id)]
+
+        contexto = multiprocessing.get_context('spawn')
+        gerenciador = contexto.Manager()
+        parar_importacao = contexto.Event()
+        importador = None
+        parar = threading.Event()
+        leitores = []
+        try:
+            importacao = gerenciador.dict(importacoes=0, erros_importacao=0)
+            importador = contexto.Process(
+                target=_importar_em_loop,
+                args=(caminho, opcoes_importacao, entradas, parar_importacao, importacao)
+            )
+            leituras = []
+            leitores = [
+                threading.Thread(target=_ler_em_loop, args=(config_leitura, distribuidoras, parar, leituras, i))
+                for i in range(threads)
+            ]
+
+            importador.start()
+            time.sleep(1.0)  # leituras começam com a importação já em andamento
+            for leitor in leitores:
+                leitor.start()
+            time.sleep(duracao)
+            parar.set()
+            for leitor in leitores:
+                leitor.join()
+            parar_importacao.set()
+            importador.join()
+            importacao = dict(importacao)
+        finally:
+            # Interrupções e erros não deixam o importador nem o Manager órfãos
+            parar.set()
+            for leitor in leitores:
+                if leitor.is_alive():
+                    leitor.join()
+            parar_importacao.set()
+            if importador is not None and importador.pid is not None:
+                importador.join(timeout=10)
+                if importador.is_alive():
+                    importador.terminate()
+                    importador.join()
+            gerenciador.shutdown()
+            config_leitura.close_all_sessions()
+
+        latencias = sorted(l for lista, _ in leituras for l in lista)
+        p99 = latencias[int(len(latencias) * 0.99)] if latencias else 0.0
+        return {
+            'leituras_s': len(latencias) / duracao,
+            'p99_ms': p99 * 1000,
+            'erros_leitura': sum(erros for _, erros in leituras),
+            **importacao
+        }
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description='Leituras/s com importação concorrente por modo de pool')
+    parser.add_argument('--threads', default='1,4,8', help='quantidades de threads de leitura')
+    parser.add_argument('--duracao', type=float, default=3.0, help='segundos por medição')
+    args = parser.parse_args()
+
+    with open(os.path.join(RAIZ, 'regras.json'), 'r', encoding='utf-8') as f:
+        entradas = json.load(f)
+
+    print(f"{'cenário':36s} {'threads':>7s} {'leituras/s':>11s} {'p99':>9s} "
+          f"{'erros':>6s} {'importações':>11s}")
+    for nome, opcoes_leitura, opcoes_importacao in CENARIOS:
+        for threads in (int(t) for t in args.threads.split(',')):
+            m = medir(opcoes_leitura, opcoes_importacao, threads, args.duracao, entradas)
+            erros = m['erros_leitura'] + m['erros_importacao']
+            print(f"{nome:36s} {threads:7d} {m['leituras_s']:11.0f} {m['p99_ms']:7.1f}ms "
+                  f"{erros:6d} {m['importacoes']:11d}")
+
+if __name__ == "__main__":
+    main()
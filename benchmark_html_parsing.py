@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Compara tempo e memória do parse seletivo (database/html_distribuidoras.py)
+com o parse completo do index.html usado antes pelos carregadores
+
+Cada modo roda em um processo novo, para que o pico de memória (RSS) de um
+não contamine o outro.
+"""
+
+import multiprocessing
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ARQUIVO_HTML = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'index.html')
+
+def _arvore_completa(html_content, parser):
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html_content, parser)
+    return soup.find('section', id='distribuidoras').find_all('details', class_='faq-item')
+
+def _executar(modo, html_content):
+    from database.html_distribuidoras import encontrar_details_distribuidoras, separar_fragmentos
+    if modo == 'árvore completa (html.parser)':
+        return _arvore_completa(html_content, 'html.parser')
+    if modo == 'árvore completa (lxml)':
+        return _arvore_completa(html_content, 'lxml')
+    if modo == 'SoupStrainer (html.parser)':
+        return encontrar_details_distribuidoras(html_content, 'html.parser')
+    if modo == 'SoupStrainer (lxml)':
+        return encontrar_details_distribuidoras(html_content, 'lxml')
+    if modo == 'fragmentos lxml (XPath)':
+        return separar_fragmentos(html_content)
+    raise ValueError(f"Modo desconhecido: {modo}")
+
+MODOS = [
+    'árvore completa (html.parser)',
+    'árvore completa (lxml)',
+    'SoupStrainer (html.parser)',
+    'SoupStrainer (lxml)',
+    'fragmentos lxml (XPath)',
+]
+
+def _pico_rss_kb():
+    if resource is None:
+        return 0
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss é em bytes no macOS e em KB no Linux
+    return pico // 1024 if sys.platform == 'darwin' else pico
+
+def _medir(modo, repeticoes):
+    """Executado no processo filho: (tempo médio em s, acréscimo de RSS em KB, total de blocos)"""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from database import html_distribuidoras  # noqa: F401 (importa antes da medição)
+    import bs4  # noqa: F401
+    import lxml.html  # noqa: F401
+
+    with open(ARQUIVO_HTML, 'r', encoding='utf-8') as f:
+        html_content = f.read()
+
+    rss_inicial = _pico_rss_kb()
+    total = len(_executar(modo, html_content))
+    acrescimo_rss = _pico_rss_kb() - rss_inicial
+
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        _executar(modo, html_content)
+    return (time.perf_counter() - inicio) / repeticoes, acrescimo_rss, total
+
+def main(repeticoes=20):
+    contexto = multiprocessing.get_context('spawn')
+    print(f"index.html: {os.path.getsize(ARQUIVO_HTML) / 1024:.0f} KB, {repeticoes} repetições por modo\n")
+    print(f"{'modo':32s} {'tempo':>10s} {'memória':>10s} {'blocos':>7s}")
+
+    referencia = None
+    for modo in MODOS:
+        with contexto.Pool(1) as pool:
+            tempo, memoria_kb, total = pool.apply(_medir, (modo, repeticoes))
+        referencia = referencia or tempo
+        memoria = f"{memoria_kb / 1024:.1f} MB" if resource is not None else 'n/d'
+        print(f"{modo:32s} {tempo * 1000:8.1f}ms {memoria:>10s} {total:7d}  ({referencia / tempo:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Compara a leitura das tabelas de regras pelo ORM (objetos + float(Decimal) por
+valor, como a exportação fazia antes) com o caminho Core de
+database/leitura_core.py e com o sqlite3 puro de database/static_export.py
+
+O banco é uma cópia do sinergia.db em um diretório temporário, inflada
+repetindo distribuidoras, faixas e regras --fator vezes (ids deslocados, o
+mesmo formato de dados). Antes de medir, confere que ORM e Core devolvem os
+mesmos valores.
+
+    python benchmark_leitura_core.py [--fator 200] [--repeticoes 5]
+"""
+
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from contextlib import closing
+from decimal import Decimal
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from database.db_config import DatabaseConfig, DatabaseSession
+from database.leitura_core import MODELOS_EXPORTACAO, ler_dicts
+from database.static_export import ARQUIVOS_ESTATICOS
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+
+# (tabela, {coluna de chave estrangeira: tabela referenciada}) na ordem de cópia
+TABELAS_INFLADAS = [
+    ('distribuidoras', {}),
+    ('faixas_consumo', {'distribuidora_id': 'distribuidoras'}),
+    ('regras_desconto', {'faixa_consumo_id': 'faixas_consumo'}),
+]
+
+def inflar_banco(caminho, fator):
+    """Copia as linhas originais fator - 1 vezes, deslocando ids e chaves estrangeiras"""
+    with closing(sqlite3.connect(caminho)) as conn:
+        maximos = {tabela: conn.execute(f"SELECT MAX(id) FROM {tabela}").fetchone()[0]
+                   for tabela, _ in TABELAS_INFLADAS}
+        with conn:
+            for copia in range(1, fator):
+                for tabela, chaves in TABELAS_INFLADAS:
+                    colunas = [row[1] for row in conn.execute(f"PRAGMA table_info({tabela})")]
+                    expressoes = []
+                    for coluna in colunas:
+                        if coluna == 'id':
+                            expressoes.append(f"id + {copia * maximos[tabela]}")
+                        elif coluna in chaves:
+                            expressoes.append(f"{coluna} + {copia * maximos[chaves[coluna]]}")
+                        elif tabela == 'distribuidoras' and coluna == 'nome':
+                            expressoes.append(f"nome || ' #{copia}'")
+                        else:
+                            expressoes.append(coluna)
+                    conn.execute(
+                        f"INSERT INTO {tabela} ({', '.join(colunas)}) "
+                        f"SELECT {', '.join(expressoes)} FROM {tabela} WHERE id <= {maximos[tabela]}"
+                    )
+        return {tabela: conn.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0]
+                for tabela, _ in TABELAS_INFLADAS}
+
+def ler_orm(config):
+    """Objetos ORM convertidos em dict coluna a coluna, Decimal -> float por valor"""
+    dados = {}
+    with DatabaseSession(config) as session:
+        for nome, modelo in MODELOS_EXPORTACAO.items():
+            colunas = [coluna.key for coluna in modelo.__mapper__.column_attrs]
+            linhas = []
+            for objeto in session.query(modelo).order_by(modelo.id).all():
+                linha = {}
+                for coluna in colunas:
+                    valor = getattr(objeto, coluna)
+                    linha[coluna] = float(valor) if isinstance(valor, Decimal) else valor
+                linhas.append(linha)
+            dados[nome] = linhas
+    return dados
+
+def ler_core(engine):
+    with engine.connect() as conn:
+        return {nome: ler_dicts(conn, modelo) for nome, modelo in MODELOS_EXPORTACAO.items()}
+
+def ler_sqlite3(caminho):
+    """Conversões de static_export sobre sqlite3.Row (colunas exportadas apenas)"""
+    with closing(sqlite3.connect(f'file:{caminho}?mode=ro', uri=True)) as conn:
+        conn.row_factory = sqlite3.Row
+        return {arquivo: [converter(row) for row in conn.execute(consulta)]
+                for arquivo, consulta, converter in ARQUIVOS_ESTATICOS}
+
+def medir(funcao, repeticoes):
+    """Menor tempo entre as repetições"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos)
+
+def main():
+    parser = argparse.ArgumentParser(description='Leitura das tabelas de regras: ORM x Core x sqlite3')
+    parser.add_argument('--fator', type=int, default=200, help='cópias das distribuidoras e regras')
+    parser.add_argument('--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp(prefix='sinergia-leitura-')
+    try:
+        caminho = os.path.join(diretorio, 'sinergia.db')
+        shutil.copyfile(os.path.join(RAIZ, 'database', 'sinergia.db'), caminho)
+        totais = inflar_banco(caminho, args.fator)
+        print("Banco inflado: " + ", ".join(f"{tabela} {total}" for tabela, total in totais.items()))
+
+        config = DatabaseConfig(caminho)
+        engine = config.create_engine()
+
+        if ler_orm(config) != ler_core(engine):
+            print("❌ ORM e Core devolveram valores diferentes")
+            sys.exit(1)
+        print("✅ ORM e Core devolvem os mesmos valores")
+
+        caminhos = [
+            ('ORM (objetos + float por valor)', lambda: ler_orm(config)),
+            ('Core (leitura_core.ler_dicts)', lambda: ler_core(engine)),
+            ('sqlite3 (static_export)', lambda: ler_sqlite3(caminho)),
+        ]
+        base = None
+        for nome, funcao in caminhos:
+            tempo = medir(funcao, args.repeticoes)
+            base = base or tempo
+            print(f"{nome:34s} {tempo * 1000:9.1f}ms  {base / tempo:5.1f}x")
+
+        config.close_all_sessions()
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Verifica se calcular_desconto_vetorizado reproduz calcular_desconto linha a linha
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'api'))
+
+from app import calcular_desconto, regras_store
+from desconto_vetorizado import TabelaDescontos, calcular_desconto_vetorizado
+
+CAMPOS = ['desconto_percentual', 'valor_desconto', 'valor_original', 'valor_final',
+          'economia_mensal', 'economia_anual']
+
+def verificar_paridade(total=200000, semente=42):
+    """Compara as duas implementações sobre entradas aleatórias"""
+    snapshot = regras_store.snapshot
+    rng = np.random.default_rng(semente)
+
+    ids_existentes = list(snapshot.distribuidoras.keys())
+    # Inclui IDs inexistentes e perfis desconhecidos
+    ids = rng.choice(ids_existentes + [0, 9999], size=total)
+    perfis = rng.choice(['residencial', 'Comercial', 'INDUSTRIAL', 'rural'], size=total)
+    kwh = np.concatenate([
+        rng.integers(0, 20000, size=total // 2).astype(float),
+        np.round(rng.uniform(0, 20000, size=total - total // 2), 3)
+    ])
+
+    # Sem regras, calcular_desconto usa o desconto padrão por perfil
+    tabelas = {
+        'com regras': TabelaDescontos.do_snapshot(snapshot),
+        'sem regras': TabelaDescontos(snapshot.distribuidoras, {})
+    }
+
+    divergencias = 0
+    for nome, tabela in tabelas.items():
+        inicio = time.perf_counter()
+        vetorizado = calcular_desconto_vetorizado(tabela, kwh, ids, perfis)
+        tempo_vetorizado = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        for i in range(total):
+            distribuidora = snapshot.get_distributor_by_id(int(ids[i]))
+            if not distribuidora:
+                if vetorizado['distribuidora_encontrada'][i]:
+                    divergencias += 1
+                continue
+            regras = snapshot.get_discount_rules_by_distributor(int(ids[i])) if nome == 'com regras' else []
+            escalar = calcular_desconto(distribuidora, regras, str(perfis[i]), float(kwh[i]))
+            if escalar['elegivel'] != bool(vetorizado['elegivel'][i]):
+                divergencias += 1
+                continue
+            for campo in CAMPOS:
+                if campo in escalar and escalar[campo] != vetorizado[campo][i]:
+                    divergencias += 1
+                    print(f"  ✗ [{nome}] linha {i} {campo}: {escalar[campo]} != {vetorizado[campo][i]}")
+        tempo_escalar = time.perf_counter() - inicio
+
+        print(f"{nome}: {total} linhas | escalar {tempo_escalar:.2f}s | vetorizado {tempo_vetorizado:.3f}s")
+
+    return divergencias
+
+if __name__ == "__main__":
+    divergencias = verificar_paridade()
+    if divergencias:
+        print(f"❌ {divergencias} divergências encontradas")
+        sys.exit(1)
+    print("✅ Implementações equivalentes")
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Confere com EXPLAIN QUERY PLAN que as consultas quentes usam índices
+
+Cada consulta é executada de verdade pelo DatabaseManager (o SQL é capturado
+com set_trace_callback, então mudanças nos métodos entram na verificação) e
+o plano de cada SELECT é analisado. Falha se alguma tabela for lida com SCAN
+sem índice ou se aparecer USE TEMP B-TREE (ordenação/agrupamento fora de
+índice); nas consultas que por definição leem tudo (leitura_completa) o laço
+externo pode ser um SCAN, mas as tabelas internas não.
+
+Roda nas duas estruturas, em bancos temporários migrados pelo DatabaseManager
+(cópia do sinergia.db para a nova estrutura, banco vazio do schema.sql para a
+original), primeiro sem estatísticas e depois inflados --fator vezes e com
+ANALYZE, para o planejador ver tabelas grandes.
+
+    python check_planos_consulta.py [--fator 20]
+"""
+
+import argparse
+import os
+import random
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+from contextlib import closing
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from benchmark_leitura_core import inflar_banco
+from database.db_manager import DatabaseManager, _codificar_cursor
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+
+def _consulta(sql):
+    def executar(db):
+        with db.get_connection() as conn:
+            conn.execute(sql).fetchall()
+    return executar
+
+# (nome, estruturas em que existe, leitura_completa, chamada)
+CONSULTAS_QUENTES = [
+    ('listar_distribuidoras_por_estado', ('original', 'nova'),
+     False, lambda db: db.listar_distribuidoras_por_estado(1)),
+    ('get_all_simulations', ('original', 'nova'),
+     True, lambda db: db.get_all_simulations()),
+    ('listar_simulacoes_paginado (cursor)', ('original', 'nova'),
+     False, lambda db: db.listar_simulacoes_paginado(50, cursor=_codificar_cursor('2099-01-01 00:00:00', 10 ** 9))),
+    ('listar_simulacoes_paginado (distribuidora)', ('original', 'nova'),
+     False, lambda db: db.listar_simulacoes_paginado(50, distribuidora_id=1)),
+    ('buscar_regras_desconto', ('original',),
+     False, lambda db: db.buscar_regras_desconto(1, 1500)),
+    ('listar_regras_distribuidora', ('original',),
+     False, lambda db: db.listar_regras_distribuidora(1)),
+    ('get_discount_rules_by_distributor', ('original',),
+     False, lambda db: db.get_discount_rules_by_distributor(1)),
+    ('vw_regras_completas', ('nova',),
+     True, _consulta("SELECT * FROM vw_regras_completas")),
+    ('vw_regras_completas por distribuidora', ('nova',),
+     False, _consulta("SELECT * FROM vw_regras_completas WHERE distribuidora_id = 1")),
+]
+
+# SCAN da tabela sem índice (SCAN t USING [COVERING] INDEX é percurso ordenado, aceito)
+SCAN_SEM_INDICE = re.compile(r'^SCAN \S+( AS \S+)?$')
+
+def problemas_do_plano(plano, leitura_completa=False):
+    return [
+        detalhe for posicao, detalhe in enumerate(plano)
+        if (SCAN_SEM_INDICE.match(detalhe) and not (leitura_completa and posicao == 0))
+        or 'TEMP B-TREE' in detalhe
+    ]
+
+def planos_da_chamada(db, chamada):
+    """Executa a chamada e devolve [(sql, [detalhes do plano])] de cada SELECT emitido"""
+    conn = db.get_connection()
+    comandos = []
+    conn.set_trace_callback(comandos.append)
+    try:
+        chamada(db)
+    finally:
+        conn.set_trace_callback(None)
+    return [
+        (sql, [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")])
+        for sql in comandos if sql.lstrip().upper().startswith('SELECT')
+    ]
+
+def _popular_original(conn, fator, rng):
+    """Estados, distribuidoras e regras sintéticas no banco vazio do schema.sql"""
+    conn.executemany("INSERT OR IGNORE INTO estados (nome, sigla) VALUES (?, ?)",
+                     [('Estado A', 'AA'), ('Estado B', 'BB')])
+    for i in range(30 * fator):
+        conn.execute("""
+            INSERT INTO distribuidoras (nome, estado_id, consumo_minimo, forma_pagamento, prazo_injecao)
+            VALUES (?, ?, 100, 'Unificado', 90)
+        """, (f'Distribuidora {i}', rng.randint(1, 2)))
+    for (distribuidora_id,) in conn.execute("SELECT id FROM distribuidoras").fetchall():
+        for faixa in range(8):
+            conn.execute("""
+                INSERT INTO regras_desconto
+                (distribuidora_id, consumo_min, consumo_max, desconto_percentual, tipo_bonus, ativo)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (distribuidora_id, faixa * 1000, faixa * 1000 + 999, rng.randint(5, 30),
+                  'ABCD'[faixa % 4], rng.random() < 0.9))
+
+def inflar(caminho, estrutura, fator, semente=11):
+    """Aumenta regras e histórico e grava as estatísticas do planejador"""
+    rng = random.Random(semente)
+    if estrutura == 'nova':
+        inflar_banco(caminho, fator)
+    with closing(sqlite3.connect(caminho)) as conn:
+        with conn:
+            if estrutura == 'original':
+                _popular_original(conn, fator, rng)
+            distribuidoras = [row[0] for row in conn.execute("SELECT id FROM distribuidoras")]
+            conn.executemany("""
+                INSERT INTO simulacoes (distribuidora_id, consumo_kwh, desconto_aplicado, valor_economia, created_at)
+                VALUES (?, ?, ?, ?, datetime('2025-01-01', ?))
+            """, [(rng.choice(distribuidoras), rng.randint(100, 20000), 10, 50, f'+{i} minutes')
+                  for i in range(200 * fator)])
+        conn.execute("ANALYZE")
+
+def verificar(db_path, estrutura):
+    """Número de consultas com plano degradado"""
+    db = DatabaseManager(db_path)
+    falhas = 0
+    try:
+        for nome, estruturas, leitura_completa, chamada in CONSULTAS_QUENTES:
+            if estrutura not in estruturas:
+                continue
+            planos = planos_da_chamada(db, chamada)
+            problemas = [p for _, plano in planos for p in problemas_do_plano(plano, leitura_completa)]
+            falhas += bool(problemas) or not planos
+            print(f"  {'❌' if problemas or not planos else '✅'} {nome}")
+            for sql, plano in planos:
+                if problemas:
+                    print(f"       {' '.join(sql.split())[:150]}")
+                for detalhe in plano:
+                    print(f"       {'!!' if detalhe in problemas else '  '} {detalhe}")
+    finally:
+        db.close()
+    return falhas
+
+def main():
+    parser = argparse.ArgumentParser(description='Regressão de planos das consultas quentes')
+    parser.add_argument('--fator', type=int, default=20, help='multiplicador dos dados no cenário com ANALYZE')
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp(prefix='sinergia-planos-')
+    falhas = 0
+    try:
+        for estrutura in ('nova', 'original'):
+            caminho = os.path.join(diretorio, f'{estrutura}.db')
+            if estrutura == 'nova':
+                shutil.copyfile(os.path.join(RAIZ, 'database', 'sinergia.db'), caminho)
+
+            print(f"\n[{estrutura}] sem estatísticas")
+            falhas += verificar(caminho, estrutura)
+
+            inflar(caminho, estrutura, args.fator)
+            print(f"[{estrutura}] inflado {args.fator}x, com ANALYZE")
+            falhas += verificar(caminho, estrutura)
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+    if falhas:
+        print(f"\n❌ {falhas} consultas com SCAN sem índice ou B-tree temporária")
+        sys.exit(1)
+    print("\n✅ Todas as consultas quentes usam índices")
+
+if __name__ == "__main__":
+    main()
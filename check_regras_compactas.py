@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Confere se RegrasCompactas (database/regras_compactas.py), o armazenamento
+de regras do RuleSnapshot, devolve as mesmas regras das linhas do banco e
+compara a memória ocupada pelas duas formas
+
+A equivalência é verificada no sinergia.db (somente leitura) para todas as
+distribuidoras e para uma varredura de consumos, contra uma busca linear
+sobre as linhas de CONSULTA_REGRAS. A memória é medida com tracemalloc em
+uma cópia temporária inflada --fator vezes (mesmo processo de
+benchmark_leitura_core.py): regras como mapeamentos congelados, do jeito que
+o snapshot guardava antes, contra as colunas compactas.
+
+    python check_regras_compactas.py [--fator 100] [--workers 4]
+"""
+
+import argparse
+import gc
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import tracemalloc
+from contextlib import closing
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from benchmark_leitura_core import inflar_banco
+from database.faixas_index import FaixasIndex
+from database.regras_compactas import CONSULTA_FAIXAS, CONSULTA_REGRAS, RegrasCompactas
+from database.rule_snapshot import RuleSnapshot, _congelar
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+
+def _referencia(conn):
+    """Regras e faixas como o snapshot guardava antes: linhas por distribuidora"""
+    conn.row_factory = sqlite3.Row
+    faixas = [dict(row) for row in conn.execute(CONSULTA_FAIXAS)]
+    regras = {}
+    for row in conn.execute(CONSULTA_REGRAS):
+        regras.setdefault(row['distribuidora_id'], []).append(dict(row))
+    return regras, FaixasIndex(faixas)
+
+def _regras_por_consumo(regras, indice, distribuidora_id, consumo):
+    """Regras da faixa do consumo, maior desconto primeiro (busca linear de referência)"""
+    faixa = indice.buscar_faixa(distribuidora_id, consumo)
+    if faixa is None:
+        return []
+    da_faixa = [regra for regra in regras.get(distribuidora_id, []) if regra['faixa_consumo_id'] == faixa['id']]
+    return sorted(da_faixa, key=lambda regra: regra['desconto_percentual'], reverse=True)
+
+def verificar_equivalencia(db_path):
+    """Número de divergências entre as linhas do banco e o armazenamento compacto"""
+    with closing(sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)) as conn:
+        snapshot = RuleSnapshot.carregar(conn)
+        conn.execute("BEGIN")
+        try:
+            carregadas = RegrasCompactas.carregar(conn)
+            regras, indice = _referencia(conn)
+        finally:
+            conn.rollback()
+
+    limite = max((regra['consumo_max'] or regra['consumo_min']
+                  for lista in regras.values() for regra in lista), default=0) + 1000
+    divergencias = 0
+    comparacoes = 0
+    distribuidoras = set(snapshot.distribuidoras) | set(regras)
+    for distribuidora_id in sorted(distribuidoras):
+        esperado = regras.get(distribuidora_id, [])
+        obtidos = (
+            ('snapshot', snapshot.get_discount_rules_by_distributor(distribuidora_id)),
+            ('carregar', carregadas.regras(distribuidora_id)),
+        )
+        for origem, obtido in obtidos:
+            comparacoes += 1
+            if [dict(regra) for regra in obtido] != esperado:
+                divergencias += 1
+                print(f"  ✗ [{origem}] regras da distribuidora {distribuidora_id}")
+
+        for consumo in range(0, limite, 7):
+            comparacoes += 1
+            esperado = _regras_por_consumo(regras, indice, distribuidora_id, consumo)
+            obtido = [dict(regra) for regra in snapshot.buscar_regras_desconto(distribuidora_id, consumo)]
+            if obtido != esperado:
+                divergencias += 1
+                if divergencias <= 20:
+                    print(f"  ✗ distribuidora {distribuidora_id}, {consumo} kWh: {len(obtido)} != {len(esperado)} regras")
+
+    print(f"{len(snapshot.regras)} regras, {len(distribuidoras)} distribuidoras: {comparacoes} comparações")
+    return divergencias
+
+def memoria_retida(montar):
+    """Bytes alocados que continuam vivos depois de montar() (o resultado é mantido)"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        resultado = montar()
+        gc.collect()
+        retido, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return resultado, retido
+
+def comparar_memoria(fator, workers):
+    diretorio = tempfile.mkdtemp(prefix='sinergia-compactas-')
+    try:
+        caminho = os.path.join(diretorio, 'sinergia.db')
+        shutil.copyfile(os.path.join(RAIZ, 'database', 'sinergia.db'), caminho)
+        inflar_banco(caminho, fator)
+
+        with closing(sqlite3.connect(caminho)) as conn:
+            conn.row_factory = sqlite3.Row
+
+            def regras_snapshot():
+                # Forma anterior de RuleSnapshot.regras_desconto
+                regras = {}
+                for row in conn.execute(CONSULTA_REGRAS):
+                    regras.setdefault(row['distribuidora_id'], []).append(_congelar(row))
+                return {k: tuple(v) for k, v in regras.items()}
+
+            mapeamentos, bytes_mapeamentos = memoria_retida(regras_snapshot)
+            compactas, bytes_compactas = memoria_retida(lambda: RegrasCompactas.carregar(conn))
+
+        total = len(compactas)
+        print(f"Banco inflado {fator}x: {total} regras")
+        for nome, tamanho in (('mapeamentos (antes)', bytes_mapeamentos),
+                              ('colunas (RegrasCompactas)', bytes_compactas)):
+            print(f"  {nome:26s} {tamanho / 1024:9.1f} KiB  {tamanho / total:7.1f} B/regra  "
+                  f"x{workers} workers: {tamanho * workers / 1024 ** 2:6.1f} MiB")
+        print(f"  redução: {bytes_mapeamentos / bytes_compactas:.1f}x "
+              f"(bytes_ocupados() estima {compactas.bytes_ocupados() / 1024:.1f} KiB)")
+        del mapeamentos
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Equivalência e memória das regras compactas')
+    parser.add_argument('--banco', default='database/sinergia.db')
+    parser.add_argument('--fator', type=int, default=100, help='cópias das regras para medir a memória')
+    parser.add_argument('--workers', type=int, default=4, help='workers do gunicorn para a projeção')
+    args = parser.parse_args()
+
+    divergencias = verificar_equivalencia(args.banco)
+    if divergencias:
+        print(f"❌ {divergencias} divergências encontradas")
+        sys.exit(1)
+    print("✅ Regras compactas equivalentes às linhas do banco")
+    comparar_memoria(args.fator, args.workers)
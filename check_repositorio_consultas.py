@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Confere o número exato de consultas SQL de cada estratégia de carregamento de
+database/repositorio_regras.py
+
+Cada caso chama o repositório e percorre todos os relacionamentos do
+resultado, contando os SELECTs emitidos; qualquer carregamento lazy que
+escape da estratégia aparece como consulta a mais. Para comparação, o mesmo
+percurso é feito sem as opções de carregamento (N+1). Roda sobre uma cópia
+do sinergia.db com algumas simulações de exemplo.
+
+    python check_repositorio_consultas.py
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+from contextlib import contextmanager
+
+from sqlalchemy import event, select
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from database.db_config import DatabaseConfig, DatabaseSession
+from database.repositorio_regras import RepositorioRegras
+from models import Estado, FaixaConsumo, RegraDesconto, Simulacao
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+
+@contextmanager
+def contar_consultas(engine):
+    """Conta os comandos SQL executados no engine dentro do bloco"""
+    consultas = []
+
+    def registrar(conn, cursor, statement, parameters, context, executemany):
+        consultas.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', registrar)
+    try:
+        yield consultas
+    finally:
+        event.remove(engine, 'before_cursor_execute', registrar)
+
+def percorrer_estado(estado):
+    return [
+        (distribuidora.nome, faixa.nome_faixa, regra.tipo_bonus.codigo, regra.desconto_percentual)
+        for distribuidora in estado.distribuidoras
+        for faixa in distribuidora.faixas_consumo
+        for regra in faixa.regras_desconto
+    ]
+
+def percorrer_regras(regras):
+    return [(regra.faixa_consumo.nome_faixa, regra.tipo_bonus.codigo, regra.desconto_percentual)
+            for regra in regras]
+
+def percorrer_historico(simulacoes):
+    return [
+        (simulacao.distribuidora.nome, simulacao.distribuidora.estado.sigla,
+         simulacao.faixa_consumo.nome_faixa if simulacao.faixa_consumo else None,
+         simulacao.tipo_bonus.codigo if simulacao.tipo_bonus else None)
+        for simulacao in simulacoes
+    ]
+
+def _criar_simulacoes(config, total=60, semente=7):
+    """Simulações de exemplo na cópia do banco, para o caso do histórico"""
+    rng = random.Random(semente)
+    with DatabaseSession(config) as session:
+        regras = session.execute(
+            select(FaixaConsumo.distribuidora_id, RegraDesconto.faixa_consumo_id,
+                   RegraDesconto.tipo_bonus_id, RegraDesconto.desconto_percentual)
+            .join(FaixaConsumo, RegraDesconto.faixa_consumo_id == FaixaConsumo.id)
+        ).all()
+        for _ in range(total):
+            distribuidora_id, faixa_id, tipo_id, desconto = rng.choice(regras)
+            session.add(Simulacao(distribuidora_id=distribuidora_id, faixa_consumo_id=faixa_id,
+                                  tipo_bonus_id=tipo_id, consumo_kwh=rng.randint(100, 20000),
+                                  desconto_aplicado=desconto))
+
+def _versoes_lazy(session):
+    """Mesmas leituras sem opções de carregamento (como em models_examples.py)"""
+    faixas = select(FaixaConsumo.id).where(FaixaConsumo.distribuidora_id == 1, FaixaConsumo.ativo == True)
+    return {
+        'arvore_regras_estado': lambda: [
+            (d.nome, f.nome_faixa, r.tipo_bonus.codigo, r.desconto_percentual)
+            for d in session.scalars(select(Estado).where(Estado.sigla == 'MG')).first().distribuidoras if d.ativo
+            for f in d.faixas_consumo if f.ativo
+            for r in f.regras_desconto if r.ativo
+        ],
+        'regras_distribuidora': lambda: percorrer_regras(session.scalars(
+            select(RegraDesconto).where(RegraDesconto.faixa_consumo_id.in_(faixas), RegraDesconto.ativo == True)
+            .order_by(RegraDesconto.faixa_consumo_id, RegraDesconto.tipo_bonus_id)
+        )),
+        'historico_com_nomes': lambda: percorrer_historico(session.scalars(
+            select(Simulacao).order_by(Simulacao.id.desc()).limit(50)
+        )),
+    }
+
+def verificar():
+    diretorio = tempfile.mkdtemp(prefix='sinergia-repositorio-')
+    try:
+        caminho = os.path.join(diretorio, 'sinergia.db')
+        shutil.copyfile(os.path.join(RAIZ, 'database', 'sinergia.db'), caminho)
+        config = DatabaseConfig(caminho)
+        _criar_simulacoes(config)
+        engine = config.create_engine()
+
+        # (estratégia, chamada, percurso, consultas esperadas)
+        casos = [
+            ('arvore_regras_estado', lambda r: r.arvore_regras_estado('MG'), percorrer_estado, 4),
+            ('regras_distribuidora', lambda r: r.regras_distribuidora(1), percorrer_regras, 1),
+            ('historico_com_nomes', lambda r: r.historico_com_nomes(50), percorrer_historico, 1),
+        ]
+
+        falhas = 0
+        for nome, chamada, percorrer, esperado in casos:
+            # Sessões novas: nada vem do identity map de um caso anterior
+            with DatabaseSession(config) as session:
+                with contar_consultas(engine) as consultas:
+                    resultado = percorrer(chamada(RepositorioRegras(session)))
+            with DatabaseSession(config) as session:
+                with contar_consultas(engine) as consultas_lazy:
+                    resultado_lazy = _versoes_lazy(session)[nome]()
+
+            ok = len(consultas) == esperado and sorted(map(str, resultado)) == sorted(map(str, resultado_lazy))
+            falhas += not ok
+            print(f"{'✅' if ok else '❌'} {nome}: {len(consultas)} consultas (esperado {esperado}), "
+                  f"{len(resultado)} linhas | sem estratégia: {len(consultas_lazy)} consultas")
+            if len(consultas) != esperado:
+                for sql in consultas:
+                    print(f"     {' '.join(sql.split())[:120]}")
+
+        config.close_all_sessions()
+        return falhas
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+
+if __name__ == "__main__":
+    falhas = verificar()
+    if falhas:
+        print(f"❌ {falhas} estratégias com número de consultas diferente do esperado")
+        sys.exit(1)
+    print("✅ Todas as estratégias com número fixo de consultas")
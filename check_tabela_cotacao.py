@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Verifica se a TabelaCotacao (database/tabela_cotacao.py) reproduz a avaliação
+das regras direto no banco em uma varredura densa de consumos
+
+Para cada consumo da varredura, uma consulta escolhe no sinergia.db a faixa
+aplicável de cada distribuidora ativa (maior consumo_min, como o FaixasIndex)
+e a regra de cada tipo de bônus; o resultado é comparado com a tabela e com
+a forma serializada que vai no bundle do simulador.
+
+    python check_tabela_cotacao.py [--banco database/sinergia.db] [--passo 1]
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from bisect import bisect_right
+from contextlib import closing
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from database.tabela_cotacao import (MOTIVO_SEM_FAIXA, MOTIVO_SEM_REGRA, Cotacao,
+                                     TabelaCotacao, motivo_consumo_minimo)
+
+# Faixa de cada distribuidora para o consumo :kwh (já truncado) e a regra de
+# cada tipo de bônus nessa faixa; o desempate segue _prioridade do FaixasIndex
+CONSULTA_AVALIACAO = """
+    WITH escolhida AS (
+        SELECT d.id AS distribuidora_id, d.consumo_minimo,
+               (SELECT fc.id FROM faixas_consumo fc
+                WHERE fc.distribuidora_id = d.id AND fc.ativo = 1
+                  AND fc.consumo_min <= :kwh
+                  AND (fc.consumo_max IS NULL OR :kwh <= fc.consumo_max)
+                ORDER BY fc.consumo_min DESC, fc.consumo_max IS NULL, fc.consumo_max,
+                         COALESCE(fc.ordem, 0)
+                LIMIT 1) AS faixa_id
+        FROM distribuidoras d
+        JOIN estados e ON d.estado_id = e.id
+        WHERE d.ativo = 1
+    )
+    SELECT e.distribuidora_id, tb.id AS tipo_bonus_id, e.consumo_minimo, e.faixa_id,
+           (SELECT r.desconto_percentual FROM regras_desconto r
+            WHERE r.faixa_consumo_id = e.faixa_id AND r.tipo_bonus_id = tb.id
+              AND r.ativo = 1) AS desconto_percentual
+    FROM escolhida e
+    CROSS JOIN tipos_bonus tb
+    WHERE tb.ativo = 1
+"""
+
+def avaliar_no_banco(conn, consumo_kwh):
+    """{(distribuidora_id, tipo_bonus_id): Cotacao} avaliado pelas consultas"""
+    resultado = {}
+    for row in conn.execute(CONSULTA_AVALIACAO, {'kwh': int(consumo_kwh)}):
+        chave = (row['distribuidora_id'], row['tipo_bonus_id'])
+        if consumo_kwh < row['consumo_minimo']:
+            resultado[chave] = Cotacao(0.0, False, motivo_consumo_minimo(row['consumo_minimo']))
+        elif row['faixa_id'] is None:
+            resultado[chave] = Cotacao(0.0, False, MOTIVO_SEM_FAIXA)
+        elif row['desconto_percentual'] is None:
+            resultado[chave] = Cotacao(0.0, False, MOTIVO_SEM_REGRA)
+        else:
+            resultado[chave] = Cotacao(float(row['desconto_percentual']), True, None)
+    return resultado
+
+def cotar_serializado(serializado, tipo_bonus_id, consumo_kwh):
+    """Mesma busca de SimulacaoManager.cotar sobre a forma serializada"""
+    pontos, valores = serializado['degraus'][str(tipo_bonus_id)]
+    desconto, elegivel, motivo = valores[bisect_right(pontos, int(consumo_kwh)) - 1]
+    return Cotacao(desconto, elegivel, None if motivo is None else serializado['motivos'][motivo])
+
+def consumos_varredura(conn, passo):
+    """Consumos inteiros até além do último ponto de quebra, mais valores fracionários em volta de cada ponto"""
+    pontos = {0}
+    for row in conn.execute("SELECT consumo_minimo FROM distribuidoras"):
+        pontos.add(row[0])
+    for row in conn.execute("SELECT consumo_min, consumo_max FROM faixas_consumo"):
+        pontos.add(row[0])
+        if row[1] is not None:
+            pontos.update((row[1], row[1] + 1))
+
+    consumos = set()
+    limite = max(pontos) + 1000
+    kwh = 0.0
+    while kwh <= limite:
+        consumos.add(kwh)
+        kwh += passo
+    for ponto in pontos:
+        for delta in (-1, -0.5, -0.001, 0, 0.001, 0.5, 1):
+            if ponto + delta >= 0:
+                consumos.add(ponto + delta)
+    return sorted(consumos)
+
+def verificar_tabela(db_path, passo=1.0):
+    """Compara tabela e banco em todos os consumos da varredura; devolve o número de divergências"""
+    with closing(sqlite3.connect(f'file:{db_path}?mode=ro', uri=True)) as conn:
+        conn.row_factory = sqlite3.Row
+        # Tabela e avaliação enxergam o mesmo estado do banco
+        conn.execute("BEGIN")
+        try:
+            inicio = time.perf_counter()
+            tabela = TabelaCotacao.carregar(conn)
+            tempo_montagem = time.perf_counter() - inicio
+
+            consumos = consumos_varredura(conn, passo)
+            distribuidoras = [row['id'] for row in conn.execute(
+                "SELECT d.id FROM distribuidoras d JOIN estados e ON d.estado_id = e.id WHERE d.ativo = 1"
+            )]
+            serializados = {dist_id: tabela.serializar(dist_id) for dist_id in distribuidoras}
+
+            divergencias = 0
+            comparacoes = 0
+            tempo_banco = 0.0
+            for consumo in consumos:
+                inicio = time.perf_counter()
+                esperado = avaliar_no_banco(conn, consumo)
+                tempo_banco += time.perf_counter() - inicio
+
+                for (dist_id, tipo_id), cotacao_banco in esperado.items():
+                    comparacoes += 1
+                    obtidos = {
+                        'tabela': tabela.cotar(dist_id, consumo, tipo_id),
+                        'bundle': cotar_serializado(serializados[dist_id], tipo_id, consumo),
+                    }
+                    for origem, cotacao in obtidos.items():
+                        if cotacao != cotacao_banco:
+                            divergencias += 1
+                            if divergencias <= 20:
+                                print(f"  ✗ [{origem}] distribuidora {dist_id}, bônus {tipo_id}, "
+                                      f"{consumo} kWh: {cotacao} != {cotacao_banco}")
+        finally:
+            conn.rollback()
+
+    print(f"Tabela montada em {tempo_montagem * 1000:.1f}ms com {tabela.total_degraus()} degraus")
+    print(f"{len(consumos)} consumos x {len(distribuidoras)} distribuidoras: "
+          f"{comparacoes} comparações | banco {tempo_banco:.2f}s")
+    return divergencias
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Compara a tabela de cotação com a avaliação no banco')
+    parser.add_argument('--banco', default='database/sinergia.db')
+    parser.add_argument('--passo', type=float, default=1.0, help='intervalo da varredura em kWh')
+    args = parser.parse_args()
+
+    divergencias = verificar_tabela(args.banco, args.passo)
+    if divergencias:
+        print(f"❌ {divergencias} divergências encontradas")
+        sys.exit(1)
+    print("✅ Tabela de cotação equivalente ao banco")
@@ -1,8 +1,9 @@
 import re
 import sys
 import os
-from bs4 import BeautifulSoup
 from db_manager import DatabaseManager
+from html_distribuidoras import encontrar_details_distribuidoras
+from parsing import extrair_numero, extrair_percentual
 
 class DataLoader:
     """Carregador de dados das distribuidoras a partir do HTML"""
@@ -32,16 +33,6 @@ class DataLoader:
             'Tocantins': 'TO'
         }
     
-    def extrair_numero(self, texto: str) -> int:
-        """Extrai número de um texto"""
-        match = re.search(r'(\d+)', texto.replace('.', '').replace(',', ''))
-        return int(match.group(1)) if match else 0
-    
-    def extrair_percentual(self, texto: str) -> float:
-        """Extrai percentual de um texto"""
-        match = re.search(r'(\d+(?:\.\d+)?)%', texto)
-        return float(match.group(1)) if match else 0.0
-    
     def processar_distribuidora_html(self, details_element):
         """Processa um elemento <details> de distribuidora do HTML"""
         try:
@@ -91,7 +82,7 @@ class DataLoader:
                 
                 # Consumo mínimo
                 if 'consumo' in texto_lower and ('mínimo' in texto_lower or 'de' in texto_lower):
-                    dados['consumo_minimo'] = self.extrair_numero(texto)
+                    dados['consumo_minimo'] = extrair_numero(texto)
                 
                 # Forma de pagamento
                 elif 'forma de pagamento' in texto_lower or 'pagamento' in texto_lower:
@@ -102,7 +93,7 @@ class DataLoader:
                 
                 # Prazo de injeção
                 elif 'prazo de injeção' in texto_lower or 'injeção' in texto_lower:
-                    dados['prazo_injecao'] = self.extrair_numero(texto)
+                    dados['prazo_injecao'] = extrair_numero(texto)
                 
                 # Troca de titularidade
                 elif 'troca de titularidade' in texto_lower:
@@ -110,7 +101,7 @@ class DataLoader:
                 
                 # Desconto padrão
                 elif 'desconto padrão' in texto_lower or 'desconto de' in texto_lower:
-                    percentual = self.extrair_percentual(texto)
+                    percentual = extrair_percentual(texto)
                     if percentual > 0:
                         # Determinar tipo de bônus
                         tipo_bonus = 'A'
@@ -131,7 +122,7 @@ class DataLoader:
                 
                 # Descontos opcionais
                 elif 'descontos opcionais' in texto_lower or 'opcional' in texto_lower:
-                    percentual = self.extrair_percentual(texto)
+                    percentual = extrair_percentual(texto)
                     if percentual > 0:
                         tipo_bonus = 'B'
                         if 'bônus c' in texto_lower:
@@ -149,8 +140,8 @@ class DataLoader:
                 
                 # Consumo acima de X kWh
                 elif 'consumo acima de' in texto_lower or 'consumo de' in texto_lower:
-                    consumo_min = self.extrair_numero(texto)
-                    percentual = self.extrair_percentual(texto)
+                    consumo_min = extrair_numero(texto)
+                    percentual = extrair_percentual(texto)
                     
                     if consumo_min > 0 and percentual > 0:
                         tipo_bonus = 'C'
@@ -212,8 +203,6 @@ class DataLoader:
         with open(html_file_path, 'r', encoding='utf-8') as f:
             html_content = f.read()
         
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
         # Inserir estados
         print("Inserindo estados...")
         estados_ids = {}
@@ -221,14 +210,13 @@ class DataLoader:
             estado_id = self.db.inserir_estado(estado_nome, sigla)
             estados_ids[estado_nome] = estado_id
         
-        # Encontrar seção de distribuidoras
-        distribuidoras_section = soup.find('section', id='distribuidoras')
-        if not distribuidoras_section:
+        # Encontrar seção de distribuidoras (só ela é analisada)
+        details_elements = encontrar_details_distribuidoras(html_content)
+        if details_elements is None:
             print("Seção de distribuidoras não encontrada!")
             return
         
         # Processar cada distribuidora
-        details_elements = distribuidoras_section.find_all('details', class_='faq-item')
         print(f"Encontradas {len(details_elements)} distribuidoras para processar...")
         
         distribuidoras_inseridas = 0
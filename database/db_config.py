@@ -1,47 +1,126 @@
-"""Configuração do banco de dados para os models SQLAlchemy"""
+"""Configuração do banco de dados para os models SQLAlchemy
+
+O modo de pool é escolhido por caso de uso (MODOS_POOL):
+
+- 'fila' (QueuePool, padrão): API e leitores concorrentes; cada thread usa
+  uma conexão própria do pool, então uma consulta não espera a outra;
+- 'thread' (SingletonThreadPool): scripts e importadores; uma conexão fixa
+  por thread. Só é seguro enquanto no máximo tamanho_pool threads usam o
+  engine durante toda a vida dele: passado esse limite o SQLAlchemy fecha
+  conexões de outras threads ainda em uso (erros ou até falha de
+  segmentação do sqlite3). Para engines compartilhados por um número
+  variável de threads use 'fila';
+- 'estatico' (StaticPool): uma única conexão compartilhada, necessária para
+  bancos ':memory:' (cada conexão nova veria um banco vazio).
+
+Toda conexão aberta recebe, pelo evento 'connect', journal_mode=WAL (leitores
+não esperam pelo escritor) e busy_timeout. Com transacao_imediata=True as
+transações começam com BEGIN IMMEDIATE: o escritor espera pelo lock de
+escrita logo no início, dentro do busy_timeout, em vez de falhar com
+"database is locked" no meio da importação ao promover uma leitura para
+escrita. benchmark_concorrencia_db.py mede leituras por segundo com várias
+threads durante uma importação.
+"""
 
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, scoped_session
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import QueuePool, SingletonThreadPool, StaticPool
 from models import Base
 
+MODOS_POOL = {
+    'fila': QueuePool,
+    'thread': SingletonThreadPool,
+    'estatico': StaticPool,
+}
+
+# Tempo que uma conexão espera por um lock antes de desistir
+BUSY_TIMEOUT_MS = 20000
+
 class DatabaseConfig:
     """Classe para configuração do banco de dados"""
     
-    def __init__(self, db_path=None, echo=False):
+    def __init__(self, db_path=None, echo=False, modo_pool=None, tamanho_pool=5,
+                 max_overflow=10, wal=True, busy_timeout_ms=BUSY_TIMEOUT_MS,
+                 transacao_imediata=False):
         """
         Inicializa a configuração do banco
         
         Args:
             db_path (str): Caminho para o arquivo do banco SQLite
             echo (bool): Se True, mostra as queries SQL no console
+            modo_pool (str): 'fila', 'thread' ou 'estatico' (padrão: 'estatico'
+                para ':memory:', 'fila' para arquivos)
+            tamanho_pool (int): conexões mantidas abertas pelo pool; no modo
+                'thread' é também o número máximo de threads que podem usar
+                o engine (contando a thread principal)
+            max_overflow (int): conexões extras temporárias no modo 'fila'
+            wal (bool): Se True, usa journal_mode=WAL
+            busy_timeout_ms (int): espera máxima por um lock, em milissegundos
+            transacao_imediata (bool): Se True, transações começam com BEGIN IMMEDIATE
         """
         if db_path is None:
             # Caminho padrão relativo ao diretório atual
             current_dir = os.path.dirname(os.path.abspath(__file__))
             db_path = os.path.join(current_dir, 'sinergia.db')
         
+        if modo_pool is None:
+            modo_pool = 'estatico' if db_path == ':memory:' else 'fila'
+        if modo_pool not in MODOS_POOL:
+            raise ValueError(f"Modo de pool inválido: {modo_pool} (use {', '.join(MODOS_POOL)})")
+        
         self.db_path = db_path
         self.echo = echo
+        self.modo_pool = modo_pool
+        self.tamanho_pool = tamanho_pool
+        self.max_overflow = max_overflow
+        self.wal = wal and db_path != ':memory:'
+        self.busy_timeout_ms = busy_timeout_ms
+        self.transacao_imediata = transacao_imediata
         self.engine = None
         self.Session = None
         self._session = None
     
+    def _configurar_conexao(self, dbapi_connection, connection_record):
+        """Evento 'connect': PRAGMAs aplicados em cada conexão nova do pool"""
+        if self.transacao_imediata:
+            # O driver não abre transações sozinho; o evento 'begin' emite o BEGIN
+            dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        if self.wal:
+            cursor.execute("PRAGMA journal_mode = WAL")
+            cursor.execute("PRAGMA synchronous = NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        cursor.close()
+    
+    def _iniciar_transacao(self, conn):
+        """Evento 'begin': reserva o lock de escrita no início da transação"""
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+    
     def create_engine(self):
         """Cria o engine do SQLAlchemy"""
         if self.engine is None:
+            opcoes_pool = {}
+            if self.modo_pool == 'fila':
+                opcoes_pool = {'pool_size': self.tamanho_pool, 'max_overflow': self.max_overflow}
+            elif self.modo_pool == 'thread':
+                opcoes_pool = {'pool_size': self.tamanho_pool}
+            
             # Configurações específicas para SQLite
             self.engine = create_engine(
                 f'sqlite:///{self.db_path}',
                 echo=self.echo,
-                poolclass=StaticPool,
+                poolclass=MODOS_POOL[self.modo_pool],
                 connect_args={
-                    'check_same_thread': False,  # Permite uso em múltiplas threads
-                    'timeout': 20  # Timeout de 20 segundos
+                    'check_same_thread': False,  # Conexões do pool mudam de thread
+                    'timeout': self.busy_timeout_ms / 1000
                 },
-                pool_pre_ping=True  # Verifica conexões antes de usar
+                pool_pre_ping=True,  # Verifica conexões antes de usar
+                **opcoes_pool
             )
+            event.listen(self.engine, 'connect', self._configurar_conexao)
+            if self.transacao_imediata:
+                event.listen(self.engine, 'begin', self._iniciar_transacao)
         return self.engine
     
     def create_tables(self):
@@ -84,7 +163,7 @@ def get_db_session():
     """Função utilitária para obter uma sessão do banco padrão"""
     return default_db.get_session()
 
-def init_database(db_path=None, echo=False, create_tables=True):
+def init_database(db_path=None, echo=False, create_tables=True, **opcoes):
     """
     Inicializa o banco de dados
     
@@ -92,12 +171,13 @@ def init_database(db_path=None, echo=False, create_tables=True):
         db_path (str): Caminho para o arquivo do banco
         echo (bool): Se True, mostra as queries SQL
         create_tables (bool): Se True, cria as tabelas automaticamente
+        **opcoes: pool, WAL e busy timeout (ver DatabaseConfig)
     
     Returns:
         DatabaseConfig: Instância configurada do banco
     """
     global default_db
-    default_db = DatabaseConfig(db_path, echo)
+    default_db = DatabaseConfig(db_path, echo, **opcoes)
     
     if create_tables:
         default_db.create_tables()
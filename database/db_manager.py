@@ -1,34 +1,276 @@
 import sqlite3
 import os
-from typing import List, Dict, Optional, Tuple
+import atexit
+import base64
+import json
+import threading
+import time
+from contextlib import closing
+from typing import Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
 
+# PRAGMAs aplicados uma única vez em cada conexão aberta pelo pool
+PRAGMAS_CONEXAO = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA cache_size = -16000",  # ~16 MB
+    "PRAGMA mmap_size = 134217728",  # 128 MB
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA busy_timeout = 5000",
+)
+
+# Migrações do schema em ordem: (versão, arquivo SQL em database/).
+# PRAGMA user_version guarda a última versão aplicada ao arquivo do banco.
+# Quando o DDL depende da estrutura das tabelas de regras, o arquivo é um
+# dict por estrutura (veja estrutura_regras).
+MIGRACOES = [
+    (1, 'schema.sql'),
+    (2, 'migracao_002_estatisticas.sql'),
+    (3, {'original': 'migracao_003_indices.sql',
+         'nova': 'migracao_003_indices_nova_estrutura.sql'}),
+    (4, 'migracao_004_economia_positiva.sql'),
+]
+SCHEMA_VERSION = MIGRACOES[-1][0]
+
+# Histórico completo percorrido por iterar_simulacoes (exportações)
+SQL_HISTORICO_SIMULACOES = """
+    SELECT s.*, d.nome as distribuidora_nome, e.nome as estado_nome
+    FROM simulacoes s
+    JOIN distribuidoras d ON s.distribuidora_id = d.id
+    JOIN estados e ON d.estado_id = e.id
+    ORDER BY s.created_at DESC
+"""
+
+# Campos que podem ser escolhidos em listar_simulacoes_paginado
+CAMPOS_SIMULACOES = {
+    'id': 's.id',
+    'created_at': 's.created_at',
+    'distribuidora_id': 's.distribuidora_id',
+    'distribuidora_nome': 'd.nome',
+    'estado_id': 'd.estado_id',
+    'estado_nome': 'e.nome',
+    'consumo_kwh': 's.consumo_kwh',
+    'desconto_aplicado': 's.desconto_aplicado',
+    'valor_economia': 's.valor_economia',
+    'ip_usuario': 's.ip_usuario',
+}
+
+def _codificar_cursor(created_at: str, simulacao_id: int) -> str:
+    """Cursor opaco com a chave (created_at, id) da última linha da página"""
+    return base64.urlsafe_b64encode(json.dumps([created_at, simulacao_id]).encode()).decode()
+
+def _decodificar_cursor(cursor: str) -> Tuple[str, int]:
+    try:
+        created_at, simulacao_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return str(created_at), int(simulacao_id)
+    except (ValueError, TypeError):
+        raise ValueError('Cursor inválido')
+
+def _normalizar_data(valor: str, fim: bool = False) -> str:
+    """Aceita 'AAAA-MM-DD' ou 'AAAA-MM-DD HH:MM:SS'; datas do fim incluem o dia todo"""
+    for formato in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d'):
+        try:
+            data = datetime.strptime(valor, formato)
+        except ValueError:
+            continue
+        if formato == '%Y-%m-%d' and fim:
+            return data.strftime('%Y-%m-%d 23:59:59')
+        return data.strftime('%Y-%m-%d %H:%M:%S')
+    raise ValueError(f'Data inválida: {valor}')
+
+def estrutura_regras(conn: sqlite3.Connection) -> str:
+    """
+    'nova' quando as regras ficam em faixas_consumo (schema_nova_estrutura.sql),
+    'original' quando regras_desconto tem as faixas (schema.sql)
+    """
+    existe = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'faixas_consumo'"
+    ).fetchone()
+    return 'nova' if existe else 'original'
+
+class ConnectionPool:
+    """
+    Pool limitado de conexões SQLite: uma conexão persistente por thread
+    
+    Cada thread reutiliza sempre a mesma conexão. Conexões de threads que
+    já terminaram são recicladas quando o limite é atingido, e close_all()
+    fecha todas no encerramento do processo.
+    """
+    
+    def __init__(self, db_path: str, max_conexoes: int = 32, timeout: float = 30.0):
+        self.db_path = db_path
+        self.max_conexoes = max_conexoes
+        self.timeout = timeout
+        self._local = threading.local()
+        self._conexoes: Dict[int, Tuple[threading.Thread, sqlite3.Connection]] = {}
+        self._condicao = threading.Condition()
+    
+    def _abrir(self) -> sqlite3.Connection:
+        """Abre uma conexão nova e aplica os PRAGMAs"""
+        # check_same_thread=False só para permitir o fechamento em close_all();
+        # cada conexão continua sendo usada apenas pela sua thread
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row  # Para acessar colunas por nome
+        for pragma in PRAGMAS_CONEXAO:
+            conn.execute(pragma)
+        return conn
+    
+    def abrir_avulsa(self) -> sqlite3.Connection:
+        """
+        Abre uma conexão com os mesmos PRAGMAs, mas fora do pool: não conta
+        no limite de conexões nem é fechada por close_all(); quem chama a fecha
+        """
+        return self._abrir()
+    
+    def _reciclar_threads_encerradas(self):
+        """Fecha conexões cujas threads donas já terminaram (chamado com lock)"""
+        for ident, (thread, conn) in list(self._conexoes.items()):
+            if not thread.is_alive():
+                conn.close()
+                del self._conexoes[ident]
+    
+    def get(self) -> sqlite3.Connection:
+        """Retorna a conexão da thread atual, abrindo-a se necessário"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return conn
+        
+        with self._condicao:
+            prazo = time.monotonic() + self.timeout
+            while len(self._conexoes) >= self.max_conexoes:
+                self._reciclar_threads_encerradas()
+                if len(self._conexoes) < self.max_conexoes:
+                    break
+                restante = prazo - time.monotonic()
+                if restante <= 0:
+                    raise sqlite3.OperationalError(
+                        f"Pool de conexões esgotado ({self.max_conexoes} conexões em uso)"
+                    )
+                # Acorda com release() ou periodicamente para reciclar threads encerradas
+                self._condicao.wait(min(restante, 0.5))
+            conn = self._abrir()
+            self._conexoes[threading.get_ident()] = (threading.current_thread(), conn)
+        
+        self._local.conn = conn
+        return conn
+    
+    def release(self):
+        """Fecha a conexão da thread atual e libera a vaga no pool"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+        self._local.conn = None
+        with self._condicao:
+            self._conexoes.pop(threading.get_ident(), None)
+            conn.close()
+            self._condicao.notify()
+    
+    def close_all(self):
+        """Fecha todas as conexões do pool (encerramento do processo)"""
+        with self._condicao:
+            for _, conn in self._conexoes.values():
+                conn.close()
+            self._conexoes.clear()
+            self._condicao.notify_all()
+        self._local = threading.local()
+
 class DatabaseManager:
     """Gerenciador do banco de dados SQLite para o sistema de simulação de descontos"""
     
-    def __init__(self, db_path: str = "database/sinergia.db"):
+    def __init__(self, db_path: str = "database/sinergia.db", max_conexoes: int = 32):
         self.db_path = db_path
         self.ensure_database_exists()
+        self.pool = ConnectionPool(db_path, max_conexoes)
+        self.write_behind = None
+        atexit.register(self.close)
     
     def ensure_database_exists(self):
-        """Garante que o banco de dados e as tabelas existam"""
+        """
+        Garante que o banco de dados e as tabelas existam
+        
+        Só lê PRAGMA user_version; o DDL roda apenas quando há migrações
+        pendentes. Bancos criados antes do controle de versão (com tabelas mas
+        user_version = 0) são marcados como já tendo o schema base.
+        """
         # Criar diretório se não existir
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
         
-        # Criar banco e tabelas
-        with sqlite3.connect(self.db_path) as conn:
+        with closing(sqlite3.connect(self.db_path)) as conn:
+            versao_atual = conn.execute("PRAGMA user_version").fetchone()[0]
+            if versao_atual >= SCHEMA_VERSION:
+                return
+            
+            if versao_atual == 0 and self._possui_tabelas(conn):
+                versao_atual = MIGRACOES[0][0]
+                conn.execute(f"PRAGMA user_version = {versao_atual}")
+            
+            self._aplicar_migracoes(conn, versao_atual)
+    
+    def _possui_tabelas(self, conn: sqlite3.Connection) -> bool:
+        """Indica se o banco já tem as tabelas principais"""
+        return conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'distribuidoras'"
+        ).fetchone() is not None
+    
+    def _aplicar_migracoes(self, conn: sqlite3.Connection, versao_atual: int):
+        """Executa as migrações posteriores à versão atual, uma a uma"""
+        for versao, arquivo in MIGRACOES:
+            if versao <= versao_atual:
+                continue
+            if isinstance(arquivo, dict):
+                arquivo = arquivo[estrutura_regras(conn)]
             # Ler e executar schema
-            schema_path = os.path.join(os.path.dirname(__file__), 'schema.sql')
+            schema_path = os.path.join(os.path.dirname(__file__), arquivo)
             with open(schema_path, 'r', encoding='utf-8') as f:
                 schema = f.read()
             conn.executescript(schema)
+            conn.execute(f"PRAGMA user_version = {versao}")
             conn.commit()
     
     def get_connection(self) -> sqlite3.Connection:
-        """Retorna uma conexão com o banco de dados"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Para acessar colunas por nome
-        return conn
+        """
+        Retorna a conexão persistente da thread atual
+        
+        Use com `with` para commit/rollback; a conexão não deve ser fechada,
+        ela volta a ser usada na próxima chamada da mesma thread.
+        """
+        return self.pool.get()
+    
+    def nova_conexao(self) -> sqlite3.Connection:
+        """
+        Abre uma conexão fora do pool, para leituras longas (ex.: exportações)
+        
+        Quem chama é responsável por fechá-la.
+        """
+        return self.pool.abrir_avulsa()
+    
+    def close(self):
+        """Esvazia a fila de write-behind e fecha todas as conexões"""
+        if self.write_behind is not None:
+            self.write_behind.parar()
+            self.write_behind = None
+        self.pool.close_all()
+    
+    def ativar_write_behind(self, spill_dir: Optional[str] = None,
+                            tamanho_lote: int = 500, intervalo: float = 1.0,
+                            sincronizar: bool = False):
+        """
+        Passa a gravar o histórico de simulações em segundo plano
+        
+        create_simulation e create_simulations_batch deixam de esperar o
+        INSERT e retornam None como ID. Com sincronizar=True cada registro do
+        spill recebe fsync (sobrevive a queda do sistema operacional, não só
+        do processo). Veja database/simulation_writer.py.
+        """
+        from database.simulation_writer import SimulationWriteBehind
+        
+        if self.write_behind is not None:
+            return self.write_behind
+        if spill_dir is None:
+            spill_dir = os.path.join(os.path.dirname(self.db_path), 'simulacoes_pendentes')
+        self.write_behind = SimulationWriteBehind(self, spill_dir, tamanho_lote, intervalo, sincronizar)
+        self.write_behind.iniciar()
+        return self.write_behind
     
     # MÉTODOS PARA ESTADOS
     def inserir_estado(self, nome: str, sigla: str) -> int:
@@ -89,7 +331,11 @@ class DatabaseManager:
     def create_simulation(self, estado_id: int, distribuidor_id: int, 
                          perfil_consumidor: str, kwh_consumido: float,
                          desconto_percentual: float, valor_desconto: float) -> int:
-        """Cria uma nova simulação no banco de dados"""
+        """Cria uma nova simulação no banco de dados (None no modo write-behind)"""
+        if self.write_behind is not None:
+            self.write_behind.enfileirar(distribuidor_id, kwh_consumido,
+                                         desconto_percentual, valor_desconto)
+            return None
         with self.get_connection() as conn:
             cursor = conn.execute("""
                 INSERT INTO simulacoes 
@@ -98,6 +344,31 @@ class DatabaseManager:
             """, (distribuidor_id, int(kwh_consumido), desconto_percentual, valor_desconto))
             return cursor.lastrowid
     
+    def create_simulations_batch(self, simulacoes: List[Tuple[int, float, float, float]]) -> List[int]:
+        """
+        Grava um lote de simulações em uma única transação
+        
+        Args:
+            simulacoes: tuplas (distribuidor_id, kwh_consumido, desconto_percentual, valor_desconto)
+        
+        Returns:
+            IDs gerados, na mesma ordem do lote (None no modo write-behind)
+        """
+        if self.write_behind is not None:
+            for simulacao in simulacoes:
+                self.write_behind.enfileirar(*simulacao)
+            return [None] * len(simulacoes)
+        ids = []
+        with self.get_connection() as conn:
+            for distribuidor_id, kwh_consumido, desconto_percentual, valor_desconto in simulacoes:
+                cursor = conn.execute("""
+                    INSERT INTO simulacoes 
+                    (distribuidora_id, consumo_kwh, desconto_aplicado, valor_economia)
+                    VALUES (?, ?, ?, ?)
+                """, (distribuidor_id, int(kwh_consumido), desconto_percentual, valor_desconto))
+                ids.append(cursor.lastrowid)
+        return ids
+    
     def get_all_simulations(self) -> List[Dict]:
         """Lista todas as simulações realizadas"""
         with self.get_connection() as conn:
@@ -110,6 +381,94 @@ class DatabaseManager:
             """)
             return [dict(row) for row in cursor.fetchall()]
     
+    def colunas_simulacoes(self) -> List[str]:
+        """Colunas das linhas de iterar_simulacoes (cursor.description, sem ler linhas)"""
+        with self.get_connection() as conn:
+            cursor = conn.execute(f"SELECT * FROM ({SQL_HISTORICO_SIMULACOES}) LIMIT 0")
+            return [coluna[0] for coluna in cursor.description]
+    
+    def iterar_simulacoes(self, tamanho_lote: int = 1000) -> Iterator[List[Dict]]:
+        """
+        Percorre todo o histórico (mesmo join de get_all_simulations) em lotes
+        
+        Usa fetchmany em uma conexão própria, então no máximo um lote fica em
+        memória por vez.
+        """
+        conn = self.nova_conexao()
+        try:
+            cursor = conn.execute(SQL_HISTORICO_SIMULACOES)
+            while True:
+                linhas = cursor.fetchmany(tamanho_lote)
+                if not linhas:
+                    break
+                yield [dict(row) for row in linhas]
+        finally:
+            conn.close()
+    
+    def listar_simulacoes_paginado(self, limite: int = 100, cursor: Optional[str] = None,
+                                   distribuidora_id: Optional[int] = None,
+                                   estado_id: Optional[int] = None,
+                                   data_inicio: Optional[str] = None,
+                                   data_fim: Optional[str] = None,
+                                   campos: Optional[List[str]] = None) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Lista simulações da mais recente para a mais antiga, uma página por vez
+        
+        A paginação é por chave (created_at, id): cada página parte do cursor
+        da anterior, sem OFFSET, então o custo não cresce com o histórico.
+        
+        Returns:
+            (linhas da página, cursor da próxima página ou None no fim)
+        """
+        if campos:
+            invalidos = [campo for campo in campos if campo not in CAMPOS_SIMULACOES]
+            if invalidos:
+                raise ValueError(f"Campos inválidos: {', '.join(invalidos)}")
+            # id e created_at formam o cursor e sempre acompanham a linha
+            selecionados = list(dict.fromkeys(['id', 'created_at'] + campos))
+            colunas = ', '.join(f"{CAMPOS_SIMULACOES[c]} as {c}" for c in selecionados)
+        else:
+            colunas = 's.*, d.nome as distribuidora_nome, e.nome as estado_nome'
+        
+        filtros = []
+        parametros = []
+        if cursor:
+            created_at, simulacao_id = _decodificar_cursor(cursor)
+            filtros.append("(s.created_at < ? OR (s.created_at = ? AND s.id < ?))")
+            parametros += [created_at, created_at, simulacao_id]
+        if distribuidora_id is not None:
+            filtros.append("s.distribuidora_id = ?")
+            parametros.append(distribuidora_id)
+        if estado_id is not None:
+            filtros.append("d.estado_id = ?")
+            parametros.append(estado_id)
+        if data_inicio:
+            filtros.append("s.created_at >= ?")
+            parametros.append(_normalizar_data(data_inicio))
+        if data_fim:
+            filtros.append("s.created_at <= ?")
+            parametros.append(_normalizar_data(data_fim, fim=True))
+        
+        where = f"WHERE {' AND '.join(filtros)}" if filtros else ""
+        with self.get_connection() as conn:
+            # Uma linha a mais indica se existe próxima página
+            linhas = conn.execute(f"""
+                SELECT {colunas}
+                FROM simulacoes s
+                JOIN distribuidoras d ON s.distribuidora_id = d.id
+                JOIN estados e ON d.estado_id = e.id
+                {where}
+                ORDER BY s.created_at DESC, s.id DESC
+                LIMIT ?
+            """, parametros + [limite + 1]).fetchall()
+        
+        pagina = [dict(row) for row in linhas[:limite]]
+        proximo_cursor = None
+        if len(linhas) > limite and pagina:
+            ultima = pagina[-1]
+            proximo_cursor = _codificar_cursor(ultima['created_at'], ultima['id'])
+        return pagina, proximo_cursor
+    
     # MÉTODOS PARA DISTRIBUIDORAS
     def inserir_distribuidora(self, nome: str, estado_id: int, consumo_minimo: int,
                             forma_pagamento: str, prazo_injecao: int,
@@ -131,6 +490,53 @@ class DatabaseManager:
                   icms_minimo, observacoes))
             return cursor.lastrowid
     
+    def inserir_distribuidoras_lote(self, distribuidoras: List[Dict], limpar: bool = False) -> List[int]:
+        """
+        Insere distribuidoras e suas regras de desconto em uma única transação
+        
+        Args:
+            distribuidoras: dicts com os campos de inserir_distribuidora (incluindo
+                estado_id) e 'regras_desconto', lista de dicts com os campos de
+                inserir_regra_desconto exceto distribuidora_id
+            limpar: apaga antes, na mesma transação, os dados de limpar_dados
+                exceto os estados (referenciados pelo lote); se a inserção
+                falhar, nada é apagado
+        
+        Returns:
+            IDs das distribuidoras, na mesma ordem da lista
+        """
+        ids = []
+        regras = []
+        with self.get_connection() as conn:
+            if limpar:
+                self._apagar_dados(conn, estados=False)
+            for dados in distribuidoras:
+                cursor = conn.execute("""
+                    INSERT INTO distribuidoras 
+                    (nome, estado_id, consumo_minimo, forma_pagamento, prazo_injecao,
+                     troca_titularidade, login_senha_necessario, aceita_placas, 
+                     icms_minimo, observacoes)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (dados['nome'], dados['estado_id'], dados['consumo_minimo'],
+                      dados['forma_pagamento'], dados['prazo_injecao'],
+                      dados.get('troca_titularidade', False),
+                      dados.get('login_senha_necessario', False),
+                      dados.get('aceita_placas', True), dados.get('icms_minimo', 17.0),
+                      dados.get('observacoes', '')))
+                ids.append(cursor.lastrowid)
+                regras.extend(
+                    (cursor.lastrowid, regra['consumo_min'], regra['consumo_max'],
+                     regra['desconto_percentual'], regra['tipo_bonus'], regra.get('descricao', ''))
+                    for regra in dados.get('regras_desconto', [])
+                )
+            conn.executemany("""
+                INSERT INTO regras_desconto 
+                (distribuidora_id, consumo_min, consumo_max, desconto_percentual, 
+                 tipo_bonus, descricao)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, regras)
+        return ids
+    
     def listar_distribuidoras_por_estado(self, estado_id: int) -> List[Dict]:
         """Lista distribuidoras de um estado específico"""
         with self.get_connection() as conn:
@@ -173,10 +579,13 @@ class DatabaseManager:
     def buscar_regras_desconto(self, distribuidora_id: int, consumo_kwh: int) -> List[Dict]:
         """Busca regras de desconto aplicáveis para um consumo específico"""
         with self.get_connection() as conn:
+            # O "+" impede o planejador de trocar idx_regras_distribuidora_desconto
+            # (já na ordem do desconto) por um intervalo em consumo_min seguido de
+            # ordenação; a faixa continua filtrada pelas colunas do índice
             cursor = conn.execute("""
                 SELECT * FROM regras_desconto 
                 WHERE distribuidora_id = ? 
-                AND consumo_min <= ?
+                AND +consumo_min <= ?
                 AND (consumo_max IS NULL OR consumo_max >= ?)
                 AND ativo = TRUE
                 ORDER BY desconto_percentual DESC
@@ -209,43 +618,116 @@ class DatabaseManager:
             return cursor.lastrowid
     
     def obter_estatisticas_simulacoes(self) -> Dict:
-        """Obtém estatísticas das simulações realizadas"""
+        """
+        Obtém estatísticas das simulações realizadas
+        
+        Lê os agregados mantidos por trigger (migracao_002_estatisticas.sql e
+        migracao_004_economia_positiva.sql), com custo proporcional ao número
+        de distribuidoras, não ao histórico. A média de economia considera só
+        as simulações com valor_economia > 0.
+        """
         with self.get_connection() as conn:
-            # Total de simulações
-            total = conn.execute("SELECT COUNT(*) as total FROM simulacoes").fetchone()['total']
+            # Total de simulações e média de economia
+            totais = conn.execute("""
+                SELECT COALESCE(SUM(total), 0) as total,
+                       SUM(soma_economia_positiva) as soma_economia_positiva,
+                       SUM(total_com_economia) as total_com_economia
+                FROM estatisticas_simulacoes_distribuidora
+            """).fetchone()
             
-            # Média de economia
-            media_economia = conn.execute(
-                "SELECT AVG(valor_economia) as media FROM simulacoes WHERE valor_economia > 0"
-            ).fetchone()['media'] or 0
+            media_economia = 0
+            if totais['total_com_economia']:
+                media_economia = totais['soma_economia_positiva'] / totais['total_com_economia']
             
             # Distribuidora mais simulada
             mais_simulada = conn.execute("""
-                SELECT d.nome, COUNT(*) as total
-                FROM simulacoes s
-                JOIN distribuidoras d ON s.distribuidora_id = d.id
-                GROUP BY s.distribuidora_id
-                ORDER BY total DESC
+                SELECT d.nome, es.total
+                FROM estatisticas_simulacoes_distribuidora es
+                JOIN distribuidoras d ON es.distribuidora_id = d.id
+                WHERE es.total > 0
+                ORDER BY es.total DESC
                 LIMIT 1
             """).fetchone()
             
             return {
-                'total_simulacoes': total,
+                'total_simulacoes': totais['total'],
                 'media_economia': round(media_economia, 2),
                 'distribuidora_mais_simulada': dict(mais_simulada) if mais_simulada else None
             }
     
+    def obter_estatisticas_por_distribuidora(self) -> List[Dict]:
+        """Contadores acumulados de cada distribuidora com simulações"""
+        with self.get_connection() as conn:
+            cursor = conn.execute("""
+                SELECT es.*, d.nome as distribuidora_nome
+                FROM estatisticas_simulacoes_distribuidora es
+                JOIN distribuidoras d ON es.distribuidora_id = d.id
+                WHERE es.total > 0
+                ORDER BY es.total DESC
+            """)
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def obter_estatisticas_diarias(self, distribuidora_id: Optional[int] = None,
+                                   data_inicio: Optional[str] = None,
+                                   data_fim: Optional[str] = None) -> List[Dict]:
+        """Agregados por distribuidora e dia, opcionalmente filtrados"""
+        filtros = ["total > 0"]
+        parametros = []
+        if distribuidora_id is not None:
+            filtros.append("distribuidora_id = ?")
+            parametros.append(distribuidora_id)
+        if data_inicio:
+            filtros.append("dia >= ?")
+            parametros.append(_normalizar_data(data_inicio)[:10])
+        if data_fim:
+            filtros.append("dia <= ?")
+            parametros.append(_normalizar_data(data_fim)[:10])
+        
+        with self.get_connection() as conn:
+            cursor = conn.execute(f"""
+                SELECT * FROM estatisticas_simulacoes_diarias
+                WHERE {' AND '.join(filtros)}
+                ORDER BY dia DESC, distribuidora_id
+            """, parametros)
+            return [dict(row) for row in cursor.fetchall()]
+    
+    @staticmethod
+    def _apagar_dados(conn: sqlite3.Connection, estados: bool = True):
+        """DELETEs de limpar_dados, sem commit (na transação de quem chama)"""
+        conn.execute("DELETE FROM simulacoes")
+        conn.execute("DELETE FROM estatisticas_simulacoes_diarias")
+        conn.execute("DELETE FROM estatisticas_simulacoes_distribuidora")
+        conn.execute("DELETE FROM regras_desconto")
+        conn.execute("DELETE FROM distribuidoras")
+        if estados:
+            conn.execute("DELETE FROM estados")
+
     def limpar_dados(self):
         """Remove todos os dados das tabelas (mantém estrutura)"""
         with self.get_connection() as conn:
-            conn.execute("DELETE FROM simulacoes")
-            conn.execute("DELETE FROM regras_desconto")
-            conn.execute("DELETE FROM distribuidoras")
-            conn.execute("DELETE FROM estados")
+            self._apagar_dados(conn)
             conn.commit()
 
-# Instância global do gerenciador
-db_manager = DatabaseManager()
+_instancia: Optional[DatabaseManager] = None
+_instancia_lock = threading.Lock()
+
+def get_db_manager() -> DatabaseManager:
+    """Retorna a instância global, criando-a no primeiro uso"""
+    global _instancia
+    if _instancia is None:
+        with _instancia_lock:
+            if _instancia is None:
+                _instancia = DatabaseManager()
+    return _instancia
+
+class _DatabaseManagerPreguicoso:
+    """Encaminha os acessos para a instância global, criada só quando usada"""
+    
+    def __getattr__(self, nome):
+        return getattr(get_db_manager(), nome)
+
+# Instância global do gerenciador (importar o módulo não abre o banco)
+db_manager = _DatabaseManagerPreguicoso()
 
 if __name__ == "__main__":
     # Teste básico
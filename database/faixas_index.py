@@ -0,0 +1,163 @@
+"""Índice de faixas de consumo por distribuidora com busca binária.
+
+As faixas de cada distribuidora são convertidas em segmentos disjuntos
+ordenados pelo kWh inicial, de modo que encontrar a faixa de um consumo é
+um único bisect, independente de quantas distribuidoras ou faixas existam.
+
+Quando faixas se sobrepõem (ex.: "100 kWh" sem limite na CEMIG e
+"1.000 a 5.000 kWh"), vale a faixa de maior consumo_min, que é a mais
+específica. verificar_faixas() aponta sobreposições e lacunas.
+"""
+
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+def _fim_exclusivo(faixa: Mapping) -> Optional[int]:
+    """Primeiro kWh fora da faixa (None = sem limite)"""
+    consumo_max = faixa.get('consumo_max')
+    return None if consumo_max is None else consumo_max + 1
+
+def _prioridade(faixa: Mapping):
+    """Ordem de preferência entre faixas que cobrem o mesmo consumo"""
+    fim = _fim_exclusivo(faixa)
+    return (faixa['consumo_min'],
+            -(fim if fim is not None else float('inf')),
+            -(faixa.get('ordem') or 0))
+
+def _descrever(faixa: Mapping) -> str:
+    """Nome legível da faixa para mensagens"""
+    if faixa.get('nome_faixa'):
+        return faixa['nome_faixa']
+    if faixa.get('consumo_max') is None:
+        return f"{faixa['consumo_min']}+ kWh"
+    return f"{faixa['consumo_min']} a {faixa['consumo_max']} kWh"
+
+class _SegmentosDistribuidora:
+    """Segmentos disjuntos [inicio, proximo_inicio) de uma distribuidora"""
+
+    __slots__ = ('inicios', 'faixas')
+
+    def __init__(self, faixas: List[Mapping]):
+        pontos = set()
+        for faixa in faixas:
+            pontos.add(faixa['consumo_min'])
+            fim = _fim_exclusivo(faixa)
+            if fim is not None:
+                pontos.add(fim)
+
+        self.inicios: List[int] = []
+        self.faixas: List[Optional[Mapping]] = []
+        for ponto in sorted(pontos):
+            cobrindo = [
+                f for f in faixas
+                if f['consumo_min'] <= ponto
+                and (_fim_exclusivo(f) is None or ponto < _fim_exclusivo(f))
+            ]
+            escolhida = max(cobrindo, key=_prioridade) if cobrindo else None
+            # Segmentos consecutivos da mesma faixa são unidos
+            if self.faixas and self.faixas[-1] is escolhida:
+                continue
+            self.inicios.append(ponto)
+            self.faixas.append(escolhida)
+
+    def buscar(self, consumo_kwh: int) -> Optional[Mapping]:
+        posicao = bisect_right(self.inicios, consumo_kwh) - 1
+        if posicao < 0:
+            return None
+        return self.faixas[posicao]
+
+class FaixasIndex:
+    """Índice de faixas de consumo agrupado por distribuidora_id"""
+
+    def __init__(self, faixas: Iterable[Mapping]):
+        por_distribuidora: Dict[int, List[Mapping]] = {}
+        for faixa in faixas:
+            if not faixa.get('ativo', True):
+                continue
+            por_distribuidora.setdefault(faixa['distribuidora_id'], []).append(faixa)
+
+        self._faixas = {
+            distribuidora_id: sorted(lista, key=lambda f: (f['consumo_min'], f.get('ordem') or 0))
+            for distribuidora_id, lista in por_distribuidora.items()
+        }
+        self._segmentos = {
+            distribuidora_id: _SegmentosDistribuidora(lista)
+            for distribuidora_id, lista in self._faixas.items()
+        }
+
+    def buscar_faixa(self, distribuidora_id: int, consumo_kwh: float) -> Optional[Mapping]:
+        """
+        Retorna a faixa aplicável ao consumo em O(log n), ou None se o consumo
+        estiver abaixo da primeira faixa ou em uma lacuna.
+
+        O consumo é truncado para kWh inteiro, como em simulacoes.consumo_kwh.
+        """
+        segmentos = self._segmentos.get(int(distribuidora_id))
+        if segmentos is None:
+            return None
+        return segmentos.buscar(int(consumo_kwh))
+
+    def segmentos(self, distribuidora_id: int) -> List[Tuple[int, Optional[Mapping]]]:
+        """
+        Segmentos da distribuidora como (kWh inicial, faixa), em ordem; cada
+        um vale até o início do seguinte (faixa None = lacuna)
+        """
+        segmentos = self._segmentos.get(int(distribuidora_id))
+        if segmentos is None:
+            return []
+        return list(zip(segmentos.inicios, segmentos.faixas))
+
+    def verificar_faixas(self, distribuidora_id: Optional[int] = None) -> List[Dict]:
+        """Lista sobreposições e lacunas entre faixas de cada distribuidora"""
+        if distribuidora_id is not None:
+            alvo = {distribuidora_id: self._faixas.get(distribuidora_id, [])}
+        else:
+            alvo = self._faixas
+
+        problemas = []
+        for dist_id, faixas in alvo.items():
+            anterior = None  # faixa que alcança mais longe até aqui
+            for faixa in faixas:
+                if anterior is not None:
+                    fim_anterior = _fim_exclusivo(anterior)
+                    if fim_anterior is None or faixa['consumo_min'] < fim_anterior:
+                        problemas.append({
+                            'distribuidora_id': dist_id,
+                            'tipo': 'sobreposicao',
+                            'faixa_id': anterior.get('id'),
+                            'outra_faixa_id': faixa.get('id'),
+                            'mensagem': f"'{_descrever(anterior)}' sobrepõe '{_descrever(faixa)}'"
+                        })
+                    elif faixa['consumo_min'] > fim_anterior:
+                        problemas.append({
+                            'distribuidora_id': dist_id,
+                            'tipo': 'lacuna',
+                            'faixa_id': anterior.get('id'),
+                            'outra_faixa_id': faixa.get('id'),
+                            'mensagem': f"Sem faixa entre {fim_anterior} e {faixa['consumo_min'] - 1} kWh"
+                        })
+
+                if anterior is None:
+                    anterior = faixa
+                else:
+                    fim_anterior = _fim_exclusivo(anterior)
+                    fim_atual = _fim_exclusivo(faixa)
+                    if fim_anterior is not None and (fim_atual is None or fim_atual > fim_anterior):
+                        anterior = faixa
+        return problemas
+
+if __name__ == "__main__":
+    import sqlite3
+
+    conn = sqlite3.connect('database/sinergia.db')
+    conn.row_factory = sqlite3.Row
+    faixas = [dict(row) for row in conn.execute("SELECT * FROM faixas_consumo")]
+    nomes = {row['id']: row['nome'] for row in conn.execute("SELECT id, nome FROM distribuidoras")}
+    conn.close()
+
+    indice = FaixasIndex(faixas)
+    problemas = indice.verificar_faixas()
+    print(f"Faixas verificadas: {len(faixas)} | Problemas encontrados: {len(problemas)}")
+    for problema in problemas:
+        nome = nomes.get(problema['distribuidora_id'], problema['distribuidora_id'])
+        print(f"  [{problema['tipo']}] {nome}: {problema['mensagem']}")
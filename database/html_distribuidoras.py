@@ -0,0 +1,54 @@
+"""Localização seletiva dos blocos de distribuidoras no index.html.
+
+Os carregadores só usam os <details class="faq-item"> da seção
+#distribuidoras, mas o index.html tem ~1800 linhas de markup, CSS e scripts.
+Em vez de montar a árvore BeautifulSoup do documento inteiro:
+
+- encontrar_details_distribuidoras usa um SoupStrainer para que o
+  BeautifulSoup só construa a subárvore da seção #distribuidoras
+  (DataLoader);
+- separar_fragmentos localiza os <details> com XPath sobre a árvore em C do
+  lxml e devolve o HTML de cada um como texto, para ser processado em outro
+  processo (ImprovedDataLoader).
+
+benchmark_html_parsing.py compara tempo e memória desses modos com o parse
+completo.
+"""
+
+from typing import List, Optional
+
+import lxml.html
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.element import Tag
+
+SECAO_DISTRIBUIDORAS = SoupStrainer('section', id='distribuidoras')
+
+# <details> de distribuidora dentro da seção #distribuidoras
+XPATH_SECAO = "//section[@id='distribuidoras']"
+XPATH_DISTRIBUIDORAS = (
+    XPATH_SECAO + "//details[contains(concat(' ', normalize-space(@class), ' '), ' faq-item ')]"
+)
+
+def encontrar_details_distribuidoras(html_content: str, parser: str = 'lxml') -> Optional[List[Tag]]:
+    """
+    Devolve os <details> das distribuidoras analisando apenas a seção
+    #distribuidoras (None se a seção não existir)
+    """
+    soup = BeautifulSoup(html_content, parser, parse_only=SECAO_DISTRIBUIDORAS)
+    secao = soup.find('section', id='distribuidoras')
+    if secao is None:
+        return None
+    return secao.find_all('details', class_='faq-item')
+
+def separar_fragmentos(html_content: str) -> Optional[List[str]]:
+    """
+    Localiza os <details> das distribuidoras com lxml e devolve o HTML de cada
+    um como texto independente (None se a seção não existir)
+    """
+    documento = lxml.html.fromstring(html_content)
+    if not documento.xpath(XPATH_SECAO):
+        return None
+    return [
+        lxml.html.tostring(details, encoding='unicode', with_tail=False)
+        for details in documento.xpath(XPATH_DISTRIBUIDORAS)
+    ]
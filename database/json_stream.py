@@ -0,0 +1,117 @@
+"""Leitura e escrita incrementais de arrays JSON.
+
+iterar_array_json devolve um a um os elementos do array de nível superior de
+um arquivo (como regras.json) lendo o arquivo em blocos, e escrever_array_json
+grava um iterável de objetos sem montar a lista inteira. A memória fica
+limitada ao maior elemento, não ao tamanho do arquivo. A saída de
+escrever_array_json é idêntica à de json.dump(lista, f, indent=...).
+"""
+
+import json
+from typing import Any, Iterable, Iterator, Optional, TextIO
+
+TAMANHO_BLOCO = 64 * 1024
+
+_decodificador = json.JSONDecoder()
+_ESPACOS = ' \t\n\r'
+
+def _pular_espacos(buffer: str, posicao: int) -> int:
+    while posicao < len(buffer) and buffer[posicao] in _ESPACOS:
+        posicao += 1
+    return posicao
+
+def iterar_array_json(arquivo: TextIO, tamanho_bloco: int = TAMANHO_BLOCO) -> Iterator[Any]:
+    """
+    Itera sobre os elementos do array JSON de nível superior de um arquivo
+
+    Args:
+        arquivo: arquivo de texto aberto para leitura
+        tamanho_bloco: caracteres lidos por vez
+
+    Raises:
+        ValueError: se o conteúdo não for um array JSON válido
+    """
+    buffer = ''
+    posicao = 0
+    fim_arquivo = False
+
+    def ler_mais():
+        nonlocal buffer, posicao, fim_arquivo
+        bloco = arquivo.read(tamanho_bloco)
+        if not bloco:
+            fim_arquivo = True
+        # Descarta o que já foi consumido para não acumular o arquivo todo
+        buffer = buffer[posicao:] + bloco
+        posicao = 0
+
+    def proximo_caractere():
+        nonlocal posicao
+        while True:
+            posicao = _pular_espacos(buffer, posicao)
+            if posicao < len(buffer):
+                return buffer[posicao]
+            if fim_arquivo:
+                raise ValueError("Fim inesperado do arquivo JSON")
+            ler_mais()
+
+    if proximo_caractere() != '[':
+        raise ValueError("O arquivo JSON não contém um array no nível superior")
+    posicao += 1
+
+    if proximo_caractere() == ']':
+        return
+
+    while True:
+        proximo_caractere()
+        while True:
+            try:
+                elemento, fim = _decodificador.raw_decode(buffer, posicao)
+            except json.JSONDecodeError as e:
+                if fim_arquivo:
+                    raise ValueError(f"JSON inválido: {e}") from e
+                ler_mais()
+                continue
+            # Um número no fim do buffer pode estar cortado ("12" de "12.5"):
+            # só aceita o elemento quando o separador seguinte já foi lido
+            seguinte = _pular_espacos(buffer, fim)
+            if not fim_arquivo and (seguinte == len(buffer) or buffer[seguinte] not in ',]'):
+                ler_mais()
+                continue
+            break
+        posicao = fim
+        yield elemento
+
+        separador = proximo_caractere()
+        posicao += 1
+        if separador == ']':
+            return
+        if separador != ',':
+            raise ValueError(f"Esperado ',' ou ']' no array JSON, encontrado {separador!r}")
+
+def escrever_array_json(arquivo: TextIO, elementos: Iterable[Any],
+                        indent: Optional[int] = 2, ensure_ascii: bool = False,
+                        default=None) -> int:
+    """
+    Grava os elementos como um array JSON, um de cada vez
+
+    Returns:
+        quantidade de elementos gravados
+    """
+    if indent is None:
+        separador, abertura, fechamento, recuo = ', ', '', '', ''
+    else:
+        recuo = ' ' * indent
+        separador, abertura, fechamento = ',\n', '\n', '\n'
+
+    total = 0
+    arquivo.write('[')
+    for elemento in elementos:
+        texto = json.dumps(elemento, ensure_ascii=ensure_ascii, indent=indent, default=default)
+        if recuo:
+            texto = texto.replace('\n', '\n' + recuo)
+        arquivo.write((separador if total else abertura) + recuo + texto)
+        total += 1
+    if total:
+        arquivo.write(fechamento)
+    arquivo.write(']')
+    return total
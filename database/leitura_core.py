@@ -0,0 +1,97 @@
+"""Leituras somente-leitura pelo SQLAlchemy Core, sem objetos ORM.
+
+Para exportação e serialização não há motivo para montar instâncias de
+Distribuidora, FaixaConsumo ou RegraDesconto (identity map, estado de
+sessão, um Decimal por célula) só para convertê-las em dict em seguida. As
+funções daqui executam select() sobre as tabelas dos models e devolvem Row
+(tuplas com nome, row.desconto_percentual / row._asdict()) ou dicts.
+
+A conversão Decimal -> float é decidida uma vez por coluna, na montagem da
+consulta: colunas DECIMAL(p, s) saem como ROUND(coluna, s), que o SQLite
+já devolve como REAL, então nenhum Decimal é criado e nenhuma conversão
+roda por valor em Python. O resultado é o mesmo de float(Decimal) do ORM.
+
+    with config.create_engine().connect() as conn:
+        regras = ler_tabela(conn, RegraDesconto, RegraDesconto.ativo == True)
+
+benchmark_leitura_core.py compara este caminho com o ORM em um banco
+inflado artificialmente.
+"""
+
+from typing import Dict, List
+
+from sqlalchemy import Float, Numeric, func, select, type_coerce
+
+from models import Distribuidora, Estado, FaixaConsumo, RegraDesconto, TipoBonus
+
+def coluna_leitura(coluna):
+    """Coluna como deve ser lida: DECIMAL vira float no próprio SQLite"""
+    if isinstance(coluna.type, Numeric) and coluna.type.asdecimal:
+        if coluna.type.scale is not None:
+            expressao = func.round(coluna, coluna.type.scale)
+        else:
+            expressao = coluna * 1.0
+        return type_coerce(expressao, Float).label(coluna.name)
+    return coluna
+
+def consulta_tabela(modelo, *criterios, ordem=None):
+    """select() de todas as colunas da tabela do model, ordenado por id por padrão"""
+    tabela = modelo.__table__
+    consulta = select(*(coluna_leitura(coluna) for coluna in tabela.columns))
+    if criterios:
+        consulta = consulta.where(*criterios)
+    return consulta.order_by(*(ordem if ordem is not None else tabela.primary_key.columns))
+
+def ler_tabela(conn, modelo, *criterios, ordem=None) -> List:
+    """Linhas da tabela do model como Row (tuplas com nome)"""
+    return conn.execute(consulta_tabela(modelo, *criterios, ordem=ordem)).all()
+
+def ler_dicts(conn, modelo, *criterios, ordem=None) -> List[Dict]:
+    """Linhas da tabela do model como dicts coluna -> valor"""
+    resultado = conn.execute(consulta_tabela(modelo, *criterios, ordem=ordem))
+    colunas = tuple(resultado.keys())
+    return [dict(zip(colunas, row)) for row in resultado]
+
+def regras_com_nomes(conn, distribuidora_id: int) -> List:
+    """
+    Regras ativas da distribuidora já com a faixa e o tipo de bônus, em uma
+    consulta: Row(id, faixa_consumo_id, nome_faixa, consumo_min, consumo_max,
+    tipo_bonus_id, tipo_bonus_codigo, desconto_percentual, desconto_opcional_1..4,
+    analise_credito, observacoes)
+    """
+    consulta = (
+        select(
+            RegraDesconto.id,
+            RegraDesconto.faixa_consumo_id,
+            FaixaConsumo.nome_faixa,
+            FaixaConsumo.consumo_min,
+            FaixaConsumo.consumo_max,
+            RegraDesconto.tipo_bonus_id,
+            TipoBonus.codigo.label('tipo_bonus_codigo'),
+            coluna_leitura(RegraDesconto.desconto_percentual),
+            coluna_leitura(RegraDesconto.desconto_opcional_1),
+            coluna_leitura(RegraDesconto.desconto_opcional_2),
+            coluna_leitura(RegraDesconto.desconto_opcional_3),
+            coluna_leitura(RegraDesconto.desconto_opcional_4),
+            RegraDesconto.analise_credito,
+            RegraDesconto.observacoes,
+        )
+        .join(FaixaConsumo, RegraDesconto.faixa_consumo_id == FaixaConsumo.id)
+        .join(TipoBonus, RegraDesconto.tipo_bonus_id == TipoBonus.id)
+        .where(
+            FaixaConsumo.distribuidora_id == distribuidora_id,
+            FaixaConsumo.ativo == True,
+            RegraDesconto.ativo == True
+        )
+        .order_by(FaixaConsumo.consumo_min, RegraDesconto.tipo_bonus_id)
+    )
+    return conn.execute(consulta).all()
+
+# Tabelas exportadas para static/data/, na mesma ordem de static_export
+MODELOS_EXPORTACAO = {
+    'distribuidoras': Distribuidora,
+    'estados': Estado,
+    'tipos_bonus': TipoBonus,
+    'faixas_consumo': FaixaConsumo,
+    'regras_desconto': RegraDesconto,
+}
@@ -0,0 +1,113 @@
+-- Migração 2: agregados de simulações mantidos incrementalmente
+-- Evita COUNT/AVG/GROUP BY sobre todo o histórico em obter_estatisticas_simulacoes
+
+-- Agregado por distribuidora e dia
+CREATE TABLE IF NOT EXISTS estatisticas_simulacoes_diarias (
+    distribuidora_id INTEGER NOT NULL,
+    dia DATE NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    soma_kwh INTEGER NOT NULL DEFAULT 0,
+    soma_economia DECIMAL(14,2) NOT NULL DEFAULT 0,
+    total_com_economia INTEGER NOT NULL DEFAULT 0, -- simulações com valor_economia > 0
+    min_kwh INTEGER,
+    max_kwh INTEGER,
+    min_economia DECIMAL(10,2),
+    max_economia DECIMAL(10,2),
+    PRIMARY KEY (distribuidora_id, dia),
+    FOREIGN KEY (distribuidora_id) REFERENCES distribuidoras(id)
+);
+
+-- Agregado acumulado por distribuidora (uma linha por distribuidora)
+CREATE TABLE IF NOT EXISTS estatisticas_simulacoes_distribuidora (
+    distribuidora_id INTEGER PRIMARY KEY,
+    total INTEGER NOT NULL DEFAULT 0,
+    soma_kwh INTEGER NOT NULL DEFAULT 0,
+    soma_economia DECIMAL(14,2) NOT NULL DEFAULT 0,
+    total_com_economia INTEGER NOT NULL DEFAULT 0,
+    min_kwh INTEGER,
+    max_kwh INTEGER,
+    min_economia DECIMAL(10,2),
+    max_economia DECIMAL(10,2),
+    FOREIGN KEY (distribuidora_id) REFERENCES distribuidoras(id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_estatisticas_diarias_dia ON estatisticas_simulacoes_diarias(dia);
+
+-- Carga inicial a partir do histórico existente
+INSERT INTO estatisticas_simulacoes_diarias
+    (distribuidora_id, dia, total, soma_kwh, soma_economia, total_com_economia,
+     min_kwh, max_kwh, min_economia, max_economia)
+SELECT distribuidora_id, date(created_at), COUNT(*), SUM(consumo_kwh),
+       COALESCE(SUM(valor_economia), 0),
+       SUM(CASE WHEN valor_economia > 0 THEN 1 ELSE 0 END),
+       MIN(consumo_kwh), MAX(consumo_kwh), MIN(valor_economia), MAX(valor_economia)
+FROM simulacoes
+GROUP BY distribuidora_id, date(created_at);
+
+INSERT INTO estatisticas_simulacoes_distribuidora
+    (distribuidora_id, total, soma_kwh, soma_economia, total_com_economia,
+     min_kwh, max_kwh, min_economia, max_economia)
+SELECT distribuidora_id, COUNT(*), SUM(consumo_kwh),
+       COALESCE(SUM(valor_economia), 0),
+       SUM(CASE WHEN valor_economia > 0 THEN 1 ELSE 0 END),
+       MIN(consumo_kwh), MAX(consumo_kwh), MIN(valor_economia), MAX(valor_economia)
+FROM simulacoes
+GROUP BY distribuidora_id;
+
+-- Cada simulação gravada atualiza os dois agregados
+CREATE TRIGGER IF NOT EXISTS trg_simulacoes_estatisticas_insert
+AFTER INSERT ON simulacoes
+BEGIN
+    INSERT INTO estatisticas_simulacoes_diarias
+        (distribuidora_id, dia, total, soma_kwh, soma_economia, total_com_economia,
+         min_kwh, max_kwh, min_economia, max_economia)
+    VALUES (NEW.distribuidora_id, date(COALESCE(NEW.created_at, CURRENT_TIMESTAMP)), 1,
+            NEW.consumo_kwh, COALESCE(NEW.valor_economia, 0),
+            CASE WHEN NEW.valor_economia > 0 THEN 1 ELSE 0 END,
+            NEW.consumo_kwh, NEW.consumo_kwh, NEW.valor_economia, NEW.valor_economia)
+    ON CONFLICT(distribuidora_id, dia) DO UPDATE SET
+        total = total + 1,
+        soma_kwh = soma_kwh + excluded.soma_kwh,
+        soma_economia = soma_economia + excluded.soma_economia,
+        total_com_economia = total_com_economia + excluded.total_com_economia,
+        min_kwh = min(COALESCE(min_kwh, excluded.min_kwh), excluded.min_kwh),
+        max_kwh = max(COALESCE(max_kwh, excluded.max_kwh), excluded.max_kwh),
+        min_economia = COALESCE(min(min_economia, excluded.min_economia), min_economia, excluded.min_economia),
+        max_economia = COALESCE(max(max_economia, excluded.max_economia), max_economia, excluded.max_economia);
+
+    INSERT INTO estatisticas_simulacoes_distribuidora
+        (distribuidora_id, total, soma_kwh, soma_economia, total_com_economia,
+         min_kwh, max_kwh, min_economia, max_economia)
+    VALUES (NEW.distribuidora_id, 1, NEW.consumo_kwh, COALESCE(NEW.valor_economia, 0),
+            CASE WHEN NEW.valor_economia > 0 THEN 1 ELSE 0 END,
+            NEW.consumo_kwh, NEW.consumo_kwh, NEW.valor_economia, NEW.valor_economia)
+    ON CONFLICT(distribuidora_id) DO UPDATE SET
+        total = total + 1,
+        soma_kwh = soma_kwh + excluded.soma_kwh,
+        soma_economia = soma_economia + excluded.soma_economia,
+        total_com_economia = total_com_economia + excluded.total_com_economia,
+        min_kwh = min(COALESCE(min_kwh, excluded.min_kwh), excluded.min_kwh),
+        max_kwh = max(COALESCE(max_kwh, excluded.max_kwh), excluded.max_kwh),
+        min_economia = COALESCE(min(min_economia, excluded.min_economia), min_economia, excluded.min_economia),
+        max_economia = COALESCE(max(max_economia, excluded.max_economia), max_economia, excluded.max_economia);
+END;
+
+-- Remoções descontam contagens e somas (mínimos e máximos não são recalculados)
+CREATE TRIGGER IF NOT EXISTS trg_simulacoes_estatisticas_delete
+AFTER DELETE ON simulacoes
+BEGIN
+    UPDATE estatisticas_simulacoes_diarias SET
+        total = total - 1,
+        soma_kwh = soma_kwh - OLD.consumo_kwh,
+        soma_economia = soma_economia - COALESCE(OLD.valor_economia, 0),
+        total_com_economia = total_com_economia - CASE WHEN OLD.valor_economia > 0 THEN 1 ELSE 0 END
+    WHERE distribuidora_id = OLD.distribuidora_id
+      AND dia = date(OLD.created_at);
+
+    UPDATE estatisticas_simulacoes_distribuidora SET
+        total = total - 1,
+        soma_kwh = soma_kwh - OLD.consumo_kwh,
+        soma_economia = soma_economia - COALESCE(OLD.valor_economia, 0),
+        total_com_economia = total_com_economia - CASE WHEN OLD.valor_economia > 0 THEN 1 ELSE 0 END
+    WHERE distribuidora_id = OLD.distribuidora_id;
+END;
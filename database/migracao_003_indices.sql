@@ -0,0 +1,24 @@
+-- Migração 3: índices compostos para as consultas quentes (estrutura original, schema.sql)
+-- A versão para schema_nova_estrutura.sql está em migracao_003_indices_nova_estrutura.sql.
+-- check_planos_consulta.py confere com EXPLAIN QUERY PLAN que nenhuma delas
+-- volta a fazer SCAN da tabela ou ordenar em B-tree temporária.
+
+-- listar_distribuidoras_por_estado: WHERE estado_id = ? ORDER BY nome, sem ordenação
+DROP INDEX IF EXISTS idx_distribuidoras_estado;
+CREATE INDEX IF NOT EXISTS idx_distribuidoras_estado_nome ON distribuidoras(estado_id, nome);
+
+-- buscar_regras_desconto: distribuidora e ativo na igualdade, já na ordem do
+-- maior desconto; a faixa de consumo é filtrada pelas colunas do próprio índice
+DROP INDEX IF EXISTS idx_regras_distribuidora;
+DROP INDEX IF EXISTS idx_regras_consumo;
+CREATE INDEX IF NOT EXISTS idx_regras_distribuidora_desconto
+    ON regras_desconto(distribuidora_id, ativo, desconto_percentual DESC, consumo_min, consumo_max);
+
+-- listar_regras_distribuidora e get_discount_rules_by_distributor: ORDER BY consumo_min
+CREATE INDEX IF NOT EXISTS idx_regras_distribuidora_consumo
+    ON regras_desconto(distribuidora_id, consumo_min, desconto_percentual DESC);
+
+-- Histórico de uma distribuidora na ordem de listar_simulacoes_paginado
+-- (get_all_simulations usa idx_simulacoes_data, que já leva o id no fim)
+DROP INDEX IF EXISTS idx_simulacoes_distribuidora;
+CREATE INDEX IF NOT EXISTS idx_simulacoes_distribuidora_data ON simulacoes(distribuidora_id, created_at);
@@ -0,0 +1,26 @@
+-- Migração 3: índices compostos para as consultas quentes (schema_nova_estrutura.sql)
+-- A versão para a estrutura original está em migracao_003_indices.sql.
+-- check_planos_consulta.py confere com EXPLAIN QUERY PLAN que nenhuma delas
+-- volta a fazer SCAN da tabela ou ordenar em B-tree temporária.
+
+-- listar_distribuidoras_por_estado: WHERE estado_id = ? ORDER BY nome, sem ordenação
+DROP INDEX IF EXISTS idx_distribuidoras_estado;
+CREATE INDEX IF NOT EXISTS idx_distribuidoras_estado_nome ON distribuidoras(estado_id, nome);
+
+-- vw_regras_completas por distribuidora: faixas ativas da distribuidora já com
+-- o intervalo de consumo no índice, e regras ativas de cada faixa. Os índices
+-- só de ativo (pouco seletivos) levavam o planejador a percorrer todas as regras.
+DROP INDEX IF EXISTS idx_faixas_distribuidora;
+DROP INDEX IF EXISTS idx_faixas_ativo;
+CREATE INDEX IF NOT EXISTS idx_faixas_distribuidora_ativo
+    ON faixas_consumo(distribuidora_id, ativo, consumo_min, consumo_max);
+
+DROP INDEX IF EXISTS idx_regras_faixa;
+DROP INDEX IF EXISTS idx_regras_ativo;
+CREATE INDEX IF NOT EXISTS idx_regras_faixa_ativo
+    ON regras_desconto(faixa_consumo_id, ativo, tipo_bonus_id, desconto_percentual);
+
+-- Histórico de uma distribuidora na ordem de listar_simulacoes_paginado
+-- (get_all_simulations usa idx_simulacoes_data, que já leva o id no fim)
+DROP INDEX IF EXISTS idx_simulacoes_distribuidora;
+CREATE INDEX IF NOT EXISTS idx_simulacoes_distribuidora_data ON simulacoes(distribuidora_id, created_at);
@@ -0,0 +1,94 @@
+-- Migração 4: soma só das economias positivas nos agregados de simulações
+-- A média de economia divide pelo total de simulações com valor_economia > 0;
+-- o numerador precisa considerar as mesmas simulações (soma_economia soma todas)
+
+ALTER TABLE estatisticas_simulacoes_diarias
+    ADD COLUMN soma_economia_positiva DECIMAL(14,2) NOT NULL DEFAULT 0;
+
+ALTER TABLE estatisticas_simulacoes_distribuidora
+    ADD COLUMN soma_economia_positiva DECIMAL(14,2) NOT NULL DEFAULT 0;
+
+-- Carga a partir do histórico existente
+UPDATE estatisticas_simulacoes_diarias SET soma_economia_positiva = COALESCE((
+    SELECT SUM(s.valor_economia)
+    FROM simulacoes s
+    WHERE s.distribuidora_id = estatisticas_simulacoes_diarias.distribuidora_id
+      AND date(s.created_at) = estatisticas_simulacoes_diarias.dia
+      AND s.valor_economia > 0
+), 0);
+
+UPDATE estatisticas_simulacoes_distribuidora SET soma_economia_positiva = COALESCE((
+    SELECT SUM(s.valor_economia)
+    FROM simulacoes s
+    WHERE s.distribuidora_id = estatisticas_simulacoes_distribuidora.distribuidora_id
+      AND s.valor_economia > 0
+), 0);
+
+-- Triggers da migração 2 recriados com a nova coluna
+DROP TRIGGER IF EXISTS trg_simulacoes_estatisticas_insert;
+DROP TRIGGER IF EXISTS trg_simulacoes_estatisticas_delete;
+
+CREATE TRIGGER trg_simulacoes_estatisticas_insert
+AFTER INSERT ON simulacoes
+BEGIN
+    INSERT INTO estatisticas_simulacoes_diarias
+        (distribuidora_id, dia, total, soma_kwh, soma_economia, total_com_economia,
+         soma_economia_positiva, min_kwh, max_kwh, min_economia, max_economia)
+    VALUES (NEW.distribuidora_id, date(COALESCE(NEW.created_at, CURRENT_TIMESTAMP)), 1,
+            NEW.consumo_kwh, COALESCE(NEW.valor_economia, 0),
+            CASE WHEN NEW.valor_economia > 0 THEN 1 ELSE 0 END,
+            CASE WHEN NEW.valor_economia > 0 THEN NEW.valor_economia ELSE 0 END,
+            NEW.consumo_kwh, NEW.consumo_kwh, NEW.valor_economia, NEW.valor_economia)
+    ON CONFLICT(distribuidora_id, dia) DO UPDATE SET
+        total = total + 1,
+        soma_kwh = soma_kwh + excluded.soma_kwh,
+        soma_economia = soma_economia + excluded.soma_economia,
+        total_com_economia = total_com_economia + excluded.total_com_economia,
+        soma_economia_positiva = soma_economia_positiva + excluded.soma_economia_positiva,
+        min_kwh = min(COALESCE(min_kwh, excluded.min_kwh), excluded.min_kwh),
+        max_kwh = max(COALESCE(max_kwh, excluded.max_kwh), excluded.max_kwh),
+        min_economia = COALESCE(min(min_economia, excluded.min_economia), min_economia, excluded.min_economia),
+        max_economia = COALESCE(max(max_economia, excluded.max_economia), max_economia, excluded.max_economia);
+
+    INSERT INTO estatisticas_simulacoes_distribuidora
+        (distribuidora_id, total, soma_kwh, soma_economia, total_com_economia,
+         soma_economia_positiva, min_kwh, max_kwh, min_economia, max_economia)
+    VALUES (NEW.distribuidora_id, 1, NEW.consumo_kwh, COALESCE(NEW.valor_economia, 0),
+            CASE WHEN NEW.valor_economia > 0 THEN 1 ELSE 0 END,
+            CASE WHEN NEW.valor_economia > 0 THEN NEW.valor_economia ELSE 0 END,
+            NEW.consumo_kwh, NEW.consumo_kwh, NEW.valor_economia, NEW.valor_economia)
+    ON CONFLICT(distribuidora_id) DO UPDATE SET
+        total = total + 1,
+        soma_kwh = soma_kwh + excluded.soma_kwh,
+        soma_economia = soma_economia + excluded.soma_economia,
+        total_com_economia = total_com_economia + excluded.total_com_economia,
+        soma_economia_positiva = soma_economia_positiva + excluded.soma_economia_positiva,
+        min_kwh = min(COALESCE(min_kwh, excluded.min_kwh), excluded.min_kwh),
+        max_kwh = max(COALESCE(max_kwh, excluded.max_kwh), excluded.max_kwh),
+        min_economia = COALESCE(min(min_economia, excluded.min_economia), min_economia, excluded.min_economia),
+        max_economia = COALESCE(max(max_economia, excluded.max_economia), max_economia, excluded.max_economia);
+END;
+
+-- Remoções descontam contagens e somas (mínimos e máximos não são recalculados)
+CREATE TRIGGER trg_simulacoes_estatisticas_delete
+AFTER DELETE ON simulacoes
+BEGIN
+    UPDATE estatisticas_simulacoes_diarias SET
+        total = total - 1,
+        soma_kwh = soma_kwh - OLD.consumo_kwh,
+        soma_economia = soma_economia - COALESCE(OLD.valor_economia, 0),
+        total_com_economia = total_com_economia - CASE WHEN OLD.valor_economia > 0 THEN 1 ELSE 0 END,
+        soma_economia_positiva = soma_economia_positiva
+            - CASE WHEN OLD.valor_economia > 0 THEN OLD.valor_economia ELSE 0 END
+    WHERE distribuidora_id = OLD.distribuidora_id
+      AND dia = date(OLD.created_at);
+
+    UPDATE estatisticas_simulacoes_distribuidora SET
+        total = total - 1,
+        soma_kwh = soma_kwh - OLD.consumo_kwh,
+        soma_economia = soma_economia - COALESCE(OLD.valor_economia, 0),
+        total_com_economia = total_com_economia - CASE WHEN OLD.valor_economia > 0 THEN 1 ELSE 0 END,
+        soma_economia_positiva = soma_economia_positiva
+            - CASE WHEN OLD.valor_economia > 0 THEN OLD.valor_economia ELSE 0 END
+    WHERE distribuidora_id = OLD.distribuidora_id;
+END;
@@ -3,6 +3,7 @@
 from sqlalchemy import create_engine, and_, or_, desc
 from sqlalchemy.orm import sessionmaker, joinedload
 from models import Base, Estado, Distribuidora, TipoBonus, FaixaConsumo, RegraDesconto, Simulacao
+from database.repositorio_regras import RepositorioRegras
 from decimal import Decimal
 
 def setup_database(db_path='database/sinergia.db'):
@@ -66,19 +67,28 @@ def exemplo_consultas_com_relacionamentos():
                 print(f"    Opcional: {regra.desconto_opcional_1}%")
             print()
         
-        # 2. Buscar distribuidoras com suas faixas e regras
-        distribuidora_com_regras = session.query(Distribuidora).options(
-            joinedload(Distribuidora.faixas_consumo).joinedload(FaixaConsumo.regras_desconto).joinedload(RegraDesconto.tipo_bonus)
-        ).filter(Distribuidora.nome.like('%CEMIG%')).first()
+        # 2. Buscar as regras ativas de uma distribuidora com faixa e bônus (uma consulta)
+        repositorio = RepositorioRegras(session)
+        cemig = session.query(Distribuidora).filter(Distribuidora.nome.like('%CEMIG%')).first()
+        
+        if cemig:
+            print(f"Regras da {cemig.nome}:")
+            faixa_atual = None
+            for regra in repositorio.regras_distribuidora(cemig.id):
+                if regra.faixa_consumo is not faixa_atual:
+                    faixa_atual = regra.faixa_consumo
+                    print(f"  Faixa: {faixa_atual.nome_faixa}")
+                print(f"    Bônus {regra.tipo_bonus.codigo}: {regra.desconto_percentual}%")
         
-        if distribuidora_com_regras:
-            print(f"Regras da {distribuidora_com_regras.nome}:")
-            for faixa in distribuidora_com_regras.faixas_consumo:
-                if faixa.ativo:
-                    print(f"  Faixa: {faixa.nome_faixa}")
-                    for regra in faixa.regras_desconto:
-                        if regra.ativo:
-                            print(f"    Bônus {regra.tipo_bonus.codigo}: {regra.desconto_percentual}%")
+        # 3. Árvore completa de um estado: distribuidoras, faixas, regras e bônus em 4 consultas
+        estado = repositorio.arvore_regras_estado('MG')
+        if estado:
+            total_regras = sum(
+                len(faixa.regras_desconto)
+                for distribuidora in estado.distribuidoras
+                for faixa in distribuidora.faixas_consumo
+            )
+            print(f"\n{estado.nome}: {len(estado.distribuidoras)} distribuidoras, {total_regras} regras ativas")
         
     finally:
         session.close()
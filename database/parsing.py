@@ -0,0 +1,133 @@
+"""Extração de valores das strings de regras (kWh, percentuais e bônus).
+
+Fonte única das funções usadas por load_regras_json.py e pelos carregadores
+de HTML. Os padrões são compilados uma vez e o resultado de cada string
+distinta fica em cache (LRU), já que os mesmos textos ("16% Bônus B",
+"100 kWh") se repetem centenas de vezes em uma importação.
+
+As funções não imprimem nada: quando recebem uma lista em `erros`, anexam um
+ErroExtracao para cada texto que não puderam interpretar. resumir_erros
+agrupa os erros repetidos para o relatório final.
+"""
+
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import List, NamedTuple, Optional, Tuple
+
+TAMANHO_CACHE = 4096
+
+_FAIXA = re.compile(r'(\d+)\s*a\s*(\d+)\s*kwh')
+_ACIMA_DE = re.compile(r'acima\s+de\s+(\d+)\s*kwh')
+_KWH = re.compile(r'(\d+)\s*kwh')
+_DESCONTO_BONUS = re.compile(r'(\d+(?:\.\d+)?)%\s*bônus\s*([a-z])')
+_NUMERO = re.compile(r'(\d+)')
+_PERCENTUAL = re.compile(r'(\d+(?:\.\d+)?)%')
+
+class ErroExtracao(NamedTuple):
+    """Texto que não pôde ser interpretado"""
+    campo: str
+    texto: str
+    mensagem: str
+
+    def __str__(self):
+        return self.mensagem
+
+def _registrar(erros: Optional[list], campo: str, texto: str, mensagem: str):
+    if erros is not None:
+        erros.append(ErroExtracao(campo, texto, mensagem))
+
+@lru_cache(maxsize=TAMANHO_CACHE)
+def _consumo_minimo_maximo(kwh_string: str) -> Tuple[Optional[int], Optional[int]]:
+    # Remove pontos de milhares e converte para minúsculas
+    kwh_clean = kwh_string.replace('.', '').lower()
+
+    # Padrão: "X a Y kwh"
+    match = _FAIXA.search(kwh_clean)
+    if match:
+        return int(match.group(1)), int(match.group(2))
+
+    # Padrão: "acima de X kwh" (acima = valor + 1)
+    match = _ACIMA_DE.search(kwh_clean)
+    if match:
+        return int(match.group(1)) + 1, None
+
+    # Padrão: "X kwh" (apenas mínimo)
+    match = _KWH.search(kwh_clean)
+    if match:
+        return int(match.group(1)), None
+
+    return None, None
+
+def extrair_consumo_minimo_maximo(kwh_string: str, erros: Optional[list] = None
+                                  ) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Extrai valores mínimo e máximo de consumo de strings como:
+    - "100 kWh" -> (100, None)
+    - "1.000 a 5.000 kWh" -> (1000, 5000)
+    - "Acima de 10.000 kWh" -> (10001, None)
+    """
+    if not kwh_string:
+        return None, None
+
+    resultado = _consumo_minimo_maximo(kwh_string)
+    if resultado[0] is None:
+        _registrar(erros, 'consumo', kwh_string,
+                   f"Não foi possível extrair consumo de '{kwh_string}'")
+    return resultado
+
+@lru_cache(maxsize=TAMANHO_CACHE)
+def _desconto_e_bonus(desconto_string: str) -> Tuple[Optional[float], Optional[str]]:
+    match = _DESCONTO_BONUS.search(desconto_string.lower())
+    if match:
+        return float(match.group(1)), match.group(2).upper()
+    return None, None
+
+def extrair_desconto_e_bonus(desconto_string: str, erros: Optional[list] = None
+                             ) -> Tuple[Optional[float], Optional[str]]:
+    """
+    Extrai percentual de desconto e código do bônus de strings como:
+    - "10% Bônus A" -> (10.0, 'A')
+    - "16% Bônus B" -> (16.0, 'B')
+    """
+    if not desconto_string:
+        return None, None
+
+    resultado = _desconto_e_bonus(desconto_string)
+    if resultado[0] is None:
+        _registrar(erros, 'desconto', desconto_string,
+                   f"Não foi possível extrair desconto de '{desconto_string}'")
+    return resultado
+
+@lru_cache(maxsize=TAMANHO_CACHE)
+def _numero(texto: str) -> Optional[int]:
+    match = _NUMERO.search(texto.replace('.', '').replace(',', ''))
+    return int(match.group(1)) if match else None
+
+def extrair_numero(texto: str, erros: Optional[list] = None) -> int:
+    """Extrai o primeiro número de um texto (ignora separadores de milhar); 0 se não houver"""
+    numero = _numero(texto)
+    if numero is None:
+        _registrar(erros, 'numero', texto, f"Nenhum número encontrado em '{texto}'")
+        return 0
+    return numero
+
+@lru_cache(maxsize=TAMANHO_CACHE)
+def _percentual(texto: str) -> Optional[float]:
+    match = _PERCENTUAL.search(texto)
+    return float(match.group(1)) if match else None
+
+def extrair_percentual(texto: str, erros: Optional[list] = None) -> float:
+    """Extrai o primeiro percentual ("15%", "17.5%") de um texto; 0.0 se não houver"""
+    percentual = _percentual(texto)
+    if percentual is None:
+        _registrar(erros, 'percentual', texto, f"Nenhum percentual encontrado em '{texto}'")
+        return 0.0
+    return percentual
+
+def resumir_erros(erros: List[ErroExtracao]) -> List[str]:
+    """Uma linha por erro distinto, com o número de ocorrências"""
+    return [
+        f"{erro.mensagem} ({total}x)" if total > 1 else erro.mensagem
+        for erro, total in Counter(erros).most_common()
+    ]
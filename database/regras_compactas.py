@@ -0,0 +1,295 @@
+"""Armazenamento compacto das regras de desconto em colunas (struct-of-arrays).
+
+É o armazenamento de regras do RuleSnapshot: em vez de um dict de 15 chaves
+congelado por linha de regras_desconto (mais as cópias por faixa), em cada
+worker do gunicorn, as regras ficam em arrays da stdlib, uma posição por
+regra, agrupadas por distribuidora:
+
+- distribuidoras em índices densos (0..n-1), com inicio_regras[i] e
+  inicio_regras[i + 1] delimitando as regras da distribuidora i;
+- ids, limites de faixa e tipo de bônus em array('i') (consumo_max -1 = sem
+  limite), percentuais em array('f') e analise_credito em array('b');
+- textos (nome da faixa, código do bônus, observações) internados uma vez em
+  uma tupla e referenciados por índice;
+- desconto_opcional_1..4, quase sempre NULL, só para as regras que têm
+  algum, em um dict posição -> tupla.
+
+Os percentuais são DECIMAL(5, 2) no banco; float32 tem precisão de sobra
+para eles e a leitura arredonda para 2 casas, devolvendo o valor exato.
+Os segmentos de faixa do FaixasIndex também ficam em arrays, então buscar
+as regras de um consumo é um bisect sem nenhum dict de faixa em memória.
+
+As consultas devolvem Regra, uma NamedTuple com os campos das linhas de
+CONSULTA_REGRAS, montada na hora a partir das colunas. Regra também aceita
+acesso por nome (regra['desconto_percentual'], regra.get(...)), como as
+linhas que o snapshot guardava antes.
+"""
+
+import sqlite3
+import sys
+from array import array
+from bisect import bisect_right
+from typing import Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+
+from database.faixas_index import FaixasIndex
+
+# Faixas e regras ativas na ordem do snapshot
+CONSULTA_FAIXAS = """
+    SELECT * FROM faixas_consumo
+    WHERE ativo = 1
+    ORDER BY distribuidora_id, consumo_min, ordem
+"""
+
+CONSULTA_REGRAS = """
+    SELECT r.id, fc.distribuidora_id, r.faixa_consumo_id,
+           fc.consumo_min, fc.consumo_max, fc.nome_faixa,
+           r.tipo_bonus_id, tb.codigo as tipo_bonus,
+           r.desconto_percentual, r.desconto_opcional_1,
+           r.desconto_opcional_2, r.desconto_opcional_3,
+           r.desconto_opcional_4, r.analise_credito, r.observacoes
+    FROM regras_desconto r
+    JOIN faixas_consumo fc ON r.faixa_consumo_id = fc.id
+    JOIN tipos_bonus tb ON r.tipo_bonus_id = tb.id
+    WHERE r.ativo = 1 AND fc.ativo = 1 AND tb.ativo = 1
+    ORDER BY fc.distribuidora_id, fc.consumo_min, fc.ordem, tb.codigo
+"""
+
+SEM_LIMITE = -1
+SEM_TEXTO = -1
+
+class Regra(NamedTuple):
+    """Regra de desconto com os campos de RuleSnapshot.get_discount_rules_by_distributor"""
+    id: int
+    distribuidora_id: int
+    faixa_consumo_id: int
+    consumo_min: int
+    consumo_max: Optional[int]
+    nome_faixa: Optional[str]
+    tipo_bonus_id: int
+    tipo_bonus: str
+    desconto_percentual: float
+    desconto_opcional_1: Optional[float]
+    desconto_opcional_2: Optional[float]
+    desconto_opcional_3: Optional[float]
+    desconto_opcional_4: Optional[float]
+    analise_credito: bool
+    observacoes: Optional[str]
+
+    # Acesso por nome, como nas linhas do banco (calcular_desconto, dict(regra))
+    def __getitem__(self, chave):
+        if isinstance(chave, str):
+            try:
+                return getattr(self, chave)
+            except AttributeError:
+                raise KeyError(chave) from None
+        return tuple.__getitem__(self, chave)
+
+    def get(self, chave: str, padrao=None):
+        return getattr(self, chave, padrao) if chave in self._fields else padrao
+
+    def keys(self) -> Tuple[str, ...]:
+        return self._fields
+
+OPCIONAIS = ('desconto_opcional_1', 'desconto_opcional_2', 'desconto_opcional_3', 'desconto_opcional_4')
+
+def _percentual(valor: float) -> float:
+    # float32 -> valor de 2 casas decimais gravado no banco
+    return round(valor, 2)
+
+class RegrasCompactas:
+    """Regras ativas por distribuidora em colunas, com busca por faixa de consumo"""
+
+    def __init__(self, regras: Iterable[Mapping], faixas: Iterable[Mapping]):
+        faixas = list(faixas)
+        por_distribuidora: Dict[int, List[Mapping]] = {}
+        for regra in regras:
+            por_distribuidora.setdefault(regra['distribuidora_id'], []).append(regra)
+        for faixa in faixas:
+            por_distribuidora.setdefault(faixa['distribuidora_id'], [])
+
+        self.distribuidoras = array('i', sorted(por_distribuidora))
+        self._indice: Dict[int, int] = {
+            distribuidora_id: indice for indice, distribuidora_id in enumerate(self.distribuidoras)
+        }
+
+        self.inicio_regras = array('i', [0])
+        self.regra_id = array('i')
+        self.faixa_id = array('i')
+        self.consumo_min = array('i')
+        self.consumo_max = array('i')
+        self.tipo_bonus_id = array('i')
+        self.desconto = array('f')
+        self.analise_credito = array('b')
+        self.nome_faixa = array('i')
+        self.tipo_bonus = array('i')
+        self.observacoes = array('i')
+        self.opcionais: Dict[int, Tuple[Optional[float], ...]] = {}
+
+        textos: Dict[str, int] = {}
+
+        def texto(valor):
+            return SEM_TEXTO if valor is None else textos.setdefault(valor, len(textos))
+
+        for distribuidora_id in self.distribuidoras:
+            for regra in por_distribuidora[distribuidora_id]:
+                posicao = len(self.regra_id)
+                self.regra_id.append(regra['id'])
+                self.faixa_id.append(regra['faixa_consumo_id'])
+                self.consumo_min.append(regra['consumo_min'])
+                consumo_max = regra['consumo_max']
+                self.consumo_max.append(SEM_LIMITE if consumo_max is None else consumo_max)
+                self.tipo_bonus_id.append(regra['tipo_bonus_id'])
+                self.desconto.append(float(regra['desconto_percentual']))
+                self.analise_credito.append(1 if regra['analise_credito'] else 0)
+                self.nome_faixa.append(texto(regra['nome_faixa']))
+                self.tipo_bonus.append(texto(regra['tipo_bonus']))
+                self.observacoes.append(texto(regra['observacoes']))
+                opcionais = tuple(regra[campo] for campo in OPCIONAIS)
+                if any(valor is not None for valor in opcionais):
+                    self.opcionais[posicao] = tuple(
+                        None if valor is None else float(valor) for valor in opcionais
+                    )
+            self.inicio_regras.append(len(self.regra_id))
+        self.textos: Tuple[str, ...] = tuple(textos)
+
+        # Segmentos de faixa: distribuidora i ocupa [inicio_segmentos[i], inicio_segmentos[i + 1])
+        indice_faixas = FaixasIndex(faixas)
+        self.inicio_segmentos = array('i', [0])
+        self.segmento_kwh = array('i')
+        self.segmento_faixa = array('i')
+        for distribuidora_id in self.distribuidoras:
+            for inicio, faixa in indice_faixas.segmentos(distribuidora_id):
+                self.segmento_kwh.append(inicio)
+                self.segmento_faixa.append(SEM_LIMITE if faixa is None else faixa['id'])
+            self.inicio_segmentos.append(len(self.segmento_kwh))
+
+    @classmethod
+    def do_snapshot(cls, snapshot) -> 'RegrasCompactas':
+        """Armazenamento de regras de um RuleSnapshot (o próprio, já compacto)"""
+        return snapshot.regras
+
+    @classmethod
+    def carregar(cls, conn: sqlite3.Connection) -> 'RegrasCompactas':
+        """
+        Lê faixas e regras com as consultas do RuleSnapshot, na transação
+        corrente da conexão; as linhas só existem durante a montagem
+        """
+        conn.row_factory = sqlite3.Row
+        faixas = [dict(row) for row in conn.execute(CONSULTA_FAIXAS)]
+        return cls(conn.execute(CONSULTA_REGRAS), faixas)
+
+    def __len__(self) -> int:
+        return len(self.regra_id)
+
+    def por_distribuidora(self) -> 'RegrasPorDistribuidora':
+        """Visão somente leitura distribuidora_id -> regras, só das que têm regras"""
+        return RegrasPorDistribuidora(self)
+
+    def _intervalo(self, distribuidora_id: int) -> Optional[int]:
+        return self._indice.get(int(distribuidora_id))
+
+    def _regra(self, posicao: int, distribuidora_id: int) -> Regra:
+        textos = self.textos
+        consumo_max = self.consumo_max[posicao]
+        nome_faixa = self.nome_faixa[posicao]
+        observacoes = self.observacoes[posicao]
+        opcionais = self.opcionais.get(posicao, (None, None, None, None))
+        return Regra(
+            self.regra_id[posicao],
+            distribuidora_id,
+            self.faixa_id[posicao],
+            self.consumo_min[posicao],
+            None if consumo_max == SEM_LIMITE else consumo_max,
+            None if nome_faixa == SEM_TEXTO else textos[nome_faixa],
+            self.tipo_bonus_id[posicao],
+            textos[self.tipo_bonus[posicao]],
+            _percentual(self.desconto[posicao]),
+            *opcionais,
+            bool(self.analise_credito[posicao]),
+            None if observacoes == SEM_TEXTO else textos[observacoes],
+        )
+
+    def regras(self, distribuidora_id: int) -> Tuple[Regra, ...]:
+        """Regras ativas da distribuidora, na ordem do snapshot"""
+        indice = self._intervalo(distribuidora_id)
+        if indice is None:
+            return ()
+        distribuidora_id = int(distribuidora_id)
+        return tuple(
+            self._regra(posicao, distribuidora_id)
+            for posicao in range(self.inicio_regras[indice], self.inicio_regras[indice + 1])
+        )
+
+    def faixa_consumo_id(self, distribuidora_id: int, consumo_kwh: float) -> Optional[int]:
+        """Faixa aplicável ao consumo (mesma escolha do FaixasIndex), ou None"""
+        indice = self._intervalo(distribuidora_id)
+        if indice is None:
+            return None
+        inicio, fim = self.inicio_segmentos[indice], self.inicio_segmentos[indice + 1]
+        posicao = bisect_right(self.segmento_kwh, int(consumo_kwh), inicio, fim) - 1
+        if posicao < inicio:
+            return None
+        faixa_id = self.segmento_faixa[posicao]
+        return None if faixa_id == SEM_LIMITE else faixa_id
+
+    def regras_por_consumo(self, distribuidora_id: int, consumo_kwh: float) -> Tuple[Regra, ...]:
+        """Regras da faixa aplicável ao consumo, maior desconto primeiro (como buscar_regras_desconto)"""
+        faixa_id = self.faixa_consumo_id(distribuidora_id, consumo_kwh)
+        if faixa_id is None:
+            return ()
+        indice = self._indice[int(distribuidora_id)]
+        posicoes = [
+            posicao for posicao in range(self.inicio_regras[indice], self.inicio_regras[indice + 1])
+            if self.faixa_id[posicao] == faixa_id
+        ]
+        posicoes.sort(key=self.desconto.__getitem__, reverse=True)
+        return tuple(self._regra(posicao, int(distribuidora_id)) for posicao in posicoes)
+
+    def desconto_regra(self, distribuidora_id: int, consumo_kwh: float, tipo_bonus_id: int) -> Optional[float]:
+        """Desconto da regra do tipo de bônus na faixa do consumo, sem montar Regra"""
+        faixa_id = self.faixa_consumo_id(distribuidora_id, consumo_kwh)
+        if faixa_id is None:
+            return None
+        indice = self._indice[int(distribuidora_id)]
+        for posicao in range(self.inicio_regras[indice], self.inicio_regras[indice + 1]):
+            if self.faixa_id[posicao] == faixa_id and self.tipo_bonus_id[posicao] == tipo_bonus_id:
+                return _percentual(self.desconto[posicao])
+        return None
+
+    def bytes_ocupados(self) -> int:
+        """Tamanho aproximado em memória: arrays, textos, opcionais e índice"""
+        colunas = (
+            self.distribuidoras, self.inicio_regras, self.regra_id, self.faixa_id,
+            self.consumo_min, self.consumo_max, self.tipo_bonus_id, self.desconto,
+            self.analise_credito, self.nome_faixa, self.tipo_bonus, self.observacoes,
+            self.inicio_segmentos, self.segmento_kwh, self.segmento_faixa,
+        )
+        total = sum(sys.getsizeof(coluna) for coluna in colunas)
+        total += sys.getsizeof(self.textos) + sum(sys.getsizeof(texto) for texto in self.textos)
+        total += sys.getsizeof(self.opcionais) + sum(
+            sys.getsizeof(valores) + sum(sys.getsizeof(v) for v in valores if v is not None)
+            for valores in self.opcionais.values()
+        )
+        total += sys.getsizeof(self._indice)
+        return total
+
+class RegrasPorDistribuidora(Mapping):
+    """distribuidora_id -> tupla de Regra, montada a cada acesso a partir das colunas"""
+
+    def __init__(self, regras: RegrasCompactas):
+        self._regras = regras
+
+    def __getitem__(self, distribuidora_id: int) -> Tuple[Regra, ...]:
+        resultado = self._regras.regras(distribuidora_id)
+        if not resultado:
+            raise KeyError(distribuidora_id)
+        return resultado
+
+    def __iter__(self) -> Iterator[int]:
+        inicio = self._regras.inicio_regras
+        for indice, distribuidora_id in enumerate(self._regras.distribuidoras):
+            if inicio[indice + 1] > inicio[indice]:
+                yield distribuidora_id
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
@@ -0,0 +1,84 @@
+"""Consultas ORM com estratégias de carregamento nomeadas.
+
+Os relacionamentos de models.py são lazy: percorrer
+distribuidora.faixas_consumo -> faixa.regras_desconto -> regra.tipo_bonus em
+um loop emite um SELECT por objeto (N+1). Para cada formato de leitura comum
+há aqui uma estratégia nomeada (ESTRATEGIAS) que carrega a árvore inteira em
+um número fixo de consultas, independente da quantidade de linhas:
+
+- 'arvore_regras_estado': estado -> distribuidoras -> faixas -> regras ->
+  tipo de bônus, só ativos (4 consultas);
+- 'regras_distribuidora': regras com faixa e tipo de bônus (1 consulta);
+- 'historico_com_nomes': simulações com distribuidora, estado, faixa e tipo
+  de bônus (1 consulta).
+
+Coleções usam selectinload (uma consulta por nível, sem multiplicar linhas)
+e referências muitos-para-um usam joinedload. check_repositorio_consultas.py
+confere o número exato de consultas de cada estratégia.
+"""
+
+from typing import List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload, selectinload
+
+from models import Distribuidora, Estado, FaixaConsumo, RegraDesconto, Simulacao
+
+ESTRATEGIAS = {
+    'arvore_regras_estado': (
+        selectinload(Estado.distribuidoras.and_(Distribuidora.ativo == True))
+        .selectinload(Distribuidora.faixas_consumo.and_(FaixaConsumo.ativo == True))
+        .selectinload(FaixaConsumo.regras_desconto.and_(RegraDesconto.ativo == True))
+        .joinedload(RegraDesconto.tipo_bonus),
+    ),
+    'regras_distribuidora': (
+        joinedload(RegraDesconto.faixa_consumo),
+        joinedload(RegraDesconto.tipo_bonus),
+    ),
+    'historico_com_nomes': (
+        joinedload(Simulacao.distribuidora).joinedload(Distribuidora.estado),
+        joinedload(Simulacao.faixa_consumo),
+        joinedload(Simulacao.tipo_bonus),
+    ),
+}
+
+def com_estrategia(modelo, estrategia: str):
+    """select(modelo) já com as opções de carregamento da estratégia nomeada"""
+    if estrategia not in ESTRATEGIAS:
+        raise ValueError(f"Estratégia de carregamento desconhecida: {estrategia}")
+    return select(modelo).options(*ESTRATEGIAS[estrategia])
+
+class RepositorioRegras:
+    """Leituras de regras e histórico sobre uma sessão, sem N+1"""
+
+    def __init__(self, session):
+        self.session = session
+
+    def arvore_regras_estado(self, sigla: str) -> Optional[Estado]:
+        """
+        Estado com distribuidoras, faixas, regras e tipos de bônus ativos
+        carregados (estado.distribuidoras[...].faixas_consumo[...].regras_desconto)
+        """
+        consulta = com_estrategia(Estado, 'arvore_regras_estado').where(Estado.sigla == sigla.upper())
+        return self.session.scalars(consulta).first()
+
+    def regras_distribuidora(self, distribuidora_id: int) -> List[RegraDesconto]:
+        """Regras ativas da distribuidora com regra.faixa_consumo e regra.tipo_bonus carregados"""
+        faixas_distribuidora = select(FaixaConsumo.id).where(
+            FaixaConsumo.distribuidora_id == distribuidora_id,
+            FaixaConsumo.ativo == True
+        )
+        consulta = com_estrategia(RegraDesconto, 'regras_distribuidora').where(
+            RegraDesconto.faixa_consumo_id.in_(faixas_distribuidora),
+            RegraDesconto.ativo == True
+        ).order_by(RegraDesconto.faixa_consumo_id, RegraDesconto.tipo_bonus_id)
+        return list(self.session.scalars(consulta))
+
+    def historico_com_nomes(self, limite: int = 100,
+                            distribuidora_id: Optional[int] = None) -> List[Simulacao]:
+        """Simulações mais recentes com distribuidora (e estado), faixa e tipo de bônus carregados"""
+        consulta = com_estrategia(Simulacao, 'historico_com_nomes')
+        if distribuidora_id is not None:
+            consulta = consulta.where(Simulacao.distribuidora_id == distribuidora_id)
+        consulta = consulta.order_by(Simulacao.id.desc()).limit(limite)
+        return list(self.session.scalars(consulta))
@@ -0,0 +1,161 @@
+"""Snapshot imutável das regras de simulação mantido em memória.
+
+O caminho de simulação (/api/simular) consulta apenas este snapshot, sem
+nenhuma leitura no sinergia.db. O snapshot é carregado uma vez na
+inicialização e substituído por inteiro em uma recarga.
+
+As regras de desconto ficam em RegrasCompactas (colunas em arrays); as
+linhas lidas do banco só existem durante a montagem. As consultas de regras
+devolvem Regra, que aceita acesso por nome como as linhas do banco.
+
+As consultas usam a nova estrutura (faixas_consumo, tipos_bonus); um banco
+criado só pelo schema.sql (estrutura original) é recusado com
+EstruturaRegrasIncompativel em vez de falhar com "no such table".
+"""
+
+import sqlite3
+import threading
+from datetime import datetime
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from database.db_manager import estrutura_regras
+from database.faixas_index import FaixasIndex
+from database.regras_compactas import CONSULTA_FAIXAS, CONSULTA_REGRAS, Regra, RegrasCompactas
+from database.tabela_cotacao import Cotacao, TabelaCotacao
+
+class EstruturaRegrasIncompativel(RuntimeError):
+    """O banco não tem as tabelas da nova estrutura usadas pelo snapshot"""
+
+def _congelar(row: Mapping) -> Mapping:
+    """Converte uma linha em um mapeamento somente leitura"""
+    return MappingProxyType(dict(row))
+
+class RuleSnapshot:
+    """Fotografia somente leitura de distribuidoras, faixas, regras e bônus"""
+
+    def __init__(self, distribuidoras: Dict[int, Mapping],
+                 faixas_consumo: Dict[int, Tuple[Mapping, ...]],
+                 regras_desconto: Iterable[Mapping],
+                 tipos_bonus: Dict[int, Mapping],
+                 versao: int = 1):
+        """
+        Args:
+            regras_desconto: linhas de CONSULTA_REGRAS, em qualquer forma de
+                mapeamento; não são guardadas, só convertidas em colunas
+        """
+        self.distribuidoras = MappingProxyType(distribuidoras)
+        self.faixas_consumo = MappingProxyType(faixas_consumo)
+        self.tipos_bonus = MappingProxyType(tipos_bonus)
+        self.versao = versao
+        self.carregado_em = datetime.now()
+
+        faixas = [faixa for lista in faixas_consumo.values() for faixa in lista]
+        self.indice_faixas = FaixasIndex(faixas)
+        regras_desconto = list(regras_desconto)
+        self.regras = RegrasCompactas(regras_desconto, faixas)
+        # distribuidora_id -> regras, montadas das colunas a cada acesso
+        self.regras_desconto = self.regras.por_distribuidora()
+        self.tabela_cotacao = TabelaCotacao(
+            self.distribuidoras, self.indice_faixas, regras_desconto, self.tipos_bonus.keys()
+        )
+
+    @classmethod
+    def carregar(cls, conn: sqlite3.Connection, versao: int = 1) -> 'RuleSnapshot':
+        """Lê todas as tabelas de regras em uma única transação de leitura"""
+        if estrutura_regras(conn) != 'nova':
+            raise EstruturaRegrasIncompativel(
+                "O banco está na estrutura original (schema.sql), sem faixas_consumo; "
+                "o snapshot de regras exige a nova estrutura. Crie o banco com "
+                "recreate_database.py ou migre com migrate_to_new_structure.py."
+            )
+        conn.row_factory = sqlite3.Row
+        conn.execute("BEGIN")
+        try:
+            distribuidoras = {
+                row['id']: _congelar(row)
+                for row in conn.execute("""
+                    SELECT d.*, e.nome as estado_nome, e.sigla as estado_sigla
+                    FROM distribuidoras d
+                    JOIN estados e ON d.estado_id = e.id
+                    WHERE d.ativo = 1
+                """)
+            }
+
+            tipos_bonus = {
+                row['id']: _congelar(row)
+                for row in conn.execute("SELECT * FROM tipos_bonus WHERE ativo = 1")
+            }
+
+            faixas: Dict[int, List[Mapping]] = {}
+            for row in conn.execute(CONSULTA_FAIXAS):
+                faixas.setdefault(row['distribuidora_id'], []).append(_congelar(row))
+
+            # Linhas cruas: viram colunas em RegrasCompactas e são descartadas
+            regras = conn.execute(CONSULTA_REGRAS).fetchall()
+        finally:
+            conn.rollback()
+
+        return cls(
+            distribuidoras,
+            {k: tuple(v) for k, v in faixas.items()},
+            regras,
+            tipos_bonus,
+            versao
+        )
+
+    def get_distributor_by_id(self, distribuidor_id: int) -> Optional[Mapping]:
+        """Equivalente em memória de DatabaseManager.get_distributor_by_id"""
+        return self.distribuidoras.get(int(distribuidor_id))
+
+    def get_discount_rules_by_distributor(self, distribuidor_id: int) -> Tuple[Regra, ...]:
+        """Equivalente em memória de DatabaseManager.get_discount_rules_by_distributor"""
+        return self.regras.regras(distribuidor_id)
+
+    def get_bands_by_distributor(self, distribuidor_id: int) -> Tuple[Mapping, ...]:
+        """Faixas de consumo ativas de uma distribuidora, ordenadas por consumo_min"""
+        return self.faixas_consumo.get(int(distribuidor_id), ())
+
+    def get_band(self, distribuidor_id: int, consumo_kwh: float) -> Optional[Mapping]:
+        """Faixa de consumo aplicável, via busca binária no índice de faixas"""
+        return self.indice_faixas.buscar_faixa(distribuidor_id, consumo_kwh)
+
+    def buscar_regras_desconto(self, distribuidor_id: int, consumo_kwh: float) -> Tuple[Regra, ...]:
+        """Regras da faixa aplicável ao consumo, maior desconto primeiro"""
+        return self.regras.regras_por_consumo(distribuidor_id, consumo_kwh)
+
+    def buscar_tipo_bonus(self, tipo_bonus) -> Optional[Mapping]:
+        """Tipo de bônus ativo pelo ID ou pelo código ("B")"""
+        if isinstance(tipo_bonus, str) and not tipo_bonus.isdigit():
+            codigo = tipo_bonus.strip().upper()
+            return next((tb for tb in self.tipos_bonus.values() if tb['codigo'] == codigo), None)
+        return self.tipos_bonus.get(int(tipo_bonus))
+
+    def cotar(self, distribuidor_id: int, consumo_kwh: float, tipo_bonus_id: int) -> Optional[Cotacao]:
+        """Cotação pela tabela pré-calculada (um bisect); None se não houver tabela"""
+        return self.tabela_cotacao.cotar(distribuidor_id, consumo_kwh, tipo_bonus_id)
+
+class RuleSnapshotStore:
+    """Mantém o snapshot corrente do processo e o troca atomicamente na recarga"""
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+        self._snapshot: Optional[RuleSnapshot] = None
+        self._lock = threading.Lock()
+
+    @property
+    def snapshot(self) -> RuleSnapshot:
+        """Retorna o snapshot corrente, carregando-o no primeiro acesso"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self.recarregar()
+        return snapshot
+
+    def recarregar(self) -> RuleSnapshot:
+        """Monta um novo snapshot e o publica com uma única atribuição"""
+        with self._lock:
+            versao = self._snapshot.versao + 1 if self._snapshot else 1
+            novo = RuleSnapshot.carregar(self.db_manager.get_connection(), versao)
+            # Leitores em andamento continuam com a referência antiga
+            self._snapshot = novo
+            return novo
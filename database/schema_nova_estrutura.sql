@@ -88,6 +88,16 @@ CREATE TABLE IF NOT EXISTS simulacoes (
     FOREIGN KEY (tipo_bonus_id) REFERENCES tipos_bonus(id)
 );
 
+-- Controle da sincronização incremental de regras.json (hash por entrada)
+CREATE TABLE IF NOT EXISTS sincronizacao_regras (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    chave VARCHAR(100) NOT NULL UNIQUE, -- campo "id" da entrada, ex: cemig-mg
+    distribuidora_id INTEGER NOT NULL,
+    hash_conteudo VARCHAR(64) NOT NULL, -- SHA-256 da entrada
+    sincronizado_em TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (distribuidora_id) REFERENCES distribuidoras(id)
+);
+
 -- Índices para otimização
 CREATE INDEX IF NOT EXISTS idx_distribuidoras_estado ON distribuidoras(estado_id);
 CREATE INDEX IF NOT EXISTS idx_distribuidoras_ativo ON distribuidoras(ativo);
@@ -0,0 +1,81 @@
+"""Exportação incremental do histórico de simulações em NDJSON ou CSV.
+
+Os geradores recebem os lotes de DatabaseManager.iterar_simulacoes e
+produzem um bloco de texto por lote, de modo que a exportação completa nunca
+mantém mais de um lote em memória. São usados pelo endpoint
+/api/simulacoes/exportar e pela linha de comando:
+
+    python -m database.simulation_export --formato csv --saida simulacoes.csv
+"""
+
+import csv
+import io
+import json
+from typing import Dict, Iterable, Iterator, List, Optional
+
+FORMATOS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+def gerar_ndjson(lotes: Iterable[List[Dict]]) -> Iterator[str]:
+    """Um objeto JSON por linha, um bloco por lote"""
+    for lote in lotes:
+        yield ''.join(json.dumps(linha, ensure_ascii=False, default=str) + '\n' for linha in lote)
+
+def gerar_csv(lotes: Iterable[List[Dict]], colunas: Optional[List[str]] = None) -> Iterator[str]:
+    """
+    CSV com cabeçalho; com as colunas informadas (DatabaseManager.colunas_simulacoes)
+    o cabeçalho sai mesmo sem nenhuma linha, senão vem do primeiro lote
+    """
+    escritor = None
+    buffer = io.StringIO()
+    if colunas is not None:
+        escritor = csv.DictWriter(buffer, fieldnames=colunas)
+        escritor.writeheader()
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    for lote in lotes:
+        if escritor is None:
+            escritor = csv.DictWriter(buffer, fieldnames=list(lote[0].keys()))
+            escritor.writeheader()
+        escritor.writerows(lote)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+def exportar(lotes: Iterable[List[Dict]], formato: str,
+             colunas: Optional[List[str]] = None) -> Iterator[str]:
+    """Seleciona o gerador do formato pedido (colunas: cabeçalho do CSV)"""
+    if formato == 'ndjson':
+        return gerar_ndjson(lotes)
+    if formato == 'csv':
+        return gerar_csv(lotes, colunas)
+    raise ValueError(f"Formato inválido: {formato} (use {' ou '.join(FORMATOS)})")
+
+def main():
+    """Exporta o histórico completo para um arquivo ou para a saída padrão"""
+    import argparse
+    import sys
+    from database.db_manager import DatabaseManager
+
+    parser = argparse.ArgumentParser(description='Exporta o histórico de simulações')
+    parser.add_argument('--formato', choices=list(FORMATOS), default='ndjson')
+    parser.add_argument('--saida', help='arquivo de destino (padrão: saída padrão)')
+    parser.add_argument('--lote', type=int, default=5000, help='linhas por fetchmany')
+    args = parser.parse_args()
+
+    db = DatabaseManager()
+    blocos = exportar(db.iterar_simulacoes(args.lote), args.formato, db.colunas_simulacoes())
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8', newline='') as f:
+            for bloco in blocos:
+                f.write(bloco)
+        print(f"Histórico exportado para {args.saida}", file=sys.stderr)
+    else:
+        for bloco in blocos:
+            sys.stdout.write(bloco)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""Gravação assíncrona (write-behind) do histórico de simulações.
+
+No modo write-behind, create_simulation apenas enfileira o registro e
+retorna; uma thread em segundo plano grava os registros em lote com
+executemany, em uma transação por lote, quando a fila atinge o tamanho do
+lote ou quando o intervalo máximo passa.
+
+Cada registro enfileirado é antes anexado a um arquivo de segmento (JSONL)
+no diretório de spill. Um segmento só é apagado depois que o lote
+correspondente foi confirmado no banco, e segmentos que sobrarem de um
+processo interrompido são regravados na próxima inicialização. O segmento
+fica travado (flock) até o commit e a remoção, então um worker que inicia ao
+mesmo tempo não regrava um lote já confirmado. A garantia é
+"pelo menos uma vez": uma queda entre o commit e a remoção do segmento pode
+duplicar aquele lote, o que é aceitável para dados de analytics.
+
+Durabilidade do spill: por padrão cada registro só recebe flush() (vai para
+o cache do sistema operacional), o que sobrevive à queda do processo, mas
+não à do sistema operacional ou a uma falta de energia; nesses casos podem
+se perder os registros ainda não gravados no banco (até um intervalo ou um
+lote). Com sincronizar=True cada registro recebe também fsync antes de
+enfileirar retornar, ao custo de uma escrita síncrona em disco por
+simulação.
+
+Depois de parar() (ex.: close() pelo atexit com requisições ainda em
+andamento) enfileirar grava o registro direto no banco, como o modo
+síncrono.
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+SQL_INSERT = """
+    INSERT INTO simulacoes
+    (distribuidora_id, consumo_kwh, desconto_aplicado, valor_economia, created_at)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+def _travar(arquivo) -> bool:
+    """Tenta travar o arquivo de forma exclusiva sem bloquear"""
+    try:
+        if fcntl is not None:
+            fcntl.flock(arquivo.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(arquivo.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+def _descartar(arquivo):
+    """
+    Apaga o segmento e só então o fecha, liberando a trava: nenhum outro
+    processo consegue travá-lo entre o commit e a remoção. No Windows um
+    arquivo aberto não pode ser apagado, então lá ele é fechado antes.
+    """
+    if fcntl is None:
+        arquivo.close()
+    try:
+        os.remove(arquivo.name)
+    except FileNotFoundError:
+        pass
+    finally:
+        arquivo.close()
+
+def _mesmo_arquivo(arquivo, caminho: str) -> bool:
+    """O descritor aberto ainda corresponde ao arquivo no caminho (não foi apagado)"""
+    try:
+        return os.path.samestat(os.fstat(arquivo.fileno()), os.stat(caminho))
+    except FileNotFoundError:
+        return False
+
+class SimulationWriteBehind:
+    """Fila de simulações com gravação em lote por uma thread de fundo"""
+
+    def __init__(self, db_manager, spill_dir: str, tamanho_lote: int = 500,
+                 intervalo: float = 1.0, sincronizar: bool = False):
+        self.db_manager = db_manager
+        self.spill_dir = spill_dir
+        self.tamanho_lote = tamanho_lote
+        self.intervalo = intervalo
+        self.sincronizar = sincronizar
+
+        self._fila: List[Tuple] = []
+        self._condicao = threading.Condition()
+        self._segmento = None
+        self._sequencia = 0
+        self._parando = False
+        self._thread: Optional[threading.Thread] = None
+
+    # Segmentos de spill
+
+    def _abrir_segmento(self):
+        """Abre (e trava) um novo arquivo de segmento para este processo"""
+        self._sequencia += 1
+        nome = f"{os.getpid()}-{int(time.time() * 1000)}-{self._sequencia}.jsonl"
+        self._segmento = open(os.path.join(self.spill_dir, nome), 'a+', encoding='utf-8')
+        _travar(self._segmento)
+
+    def _rotacionar_segmento(self):
+        """
+        Troca o segmento atual por um novo e devolve o antigo ainda aberto e
+        travado (chamado com lock); quem recebe o descarta após o commit
+        """
+        segmento = self._segmento
+        self._abrir_segmento()
+        segmento.flush()
+        os.fsync(segmento.fileno())
+        return segmento
+
+    def recuperar_pendentes(self) -> int:
+        """Regrava segmentos deixados por processos encerrados; retorna o total"""
+        total = 0
+        for nome in sorted(os.listdir(self.spill_dir)):
+            caminho = os.path.join(self.spill_dir, nome)
+            if not nome.endswith('.jsonl') or (self._segmento and caminho == self._segmento.name):
+                continue
+            try:
+                arquivo = open(caminho, 'r+', encoding='utf-8')
+            except FileNotFoundError:
+                # Já recuperado e apagado por outro processo
+                continue
+            try:
+                # Segmento travado pertence a outro processo em execução; depois
+                # de travar, confere se outro processo não o gravou e apagou
+                # enquanto esperávamos a trava
+                if not _travar(arquivo) or not _mesmo_arquivo(arquivo, caminho):
+                    arquivo.close()
+                    continue
+                registros = [tuple(json.loads(linha)) for linha in arquivo if linha.strip()]
+                self._gravar(registros)
+            except Exception:
+                arquivo.close()
+                raise
+            # A trava só é liberada depois do commit e da remoção
+            _descartar(arquivo)
+            total += len(registros)
+        return total
+
+    # Ciclo de vida
+
+    def iniciar(self):
+        """Recupera pendências e inicia a thread de gravação"""
+        os.makedirs(self.spill_dir, exist_ok=True)
+        self._abrir_segmento()
+        recuperados = self.recuperar_pendentes()
+        if recuperados:
+            print(f"Write-behind: {recuperados} simulações pendentes recuperadas")
+
+        self._thread = threading.Thread(
+            target=self._executar, name='simulacoes-write-behind', daemon=True
+        )
+        self._thread.start()
+
+    def parar(self, timeout: float = 30.0):
+        """Esvazia a fila e encerra a thread (encerramento gracioso)"""
+        if self._thread is None:
+            return
+        with self._condicao:
+            self._parando = True
+            self._condicao.notify()
+        self._thread.join(timeout)
+        self._thread = None
+
+        with self._condicao:
+            if self._segmento is not None and not self._fila:
+                _descartar(self._segmento)
+                self._segmento = None
+
+    # Produção e consumo
+
+    def enfileirar(self, distribuidor_id: int, kwh_consumido: float,
+                   desconto_percentual: float, valor_desconto: float):
+        """
+        Registra a simulação no spill e na fila; não toca no banco, exceto
+        depois de parar(), quando grava o registro diretamente
+        """
+        # Mesmo formato de CURRENT_TIMESTAMP (UTC), fixado no momento da simulação
+        criado_em = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        registro = (distribuidor_id, int(kwh_consumido), desconto_percentual,
+                    valor_desconto, criado_em)
+        with self._condicao:
+            encerrado = self._parando or self._segmento is None
+            if not encerrado:
+                self._segmento.write(json.dumps(registro) + '\n')
+                self._segmento.flush()
+                if self.sincronizar:
+                    os.fsync(self._segmento.fileno())
+                self._fila.append(registro)
+                if len(self._fila) >= self.tamanho_lote:
+                    self._condicao.notify()
+        if encerrado:
+            # Sem thread de gravação: a simulação não pode ficar só na fila
+            self._gravar([registro])
+
+    def _executar(self):
+        """Laço da thread de gravação"""
+        while True:
+            with self._condicao:
+                self._condicao.wait_for(
+                    lambda: self._parando or len(self._fila) >= self.tamanho_lote,
+                    timeout=self.intervalo
+                )
+                lote, self._fila = self._fila, []
+                parando = self._parando
+                segmento = self._rotacionar_segmento() if lote else None
+
+            if lote:
+                try:
+                    self._gravar(lote)
+                except Exception as e:
+                    # O segmento fica no disco e é regravado na próxima inicialização
+                    segmento.close()
+                    print(f"Write-behind: erro ao gravar lote de {len(lote)} simulações: {e}")
+                else:
+                    _descartar(segmento)
+
+            if parando:
+                with self._condicao:
+                    if not self._fila:
+                        return
+
+    def _gravar(self, registros: List[Tuple]):
+        """Insere os registros em uma única transação"""
+        if not registros:
+            return
+        with self.db_manager.get_connection() as conn:
+            conn.executemany(SQL_INSERT, registros)
@@ -0,0 +1,465 @@
+"""Exportação das tabelas para os arquivos estáticos em static/data/.
+
+Todas as tabelas são lidas em uma única transação de leitura, em uma única
+conexão, de modo que os arquivos gerados formam um retrato consistente do
+banco. Cada arquivo é escrito em streaming em um arquivo temporário no mesmo
+diretório e só depois de todos prontos os temporários substituem os
+definitivos com os.replace (atômico), então a landing page nunca lê um JSON
+pela metade. simulacao_config.json é mantido à mão e não é tocado.
+
+Do mesmo retrato sai também o bundle do simulador (montar_bundle_simulacao):
+um único JSON minificado com a configuração, os estados, os tipos de bônus e
+as distribuidoras já com suas faixas e regras embutidas, mais segmentos
+disjuntos ordenados para busca binária da faixa e a tabela de cotação
+(database/tabela_cotacao.py) de cada distribuidora ativa. O nome do arquivo
+leva o hash do conteúdo (simulacao.<hash>.json, cacheável por tempo
+indeterminado), com variantes pré-comprimidas .gz e .br (esta só se o pacote
+brotli estiver instalado), e simulacao-bundle.json aponta para a versão atual.
+
+Para atualizações incrementais o mesmo conteúdo sai também fragmentado em
+distribuidoras/: um arquivo por distribuidora (<id>.<hash>.json) com faixas,
+segmentos e cotação, um comum.<hash>.json com configuração, estados, tipos
+de bônus e o cadastro das distribuidoras (sem as faixas), e
+distribuidoras/manifest.json com o hash de cada um. O simulador abre com o
+manifesto e o comum e só baixa o fragmento da distribuidora escolhida. O
+fragmento de uma distribuidora só muda de nome quando os dados dela mudam,
+então os clientes buscam de novo apenas o que mudou; fragmentos que já
+existem com o mesmo nome não são regravados.
+
+Bundles e fragmentos que deixam de ser referenciados não somem na hora: um
+cliente que leu o ponteiro ou o manifesto anterior ainda pode pedir os
+arquivos daquela geração. Ficam os da geração atual, os da anterior e os
+gravados há menos de RETENCAO_GERACOES_ANTERIORES segundos.
+
+    python -m database.static_export [--banco database/sinergia.db] [--destino static/data]
+                                     [--sem-bundle] [--sem-fragmentos]
+"""
+
+import glob
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import time
+from contextlib import closing
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+try:
+    import brotli
+except ImportError:  # variante .br é opcional
+    brotli = None
+
+from database.json_stream import escrever_array_json
+from database.tabela_cotacao import TabelaCotacao
+
+# Formato do bundle; incrementar quando a estrutura mudar de forma incompatível
+VERSAO_BUNDLE = 1
+ARQUIVO_PONTEIRO_BUNDLE = 'simulacao-bundle.json'
+
+# Fragmentos por distribuidora (mesmo formato de distribuidora do bundle)
+VERSAO_FRAGMENTOS = 2
+# Campos que ficam só no fragmento da distribuidora; o resto vai para o comum
+CAMPOS_FRAGMENTO = ('faixas', 'segmentos', 'cotacao')
+DIRETORIO_FRAGMENTOS = 'distribuidoras'
+ARQUIVO_MANIFESTO = 'manifest.json'
+
+# Arquivos sem referência mais novos que isso (segundos) não são removidos
+RETENCAO_GERACOES_ANTERIORES = 24 * 60 * 60
+
+def _booleano(valor):
+    return bool(valor) if valor is not None else None
+
+def _decimal(valor):
+    # Mesmo resultado de float(Decimal) do ORM (escala 2); zero vira None como antes
+    return round(float(valor), 2) if valor else None
+
+def _distribuidora(row: sqlite3.Row) -> Dict:
+    return {
+        "id": row["id"],
+        "nome": row["nome"],
+        "estado_id": row["estado_id"],
+        "consumo_minimo": row["consumo_minimo"],
+        "forma_pagamento": row["forma_pagamento"],
+        "prazo_injecao": row["prazo_injecao"],
+        "troca_titularidade": _booleano(row["troca_titularidade"]),
+        "login_senha_necessario": _booleano(row["login_senha_necessario"]),
+        "aceita_placas": _booleano(row["aceita_placas"]),
+        "icms_minimo": _decimal(row["icms_minimo"]),
+        "observacoes": row["observacoes"],
+        "ativo": _booleano(row["ativo"])
+    }
+
+def _estado(row: sqlite3.Row) -> Dict:
+    return {
+        "id": row["id"],
+        "nome": row["nome"],
+        "sigla": row["sigla"]
+    }
+
+def _tipo_bonus(row: sqlite3.Row) -> Dict:
+    return {
+        "id": row["id"],
+        "codigo": row["codigo"],
+        "nome": row["nome"],
+        "descricao": row["descricao"],
+        "cor_hex": row["cor_hex"],
+        "ativo": _booleano(row["ativo"])
+    }
+
+def _faixa_consumo(row: sqlite3.Row) -> Dict:
+    return {
+        "id": row["id"],
+        "distribuidora_id": row["distribuidora_id"],
+        "consumo_min": row["consumo_min"],
+        "consumo_max": row["consumo_max"],
+        "nome_faixa": row["nome_faixa"],
+        "ordem": row["ordem"],
+        "ativo": _booleano(row["ativo"])
+    }
+
+def _regra_desconto(row: sqlite3.Row) -> Dict:
+    return {
+        "id": row["id"],
+        "faixa_consumo_id": row["faixa_consumo_id"],
+        "tipo_bonus_id": row["tipo_bonus_id"],
+        "desconto_percentual": _decimal(row["desconto_percentual"]),
+        "desconto_opcional_1": _decimal(row["desconto_opcional_1"]),
+        "desconto_opcional_2": _decimal(row["desconto_opcional_2"]),
+        "desconto_opcional_3": _decimal(row["desconto_opcional_3"]),
+        "analise_credito": _booleano(row["analise_credito"]),
+        "observacoes": row["observacoes"]
+    }
+
+# (arquivo, consulta, conversão da linha) na ordem de exportação
+ARQUIVOS_ESTATICOS: List[Tuple[str, str, Callable[[sqlite3.Row], Dict]]] = [
+    ('distribuidoras.json', "SELECT * FROM distribuidoras ORDER BY id", _distribuidora),
+    ('estados.json', "SELECT * FROM estados ORDER BY id", _estado),
+    ('tipos_bonus.json', "SELECT * FROM tipos_bonus ORDER BY id", _tipo_bonus),
+    ('faixas_consumo.json', "SELECT * FROM faixas_consumo ORDER BY id", _faixa_consumo),
+    ('regras_desconto.json', "SELECT * FROM regras_desconto ORDER BY id", _regra_desconto),
+]
+
+def _segmentos_faixas(faixas: List[Dict]) -> List[list]:
+    """
+    Segmentos disjuntos e ordenados equivalentes à busca linear por faixa
+
+    A busca linear do simulador devolve a primeira faixa (na ordem dada) com
+    consumo_min <= kWh <= consumo_max; como as faixas se sobrepõem, cada
+    trecho do eixo de consumo é resolvido aqui de antemão. Cada segmento é
+    [inicio, inicio_aberto, fim, fim_aberto, indice_faixa], com fim None para
+    "sem limite"; limites abertos (1) excluem o próprio valor, o que mantém o
+    resultado idêntico também para consumos fracionários.
+    """
+    pontos = sorted(
+        {faixa['consumo_min'] for faixa in faixas}
+        | {faixa['consumo_max'] for faixa in faixas if faixa['consumo_max'] is not None}
+    )
+
+    def vencedora(kwh):
+        for indice, faixa in enumerate(faixas):
+            if faixa['consumo_min'] <= kwh and (faixa['consumo_max'] is None or kwh <= faixa['consumo_max']):
+                return indice
+        return None
+
+    # Peças elementares: cada ponto e o intervalo aberto até o ponto seguinte
+    segmentos = []
+    for i, ponto in enumerate(pontos):
+        proximo = pontos[i + 1] if i + 1 < len(pontos) else None
+        meio = ponto + 0.5 if proximo is None else (ponto + proximo) / 2
+        for peca in ([ponto, 0, ponto, 0, vencedora(ponto)],
+                     [ponto, 1, proximo, 0 if proximo is None else 1, vencedora(meio)]):
+            if peca[4] is None:
+                continue
+            anterior = segmentos[-1] if segmentos else None
+            # Funde com o segmento anterior se contíguo e da mesma faixa
+            if anterior and anterior[4] == peca[4] and anterior[2] == peca[0] and anterior[3] != peca[1]:
+                anterior[2], anterior[3] = peca[2], peca[3]
+            else:
+                segmentos.append(peca)
+    return segmentos
+
+def montar_bundle_simulacao(conn: sqlite3.Connection, config: Optional[Dict]) -> Dict:
+    """
+    Monta o bundle do simulador a partir da conexão (na transação corrente)
+
+    Distribuidoras vêm ordenadas por id (busca binária no cliente), cada uma
+    com as faixas ativas na ordem de faixas_consumo.json e, por faixa, as
+    regras ativas por tipo de bônus: {tipo_bonus_id: [desconto, observacoes]}.
+    Em 'cotacao' vai a TabelaCotacao serializada (None se inativa).
+    """
+    tabela_cotacao = TabelaCotacao.carregar(conn)
+
+    regras_por_faixa: Dict[int, Dict[str, list]] = {}
+    for row in conn.execute("SELECT * FROM regras_desconto WHERE ativo = 1 ORDER BY id"):
+        regras_faixa = regras_por_faixa.setdefault(row['faixa_consumo_id'], {})
+        # Mesma escolha do find() sobre regras_desconto.json: a primeira vence
+        regras_faixa.setdefault(str(row['tipo_bonus_id']), [
+            _decimal(row['desconto_percentual']), row['observacoes']
+        ])
+
+    faixas_por_distribuidora: Dict[int, List[Dict]] = {}
+    for row in conn.execute("SELECT * FROM faixas_consumo WHERE ativo = 1 ORDER BY id"):
+        faixas_por_distribuidora.setdefault(row['distribuidora_id'], []).append(_faixa_consumo(row))
+
+    distribuidoras = []
+    for row in conn.execute("SELECT * FROM distribuidoras ORDER BY id"):
+        distribuidora = _distribuidora(row)
+        faixas = faixas_por_distribuidora.get(distribuidora['id'], [])
+        distribuidora['faixas'] = [
+            [faixa['id'], faixa['consumo_min'], faixa['consumo_max'], faixa['nome_faixa'],
+             faixa['ordem'], regras_por_faixa.get(faixa['id'], {})]
+            for faixa in faixas
+        ]
+        distribuidora['segmentos'] = _segmentos_faixas(faixas)
+        distribuidora['cotacao'] = tabela_cotacao.serializar(distribuidora['id'])
+        distribuidoras.append(distribuidora)
+
+    return {
+        'versao': VERSAO_BUNDLE,
+        'config': config,
+        'estados': [_estado(row) for row in conn.execute("SELECT * FROM estados ORDER BY id")],
+        'tipos_bonus': [_tipo_bonus(row) for row in conn.execute("SELECT * FROM tipos_bonus ORDER BY id")],
+        'distribuidoras': distribuidoras,
+    }
+
+def _gravar_temporario(destino: str, nome: str, conteudo: bytes) -> str:
+    """Grava bytes em um arquivo temporário no destino (com fsync) e devolve o caminho"""
+    fd, temporario = tempfile.mkstemp(dir=destino, prefix=f'.{nome}.', suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(conteudo)
+        f.flush()
+        os.fsync(f.fileno())
+    return temporario
+
+def _json_compacto(dados) -> bytes:
+    return json.dumps(dados, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def _variantes_comprimidas(nome: str, conteudo: bytes) -> Dict[str, bytes]:
+    """O arquivo e suas versões .gz (e .br, se disponível) pré-comprimidas"""
+    variantes = {nome: conteudo, nome + '.gz': gzip.compress(conteudo, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variantes[nome + '.br'] = brotli.compress(conteudo, quality=11)
+    return variantes
+
+def _gravar_bundle(bundle: Dict, destino: str, temporarios: List[Tuple[str, str]]) -> str:
+    """Serializa o bundle e prepara o arquivo com hash, as variantes comprimidas e o ponteiro"""
+    conteudo = _json_compacto(bundle)
+    hash_conteudo = hashlib.sha256(conteudo).hexdigest()
+    nome = f'simulacao.{hash_conteudo[:12]}.json'
+
+    variantes = _variantes_comprimidas(nome, conteudo)
+    ponteiro = json.dumps({
+        'versao': VERSAO_BUNDLE,
+        'arquivo': nome,
+        'sha256': hash_conteudo,
+        'bytes': len(conteudo),
+    }, ensure_ascii=False).encode('utf-8')
+    # O ponteiro é publicado por último: aponta sempre para um bundle completo
+    variantes[ARQUIVO_PONTEIRO_BUNDLE] = ponteiro
+
+    for arquivo, dados in variantes.items():
+        temporarios.append((_gravar_temporario(destino, arquivo, dados), os.path.join(destino, arquivo)))
+    return nome
+
+def _gravar_fragmentos(bundle: Dict, destino: str, temporarios: List[Tuple[str, str]]) -> Dict:
+    """
+    Prepara os fragmentos por distribuidora, o comum e o manifesto em
+    destino/distribuidoras/; devolve o manifesto
+    """
+    diretorio = os.path.join(destino, DIRETORIO_FRAGMENTOS)
+    os.makedirs(diretorio, exist_ok=True)
+
+    def preparar(prefixo: str, dados) -> Dict:
+        conteudo = _json_compacto(dados)
+        hash_conteudo = hashlib.sha256(conteudo).hexdigest()
+        nome = f'{prefixo}.{hash_conteudo[:12]}.json'
+        for arquivo, variante in _variantes_comprimidas(nome, conteudo).items():
+            definitivo = os.path.join(diretorio, arquivo)
+            # Mesmo nome = mesmo conteúdo: não regrava (mantém mtime e cache)
+            if not os.path.exists(definitivo):
+                temporarios.append((_gravar_temporario(diretorio, arquivo, variante), definitivo))
+        return {'arquivo': nome, 'sha256': hash_conteudo, 'bytes': len(conteudo)}
+
+    comum = {
+        'config': bundle['config'],
+        'estados': bundle['estados'],
+        'tipos_bonus': bundle['tipos_bonus'],
+        # Cadastro para listar as distribuidoras antes de baixar qualquer fragmento
+        'distribuidoras': [
+            {campo: valor for campo, valor in distribuidora.items() if campo not in CAMPOS_FRAGMENTO}
+            for distribuidora in bundle['distribuidoras']
+        ],
+    }
+    manifesto = {
+        'versao': VERSAO_FRAGMENTOS,
+        'comum': preparar('comum', comum),
+        'distribuidoras': {
+            str(distribuidora['id']): preparar(str(distribuidora['id']), distribuidora)
+            for distribuidora in bundle['distribuidoras']
+        },
+    }
+
+    # Publicado por último, como o ponteiro do bundle
+    conteudo = json.dumps(manifesto, ensure_ascii=False, indent=2).encode('utf-8')
+    temporarios.append((
+        _gravar_temporario(diretorio, ARQUIVO_MANIFESTO, conteudo),
+        os.path.join(diretorio, ARQUIVO_MANIFESTO)
+    ))
+    return manifesto
+
+def _ler_json(caminho: str) -> Optional[Dict]:
+    """JSON do arquivo, ou None se não existir ou estiver inválido"""
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _arquivos_do_manifesto(manifesto: Optional[Dict]) -> Set[str]:
+    if not manifesto:
+        return set()
+    arquivos = {manifesto['comum']['arquivo']}
+    arquivos.update(item['arquivo'] for item in manifesto['distribuidoras'].values())
+    return arquivos
+
+def _arquivos_publicados(destino: str) -> Tuple[Set[str], Set[str]]:
+    """Bundle do ponteiro e fragmentos do manifesto hoje publicados (antes de substituí-los)"""
+    ponteiro = _ler_json(os.path.join(destino, ARQUIVO_PONTEIRO_BUNDLE))
+    bundles = {ponteiro['arquivo']} if ponteiro and 'arquivo' in ponteiro else set()
+    manifesto = _ler_json(os.path.join(destino, DIRETORIO_FRAGMENTOS, ARQUIVO_MANIFESTO))
+    return bundles, _arquivos_do_manifesto(manifesto)
+
+def _remover_sem_referencia(padrao: str, manter: Set[str], retencao: float, ignorar=()):
+    """
+    Remove os arquivos do padrão (e variantes .gz/.br) fora de manter e
+    gravados há mais de retencao segundos
+    """
+    limite = time.time() - retencao
+    for caminho in glob.glob(padrao):
+        nome = os.path.basename(caminho)
+        if nome in ignorar or nome.split('.json')[0] + '.json' in manter:
+            continue
+        try:
+            if os.path.getmtime(caminho) < limite:
+                os.remove(caminho)
+        except FileNotFoundError:
+            pass
+
+def _remover_fragmentos_antigos(destino: str, manifesto: Dict, anteriores: Set[str],
+                                retencao: float = RETENCAO_GERACOES_ANTERIORES):
+    """Remove fragmentos que nem o manifesto atual nem o anterior referenciam"""
+    _remover_sem_referencia(
+        os.path.join(destino, DIRETORIO_FRAGMENTOS, '*.json*'),
+        _arquivos_do_manifesto(manifesto) | anteriores, retencao, ignorar=(ARQUIVO_MANIFESTO,)
+    )
+
+def _remover_bundles_antigos(destino: str, atual: str, anteriores: Set[str],
+                             retencao: float = RETENCAO_GERACOES_ANTERIORES):
+    """Remove bundles de exportações anteriores, mantendo o atual e o anterior"""
+    _remover_sem_referencia(os.path.join(destino, 'simulacao.*.json*'), {atual} | anteriores, retencao)
+
+def _permissoes_padrao() -> int:
+    """Permissões de um arquivo novo segundo a umask (mkstemp cria com 0600)"""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+def exportar_arquivos_estaticos(db_path: str = 'database/sinergia.db',
+                                destino: str = 'static/data',
+                                bundle: bool = True,
+                                fragmentos: bool = True,
+                                retencao: float = RETENCAO_GERACOES_ANTERIORES) -> Dict[str, int]:
+    """
+    Gera todos os arquivos de static/data/ a partir de um único retrato do banco
+
+    Args:
+        bundle: gera também o bundle do simulador
+        fragmentos: gera também os fragmentos por distribuidora e o manifesto
+        retencao: segundos que bundles e fragmentos de gerações mais antigas
+            que a anterior ainda ficam no disco
+
+    Returns:
+        dict arquivo -> quantidade de registros exportados (o bundle e o
+        manifesto aparecem com o número de distribuidoras)
+    """
+    os.makedirs(destino, exist_ok=True)
+    temporarios = []
+    totais = {}
+    nome_bundle = None
+    manifesto = None
+
+    config = None
+    caminho_config = os.path.join(destino, 'simulacao_config.json')
+    if (bundle or fragmentos) and os.path.exists(caminho_config):
+        with open(caminho_config, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+
+    try:
+        with closing(sqlite3.connect(db_path)) as conn:
+            conn.row_factory = sqlite3.Row
+            # Transação de leitura explícita: todas as consultas veem o mesmo estado
+            conn.execute("BEGIN")
+            try:
+                for arquivo, consulta, converter in ARQUIVOS_ESTATICOS:
+                    fd, temporario = tempfile.mkstemp(dir=destino, prefix=f'.{arquivo}.', suffix='.tmp')
+                    temporarios.append((temporario, os.path.join(destino, arquivo)))
+                    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                        totais[arquivo] = escrever_array_json(
+                            f, (converter(row) for row in conn.execute(consulta)), indent=2
+                        )
+                        f.flush()
+                        os.fsync(f.fileno())
+
+                if bundle or fragmentos:
+                    dados_bundle = montar_bundle_simulacao(conn, config)
+                if bundle:
+                    nome_bundle = _gravar_bundle(dados_bundle, destino, temporarios)
+                    totais[nome_bundle] = len(dados_bundle['distribuidoras'])
+                if fragmentos:
+                    manifesto = _gravar_fragmentos(dados_bundle, destino, temporarios)
+                    totais[os.path.join(DIRETORIO_FRAGMENTOS, ARQUIVO_MANIFESTO)] = len(manifesto['distribuidoras'])
+            finally:
+                conn.rollback()
+
+        # Geração que vai virar a anterior: continua disponível após a publicação
+        bundles_anteriores, fragmentos_anteriores = _arquivos_publicados(destino)
+
+        # Só publica quando todos os arquivos foram gerados
+        permissoes = _permissoes_padrao()
+        for temporario, definitivo in temporarios:
+            os.chmod(temporario, permissoes)
+            os.replace(temporario, definitivo)
+        temporarios = []
+
+        if nome_bundle:
+            _remover_bundles_antigos(destino, nome_bundle, bundles_anteriores, retencao)
+        if manifesto:
+            _remover_fragmentos_antigos(destino, manifesto, fragmentos_anteriores, retencao)
+    finally:
+        for temporario, _ in temporarios:
+            if os.path.exists(temporario):
+                os.remove(temporario)
+
+    return totais
+
+def main():
+    """Exporta as tabelas e mostra o total de registros por arquivo"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Exporta as tabelas para static/data/*.json')
+    parser.add_argument('--banco', default='database/sinergia.db')
+    parser.add_argument('--destino', default='static/data')
+    parser.add_argument('--sem-bundle', action='store_true', help='não gera o bundle do simulador')
+    parser.add_argument('--sem-fragmentos', action='store_true',
+                        help='não gera os fragmentos por distribuidora')
+    args = parser.parse_args()
+
+    totais = exportar_arquivos_estaticos(args.banco, args.destino, bundle=not args.sem_bundle,
+                                         fragmentos=not args.sem_fragmentos)
+    for arquivo, total in totais.items():
+        print(f"✅ Arquivo {os.path.join(args.destino, arquivo)} criado com {total} registros")
+
+if __name__ == "__main__":
+    main()
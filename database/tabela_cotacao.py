@@ -0,0 +1,173 @@
+"""Tabela de cotação pré-calculada por distribuidora e tipo de bônus.
+
+Para uma distribuidora e um tipo de bônus, o resultado de uma cotação
+(desconto_percentual, elegivel, motivo) só muda nos kWh em que começa uma
+faixa, termina uma faixa ou é atingido o consumo mínimo. A tabela guarda
+esses pontos de quebra ordenados e o resultado de cada degrau, de modo que
+responder a uma cotação é um único bisect, sem percorrer faixas e regras.
+
+As regras de avaliação são as do snapshot (RuleSnapshot):
+
+- consumo abaixo do consumo_minimo da distribuidora: não elegível;
+- faixa escolhida pelo FaixasIndex (a de maior consumo_min vence, consumo
+  truncado para kWh inteiro); sem faixa: não elegível;
+- regra ativa da faixa para o tipo de bônus; sem regra: não elegível.
+
+A mesma tabela vai serializada no bundle do simulador (serializar), e o
+simulador estático responde com o mesmo bisect (SimulacaoManager.cotar). check_tabela_cotacao.py
+compara a tabela com a avaliação direta no banco em uma varredura densa de
+consumos.
+"""
+
+import sqlite3
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+from database.faixas_index import FaixasIndex
+
+MOTIVO_SEM_FAIXA = 'Faixa de consumo não encontrada para esta distribuidora'
+MOTIVO_SEM_REGRA = 'Regra de desconto não encontrada'
+
+def motivo_consumo_minimo(consumo_minimo) -> str:
+    """Mesma mensagem de calcular_desconto em api/app.py"""
+    return f'Consumo mínimo não atingido. Necessário: {consumo_minimo} kWh'
+
+class Cotacao(NamedTuple):
+    """Resultado de uma cotação (motivo None quando elegível)"""
+    desconto_percentual: float
+    elegivel: bool
+    motivo: Optional[str]
+
+class _Degraus:
+    """Função degrau de uma distribuidora e tipo de bônus: pontos[i] -> valores[i]"""
+
+    __slots__ = ('pontos', 'valores')
+
+    def __init__(self, pontos: List[int], valores: List[Cotacao]):
+        self.pontos = pontos
+        self.valores = valores
+
+    def buscar(self, consumo_kwh: int) -> Cotacao:
+        # pontos[0] é sempre 0 e o consumo nunca é negativo
+        return self.valores[bisect_right(self.pontos, consumo_kwh) - 1]
+
+class TabelaCotacao:
+    """Funções degrau de cotação por distribuidora_id e tipo_bonus_id"""
+
+    def __init__(self, distribuidoras: Mapping[int, Mapping], indice_faixas: FaixasIndex,
+                 regras: Iterable[Mapping], tipos_bonus: Iterable[int]):
+        descontos: Dict[Tuple[int, int], float] = {
+            (regra['faixa_consumo_id'], regra['tipo_bonus_id']): float(regra['desconto_percentual'])
+            for regra in regras
+        }
+        tipos = sorted(tipos_bonus)
+
+        self._degraus: Dict[int, Dict[int, _Degraus]] = {}
+        for distribuidora_id, distribuidora in distribuidoras.items():
+            por_tipo = self._degraus.setdefault(distribuidora_id, {})
+            consumo_minimo = distribuidora.get('consumo_minimo') or 0
+            segmentos = indice_faixas.segmentos(distribuidora_id)
+            # Candidatos a ponto de quebra; consumo_minimo é inteiro no banco
+            pontos = sorted({0, consumo_minimo} | {inicio for inicio, _ in segmentos if inicio > 0})
+            inicios = [inicio for inicio, _ in segmentos]
+
+            for tipo_id in tipos:
+                degraus = _Degraus([], [])
+                for ponto in pontos:
+                    if ponto < consumo_minimo:
+                        valor = Cotacao(0.0, False, motivo_consumo_minimo(consumo_minimo))
+                    else:
+                        posicao = bisect_right(inicios, ponto) - 1
+                        faixa = segmentos[posicao][1] if posicao >= 0 else None
+                        if faixa is None:
+                            valor = Cotacao(0.0, False, MOTIVO_SEM_FAIXA)
+                        elif (faixa['id'], tipo_id) not in descontos:
+                            valor = Cotacao(0.0, False, MOTIVO_SEM_REGRA)
+                        else:
+                            valor = Cotacao(descontos[(faixa['id'], tipo_id)], True, None)
+                    # Degraus vizinhos com o mesmo resultado são unidos
+                    if degraus.valores and degraus.valores[-1] == valor:
+                        continue
+                    degraus.pontos.append(ponto)
+                    degraus.valores.append(valor)
+                por_tipo[tipo_id] = degraus
+
+    @classmethod
+    def do_snapshot(cls, snapshot) -> 'TabelaCotacao':
+        """Monta a tabela a partir de um RuleSnapshot"""
+        return cls(
+            snapshot.distribuidoras,
+            snapshot.indice_faixas,
+            (regra for lista in snapshot.regras_desconto.values() for regra in lista),
+            snapshot.tipos_bonus.keys()
+        )
+
+    @classmethod
+    def carregar(cls, conn: sqlite3.Connection) -> 'TabelaCotacao':
+        """
+        Lê as tabelas com os mesmos filtros do RuleSnapshot, na transação
+        corrente da conexão (quem chama decide o isolamento)
+        """
+        conn.row_factory = sqlite3.Row
+        distribuidoras = {
+            row['id']: dict(row)
+            for row in conn.execute("""
+                SELECT d.id, d.consumo_minimo
+                FROM distribuidoras d
+                JOIN estados e ON d.estado_id = e.id
+                WHERE d.ativo = 1
+            """)
+        }
+        faixas = [dict(row) for row in conn.execute("SELECT * FROM faixas_consumo WHERE ativo = 1")]
+        regras = [dict(row) for row in conn.execute("""
+            SELECT r.faixa_consumo_id, r.tipo_bonus_id, r.desconto_percentual
+            FROM regras_desconto r
+            JOIN faixas_consumo fc ON r.faixa_consumo_id = fc.id
+            JOIN tipos_bonus tb ON r.tipo_bonus_id = tb.id
+            WHERE r.ativo = 1 AND fc.ativo = 1 AND tb.ativo = 1
+        """)]
+        tipos = [row['id'] for row in conn.execute("SELECT id FROM tipos_bonus WHERE ativo = 1")]
+        return cls(distribuidoras, FaixasIndex(faixas), regras, tipos)
+
+    def cotar(self, distribuidora_id: int, consumo_kwh: float, tipo_bonus_id: int) -> Optional[Cotacao]:
+        """
+        Cotação em O(log n); None se a distribuidora ou o tipo de bônus não
+        existirem (ou estiverem inativos)
+
+        Raises:
+            ValueError: se o consumo for negativo
+        """
+        if consumo_kwh < 0:
+            raise ValueError('Consumo não pode ser negativo')
+        degraus = self._degraus.get(int(distribuidora_id), {}).get(int(tipo_bonus_id))
+        if degraus is None:
+            return None
+        return degraus.buscar(int(consumo_kwh))
+
+    def total_degraus(self) -> int:
+        """Quantidade de degraus somada de todas as funções"""
+        return sum(
+            len(degraus.pontos) for por_tipo in self._degraus.values() for degraus in por_tipo.values()
+        )
+
+    def serializar(self, distribuidora_id: int) -> Optional[Dict]:
+        """
+        Funções da distribuidora para JSON: {'motivos': [...], 'degraus':
+        {tipo_bonus_id: [pontos, valores]}}, com cada valor como
+        [desconto_percentual, elegivel, índice em motivos ou None]
+        """
+        por_tipo = self._degraus.get(int(distribuidora_id))
+        if por_tipo is None:
+            return None
+
+        # Cada texto de motivo vai uma vez só por distribuidora
+        motivos: Dict[str, int] = {}
+        degraus_json = {}
+        for tipo_id, degraus in por_tipo.items():
+            valores = [
+                [valor.desconto_percentual, valor.elegivel,
+                 None if valor.motivo is None else motivos.setdefault(valor.motivo, len(motivos))]
+                for valor in degraus.valores
+            ]
+            degraus_json[str(tipo_id)] = [degraus.pontos, valores]
+        return {'motivos': list(motivos), 'degraus': degraus_json}
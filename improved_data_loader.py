@@ -1,14 +1,30 @@
 import re
 import sys
 import os
+from concurrent.futures import ProcessPoolExecutor
 from bs4 import BeautifulSoup
 from database.db_manager import DatabaseManager
+from database.html_distribuidoras import separar_fragmentos
+from database.parsing import extrair_numero, extrair_percentual
+
+def processar_fragmento(fragmento: str):
+    """Processa o HTML de um único <details>; executado nos processos do pool"""
+    details = BeautifulSoup(fragmento, 'lxml').find('details')
+    if details is None:
+        return None
+    return ImprovedDataLoader.processar_distribuidora_html(details)
 
 class ImprovedDataLoader:
     """Carregador melhorado de dados das distribuidoras a partir do HTML"""
     
-    def __init__(self):
+    def __init__(self, processos: int = None):
+        """
+        Args:
+            processos: tamanho do pool de processos para o parsing
+                (None = número de CPUs, 1 = sequencial)
+        """
         self.db = DatabaseManager()
+        self.processos = processos
         self.estados_map = {
             'Alagoas': 'AL',
             'Bahia': 'BA', 
@@ -32,17 +48,8 @@ class ImprovedDataLoader:
             'Tocantins': 'TO'
         }
     
-    def extrair_numero(self, texto: str) -> int:
-        """Extrai número de um texto"""
-        match = re.search(r'(\d+)', texto.replace('.', '').replace(',', ''))
-        return int(match.group(1)) if match else 0
-    
-    def extrair_percentual(self, texto: str) -> float:
-        """Extrai percentual de um texto"""
-        match = re.search(r'(\d+(?:\.\d+)?)%', texto)
-        return float(match.group(1)) if match else 0.0
-    
-    def processar_distribuidora_html(self, details_element):
+    @staticmethod
+    def processar_distribuidora_html(details_element):
         """Processa um elemento <details> de distribuidora do HTML"""
         try:
             # Extrair título (estado e distribuidora)
@@ -118,7 +125,7 @@ class ImprovedDataLoader:
                 
                 # Consumo mínimo
                 if 'consumo' in texto_lower and ('mínimo' in texto_lower or 'de' in texto_lower):
-                    dados['consumo_minimo'] = self.extrair_numero(texto)
+                    dados['consumo_minimo'] = extrair_numero(texto)
                 
                 # Forma de pagamento
                 elif 'forma de pagamento' in texto_lower or 'pagamento' in texto_lower:
@@ -129,7 +136,7 @@ class ImprovedDataLoader:
                 
                 # Prazo de injeção
                 elif 'prazo' in texto_lower and 'injeção' in texto_lower:
-                    dados['prazo_injecao'] = self.extrair_numero(texto)
+                    dados['prazo_injecao'] = extrair_numero(texto)
                 
                 # Troca de titularidade
                 elif 'troca de titularidade' in texto_lower:
@@ -148,13 +155,13 @@ class ImprovedDataLoader:
                 
                 # ICMS
                 elif 'icms' in texto_lower:
-                    icms_num = self.extrair_numero(texto)
+                    icms_num = extrair_numero(texto)
                     if icms_num > 0:
                         dados['icms_minimo'] = float(icms_num)
                 
                 # Descontos
                 elif any(palavra in texto_lower for palavra in ['desconto', 'bônus', '%']):
-                    percentual = self.extrair_percentual(texto)
+                    percentual = extrair_percentual(texto)
                     if percentual > 0:
                         # Determinar faixa de consumo
                         consumo_min = 0
@@ -202,36 +209,34 @@ class ImprovedDataLoader:
         """Carrega dados das distribuidoras do arquivo HTML"""
         print("Iniciando carregamento melhorado de dados do HTML...")
         
-        # Limpar dados existentes
-        self.db.limpar_dados()
-        
         # Ler arquivo HTML
         with open(html_file_path, 'r', encoding='utf-8') as f:
             html_content = f.read()
         
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # Inserir estados
+        # Inserir estados (INSERT OR IGNORE: os existentes são reaproveitados)
         print("Inserindo estados...")
         estados_ids = {}
         for estado_nome, sigla in self.estados_map.items():
             estado_id = self.db.inserir_estado(estado_nome, sigla)
             estados_ids[estado_nome] = estado_id
         
-        # Encontrar seção de distribuidoras
-        distribuidoras_section = soup.find('section', id='distribuidoras')
-        if not distribuidoras_section:
+        # Encontrar seção de distribuidoras e separar um fragmento por <details>
+        fragmentos = separar_fragmentos(html_content)
+        if fragmentos is None:
             print("Seção de distribuidoras não encontrada!")
             return
+        print(f"Encontradas {len(fragmentos)} distribuidoras para processar...\n")
         
-        # Processar cada distribuidora
-        details_elements = distribuidoras_section.find_all('details', class_='faq-item')
-        print(f"Encontradas {len(details_elements)} distribuidoras para processar...\n")
-        
-        distribuidoras_inseridas = 0
+        # Processar as distribuidoras em paralelo (a ordem é preservada)
+        if self.processos == 1 or len(fragmentos) < 2:
+            resultados = [processar_fragmento(fragmento) for fragmento in fragmentos]
+        else:
+            with ProcessPoolExecutor(max_workers=self.processos) as executor:
+                lote = max(1, len(fragmentos) // ((self.processos or os.cpu_count() or 1) * 4))
+                resultados = list(executor.map(processar_fragmento, fragmentos, chunksize=lote))
         
-        for details in details_elements:
-            dados = self.processar_distribuidora_html(details)
+        distribuidoras = []
+        for dados in resultados:
             if not dados:
                 continue
             
@@ -241,37 +246,18 @@ class ImprovedDataLoader:
                 print(f"❌ Estado não encontrado: {dados['estado']}")
                 continue
             
-            try:
-                # Inserir distribuidora
-                distribuidora_id = self.db.inserir_distribuidora(
-                    nome=dados['distribuidora'],
-                    estado_id=estado_id,
-                    consumo_minimo=dados['consumo_minimo'],
-                    forma_pagamento=dados['forma_pagamento'],
-                    prazo_injecao=dados['prazo_injecao'],
-                    troca_titularidade=dados['troca_titularidade'],
-                    login_senha_necessario=dados['login_senha_necessario'],
-                    aceita_placas=dados['aceita_placas'],
-                    icms_minimo=dados['icms_minimo'],
-                    observacoes=dados['observacoes']
-                )
-                
-                # Inserir regras de desconto
-                for regra in dados['regras_desconto']:
-                    self.db.inserir_regra_desconto(
-                        distribuidora_id=distribuidora_id,
-                        consumo_min=regra['consumo_min'],
-                        consumo_max=regra['consumo_max'],
-                        desconto_percentual=regra['desconto_percentual'],
-                        tipo_bonus=regra['tipo_bonus'],
-                        descricao=regra['descricao']
-                    )
-                
-                distribuidoras_inseridas += 1
-                print(f"✅ {dados['estado']} - {dados['distribuidora']} (ID: {distribuidora_id})\n")
-                
-            except Exception as e:
-                print(f"❌ Erro ao inserir {dados['estado']} - {dados['distribuidora']}: {e}\n")
+            distribuidoras.append(dict(dados, nome=dados['distribuidora'], estado_id=estado_id))
+        
+        # Limpar dados existentes e inserir distribuidoras e regras de desconto
+        # em uma única transação: se a inserção falhar, os dados antigos ficam
+        distribuidoras_inseridas = 0
+        try:
+            ids = self.db.inserir_distribuidoras_lote(distribuidoras, limpar=True)
+            distribuidoras_inseridas = len(ids)
+            for dados, distribuidora_id in zip(distribuidoras, ids):
+                print(f"✅ {dados['estado']} - {dados['distribuidora']} (ID: {distribuidora_id})")
+        except Exception as e:
+            print(f"❌ Erro ao inserir distribuidoras: {e}\n")
         
         print(f"\nCarregamento concluído! {distribuidoras_inseridas} distribuidoras inseridas.")
         
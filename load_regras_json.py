@@ -5,80 +5,40 @@ Script para carregar dados do arquivo regras.json no banco sinergia.db
 usando os models SQLAlchemy criados.
 """
 
+import hashlib
 import json
-import re
+import sys
+import time
+from datetime import datetime
 from decimal import Decimal
-from models import Base, Estado, Distribuidora, TipoBonus, FaixaConsumo, RegraDesconto
+from models import Base, Estado, Distribuidora, TipoBonus, FaixaConsumo, RegraDesconto, SincronizacaoRegras
 from database.db_config import DatabaseSession, init_database
-from sqlalchemy import and_
+from database.json_stream import iterar_array_json
+from database.parsing import extrair_consumo_minimo_maximo, extrair_desconto_e_bonus, resumir_erros
+from sqlalchemy import and_, select, update
+from sqlalchemy.dialects.sqlite import insert
 
-def extrair_consumo_minimo_maximo(kwh_string):
-    """
-    Extrai valores mínimo e máximo de consumo de strings como:
-    - "100 kWh" -> (100, None)
-    - "1.000 a 5.000 kWh" -> (1000, 5000)
-    - "Acima de 10.000 kWh" -> (10001, None)
-    """
-    if not kwh_string:
-        return None, None
-    
-    # Remove pontos de milhares e converte para minúsculas
-    kwh_clean = kwh_string.replace('.', '').lower()
-    
-    # Padrão: "X a Y kwh"
-    match_range = re.search(r'(\d+)\s*a\s*(\d+)\s*kwh', kwh_clean)
-    if match_range:
-        min_val = int(match_range.group(1))
-        max_val = int(match_range.group(2))
-        return min_val, max_val
-    
-    # Padrão: "acima de X kwh"
-    match_above = re.search(r'acima\s+de\s+(\d+)\s*kwh', kwh_clean)
-    if match_above:
-        min_val = int(match_above.group(1)) + 1  # Acima = valor + 1
-        return min_val, None
-    
-    # Padrão: "X kwh" (apenas mínimo)
-    match_single = re.search(r'(\d+)\s*kwh', kwh_clean)
-    if match_single:
-        min_val = int(match_single.group(1))
-        return min_val, None
-    
-    print(f"Aviso: Não foi possível extrair consumo de '{kwh_string}'")
-    return None, None
+# Tipos de bônus criados automaticamente na importação
+TIPOS_BONUS_PADRAO = [
+    {'codigo': 'A', 'nome': 'Bônus A', 'descricao': 'Bônus tipo A', 'cor_hex': '#FF6B6B'},
+    {'codigo': 'B', 'nome': 'Bônus B', 'descricao': 'Bônus tipo B', 'cor_hex': '#4ECDC4'},
+    {'codigo': 'C', 'nome': 'Bônus C', 'descricao': 'Bônus tipo C', 'cor_hex': '#45B7D1'},
+    {'codigo': 'D', 'nome': 'Bônus D', 'descricao': 'Bônus tipo D', 'cor_hex': '#96CEB4'},
+    {'codigo': 'E', 'nome': 'Bônus E', 'descricao': 'Bônus tipo E', 'cor_hex': '#FFEAA7'}
+]
 
-def extrair_desconto_e_bonus(desconto_string):
-    """
-    Extrai percentual de desconto e código do bônus de strings como:
-    - "10% Bônus A" -> (10.0, 'A')
-    - "16% Bônus B" -> (16.0, 'B')
-    """
-    if not desconto_string:
-        return None, None
-    
-    # Padrão: "X% Bônus Y"
-    match = re.search(r'(\d+(?:\.\d+)?)%\s*bônus\s*([a-z])', desconto_string.lower())
-    if match:
-        percentual = float(match.group(1))
-        bonus_codigo = match.group(2).upper()
-        return percentual, bonus_codigo
-    
-    print(f"Aviso: Não foi possível extrair desconto de '{desconto_string}'")
-    return None, None
+# Entradas de regras.json lidas e gravadas por vez nos modos bulk e incremental
+LOTE_IMPORTACAO = 500
+
+# Importação roda em uma thread só e reserva o lock de escrita no BEGIN, para
+# esperar (busy_timeout) em vez de falhar no meio se a API estiver gravando
+OPCOES_BANCO_IMPORTACAO = {'modo_pool': 'thread', 'transacao_imediata': True}
 
 def criar_tipos_bonus_padrao(session):
     """
     Cria os tipos de bônus padrão se não existirem
     """
-    tipos_bonus = [
-        {'codigo': 'A', 'nome': 'Bônus A', 'descricao': 'Bônus tipo A', 'cor_hex': '#FF6B6B'},
-        {'codigo': 'B', 'nome': 'Bônus B', 'descricao': 'Bônus tipo B', 'cor_hex': '#4ECDC4'},
-        {'codigo': 'C', 'nome': 'Bônus C', 'descricao': 'Bônus tipo C', 'cor_hex': '#45B7D1'},
-        {'codigo': 'D', 'nome': 'Bônus D', 'descricao': 'Bônus tipo D', 'cor_hex': '#96CEB4'},
-        {'codigo': 'E', 'nome': 'Bônus E', 'descricao': 'Bônus tipo E', 'cor_hex': '#FFEAA7'}
-    ]
-    
-    for tipo_data in tipos_bonus:
+    for tipo_data in TIPOS_BONUS_PADRAO:
         tipo_existente = session.query(TipoBonus).filter(
             TipoBonus.codigo == tipo_data['codigo']
         ).first()
@@ -97,12 +57,9 @@ def carregar_regras_json(arquivo_json='regras.json'):
     print(f"Iniciando carregamento de dados de {arquivo_json}...")
     
     # Inicializar banco
-     db = init_database('database/sinergia.db', echo=False)
+    db = init_database('database/sinergia.db', echo=False, **OPCOES_BANCO_IMPORTACAO)
     
-    with open(arquivo_json, 'r', encoding='utf-8') as f:
-        dados_regras = json.load(f)
-    
-    with DatabaseSession() as session:
+    with open(arquivo_json, 'r', encoding='utf-8') as f, DatabaseSession() as session:
         # Criar tipos de bônus padrão
         criar_tipos_bonus_padrao(session)
         
@@ -111,8 +68,9 @@ def carregar_regras_json(arquivo_json='regras.json'):
         faixas_criadas = 0
         regras_criadas = 0
         erros = []
+        avisos = []  # textos de desconto não interpretados (database.parsing)
         
-        for distribuidora_data in dados_regras:
+        for distribuidora_data in iterar_array_json(f):
             try:
                 # Buscar ou criar estado
                 estado = session.query(Estado).filter(
@@ -201,7 +159,7 @@ def carregar_regras_json(arquivo_json='regras.json'):
                         # Processar desconto padrão
                         desconto_padrao = regra_data.get('desconto_padrao')
                         if desconto_padrao:
-                            percentual, bonus_codigo = extrair_desconto_e_bonus(desconto_padrao)
+                            percentual, bonus_codigo = extrair_desconto_e_bonus(desconto_padrao, avisos)
                             
                             if percentual and bonus_codigo:
                                 # Buscar tipo de bônus
@@ -224,7 +182,7 @@ def carregar_regras_json(arquivo_json='regras.json'):
                                         opcional_1 = opcional_2 = opcional_3 = opcional_4 = None
                                         
                                         for j, desconto_opcional in enumerate(descontos_opcionais[:4]):
-                                            perc_opcional, _ = extrair_desconto_e_bonus(desconto_opcional)
+                                            perc_opcional, _ = extrair_desconto_e_bonus(desconto_opcional, avisos)
                                             if perc_opcional:
                                                 if j == 0:
                                                     opcional_1 = Decimal(str(perc_opcional))
@@ -253,7 +211,7 @@ def carregar_regras_json(arquivo_json='regras.json'):
                         
                         # Processar descontos opcionais como regras separadas
                         for desconto_opcional in regra_data.get('descontos_opcionais', []):
-                            percentual_opt, bonus_codigo_opt = extrair_desconto_e_bonus(desconto_opcional)
+                            percentual_opt, bonus_codigo_opt = extrair_desconto_e_bonus(desconto_opcional, avisos)
                             
                             if percentual_opt and bonus_codigo_opt:
                                 tipo_bonus_opt = session.query(TipoBonus).filter(
@@ -303,14 +261,439 @@ def carregar_regras_json(arquivo_json='regras.json'):
         print(f"Faixas de consumo criadas: {faixas_criadas}")
         print(f"Regras de desconto criadas: {regras_criadas}")
         print(f"Erros encontrados: {len(erros)}")
+        print(f"Avisos de extração: {len(avisos)}")
         
         if erros:
             print("\nERROS DETALHADOS:")
             for erro in erros:
                 print(f"- {erro}")
         
+        if avisos:
+            print("\nAVISOS DE EXTRAÇÃO:")
+            for aviso in resumir_erros(avisos):
+                print(f"- {aviso}")
+        
         print("\nImportação concluída!")
 
+def _dados_nova_distribuidora(distribuidora_data, estado_id, avisos):
+    """Campos de uma distribuidora nova, extraídos da primeira regra (como no modo linha a linha)"""
+    primeira_regra = distribuidora_data['regras_desconto'][0] if distribuidora_data['regras_desconto'] else {}
+    consumo_min, _ = extrair_consumo_minimo_maximo(primeira_regra.get('kwh_minimo', '100 kWh'), avisos)
+    return {
+        'nome': distribuidora_data['nome'],
+        'estado_id': estado_id,
+        'consumo_minimo': consumo_min or 100,
+        'forma_pagamento': primeira_regra.get('forma_pagamento', 'Unificado'),
+        'prazo_injecao': int(primeira_regra.get('prazo_injecao', '90').replace(' dias', '')),
+        'troca_titularidade': primeira_regra.get('troca_titularidade', False),
+        'login_senha_necessario': False,
+        'aceita_placas': True,
+        'icms_minimo': Decimal('17.00'),
+        'observacoes': distribuidora_data.get('regras_gerais_observacoes', ''),
+        'ativo': True
+    }
+
+def _regras_da_faixa(regra_data, avisos):
+    """
+    Regras (código do bônus -> campos) de uma entrada de regras.json
+
+    Segue o modo linha a linha: o desconto padrão leva os opcionais em
+    desconto_opcional_1..4 e cada opcional vira também a regra do seu bônus;
+    quando um bônus se repete, vale a primeira ocorrência.
+    """
+    regras = {}
+    descontos_opcionais = regra_data.get('descontos_opcionais', [])
+
+    percentual, bonus_codigo = extrair_desconto_e_bonus(regra_data.get('desconto_padrao'), avisos)
+    if percentual and bonus_codigo:
+        opcionais = [None] * 4
+        for j, desconto_opcional in enumerate(descontos_opcionais[:4]):
+            perc_opcional, _ = extrair_desconto_e_bonus(desconto_opcional, avisos)
+            if perc_opcional:
+                opcionais[j] = Decimal(str(perc_opcional))
+        regras[bonus_codigo] = {
+            'desconto_percentual': Decimal(str(percentual)),
+            'desconto_opcional_1': opcionais[0],
+            'desconto_opcional_2': opcionais[1],
+            'desconto_opcional_3': opcionais[2],
+            'desconto_opcional_4': opcionais[3],
+            'analise_credito': regra_data.get('analise_credito', False),
+            'observacoes': f"Importado de regras.json - {regra_data.get('id', '')}",
+            'ativo': True
+        }
+
+    for desconto_opcional in descontos_opcionais:
+        percentual_opt, bonus_codigo_opt = extrair_desconto_e_bonus(desconto_opcional, avisos)
+        if percentual_opt and bonus_codigo_opt and bonus_codigo_opt not in regras:
+            regras[bonus_codigo_opt] = {
+                'desconto_percentual': Decimal(str(percentual_opt)),
+                'desconto_opcional_1': None,
+                'desconto_opcional_2': None,
+                'desconto_opcional_3': None,
+                'desconto_opcional_4': None,
+                'analise_credito': regra_data.get('analise_credito', False),
+                'observacoes': "Desconto opcional - Importado de regras.json",
+                'ativo': True
+            }
+    return regras
+
+def _em_lotes(iteravel, tamanho):
+    """Agrupa um iterável em listas de até `tamanho` elementos"""
+    lote = []
+    for item in iteravel:
+        lote.append(item)
+        if len(lote) >= tamanho:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+def _importar_entradas(session, dados_regras, erros, avisos):
+    """
+    Grava em lote as entradas de regras.json na sessão
+
+    Chaves existentes são lidas uma vez para dicionários, as chaves naturais
+    são resolvidas em memória e cada tabela é gravada com um único INSERT em
+    lote (upsert nas constraints uq_faixa_consumo e uq_regra_desconto).
+    Textos não interpretados pelo parser vão para `avisos`.
+
+    Returns:
+        dict com as estatísticas da gravação e, por distribuidora, os IDs das
+        faixas e os pares (faixa_consumo_id, tipo_bonus_id) presentes no arquivo
+    """
+    # 1. Tipos de bônus
+    session.execute(
+        insert(TipoBonus.__table__).on_conflict_do_nothing(index_elements=['codigo']),
+        TIPOS_BONUS_PADRAO
+    )
+    tipos_bonus = dict(session.execute(select(TipoBonus.codigo, TipoBonus.id)).all())
+
+    # 2. Estados
+    estados_arquivo = {
+        d['estado_sigla']: {'nome': d['estado_nome'], 'sigla': d['estado_sigla']}
+        for d in dados_regras
+    }
+    if estados_arquivo:
+        session.execute(
+            insert(Estado.__table__).on_conflict_do_nothing(index_elements=['sigla']),
+            list(estados_arquivo.values())
+        )
+    estados = dict(session.execute(select(Estado.sigla, Estado.id)).all())
+
+    # 3. Distribuidoras (sem constraint única: resolvidas por (estado_id, nome))
+    def mapa_distribuidoras():
+        return {
+            (estado_id, nome): dist_id
+            for dist_id, estado_id, nome in session.execute(
+                select(Distribuidora.id, Distribuidora.estado_id, Distribuidora.nome)
+            ).all()
+        }
+
+    distribuidoras = mapa_distribuidoras()
+    novas_distribuidoras = {}
+    for distribuidora_data in dados_regras:
+        chave = (estados[distribuidora_data['estado_sigla']], distribuidora_data['nome'])
+        if chave in distribuidoras or chave in novas_distribuidoras:
+            continue
+        try:
+            novas_distribuidoras[chave] = _dados_nova_distribuidora(distribuidora_data, chave[0], avisos)
+        except Exception as e:
+            erros.append(f"Erro ao processar distribuidora {distribuidora_data.get('nome', 'sem_nome')}: {str(e)}")
+    if novas_distribuidoras:
+        session.execute(insert(Distribuidora.__table__), list(novas_distribuidoras.values()))
+        distribuidoras = mapa_distribuidoras()
+
+    # 4. Faixas de consumo (NULL em consumo_max não dispara a constraint
+    # única no SQLite, então as existentes são casadas em memória pelo id)
+    ids_entradas = {
+        distribuidoras.get((estados[d['estado_sigla']], d['nome'])) for d in dados_regras
+    }
+    ids_entradas.discard(None)
+
+    def mapa_faixas():
+        return {
+            (dist_id, cmin, cmax): faixa_id
+            for faixa_id, dist_id, cmin, cmax in session.execute(
+                select(FaixaConsumo.id, FaixaConsumo.distribuidora_id,
+                       FaixaConsumo.consumo_min, FaixaConsumo.consumo_max)
+                .where(FaixaConsumo.distribuidora_id.in_(ids_entradas))
+            ).all()
+        }
+
+    faixas = mapa_faixas()
+    faixas_linhas = {}
+    regras_por_faixa = {}  # chave da faixa -> {codigo_bonus: campos}
+    distribuidoras_arquivo = {}  # "id" da entrada -> distribuidora_id
+    for distribuidora_data in dados_regras:
+        chave_dist = (estados[distribuidora_data['estado_sigla']], distribuidora_data['nome'])
+        distribuidora_id = distribuidoras.get(chave_dist)
+        if distribuidora_id is None:
+            continue
+        distribuidoras_arquivo[distribuidora_data['id']] = distribuidora_id
+        for i, regra_data in enumerate(distribuidora_data['regras_desconto']):
+            try:
+                consumo_min, consumo_max = extrair_consumo_minimo_maximo(regra_data['kwh_minimo'])
+                if consumo_min is None:
+                    erros.append(f"Não foi possível extrair consumo mínimo de '{regra_data['kwh_minimo']}'")
+                    continue
+                chave_faixa = (distribuidora_id, consumo_min, consumo_max)
+                if chave_faixa not in faixas_linhas:
+                    faixas_linhas[chave_faixa] = {
+                        'id': faixas.get(chave_faixa),
+                        'distribuidora_id': distribuidora_id,
+                        'consumo_min': consumo_min,
+                        'consumo_max': consumo_max,
+                        'nome_faixa': regra_data['kwh_minimo'],
+                        'ordem': i + 1,
+                        'ativo': True
+                    }
+                regras_faixa = regras_por_faixa.setdefault(chave_faixa, {})
+                for codigo, campos in _regras_da_faixa(regra_data, avisos).items():
+                    regras_faixa.setdefault(codigo, campos)
+            except Exception as e:
+                erros.append(f"Erro ao processar regra {regra_data.get('id', 'sem_id')} da {distribuidora_data['nome']}: {str(e)}")
+
+    faixas_criadas = sum(1 for linha in faixas_linhas.values() if linha['id'] is None)
+    if faixas_linhas:
+        stmt = insert(FaixaConsumo.__table__)
+        session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=['id'],
+                set_={'nome_faixa': stmt.excluded.nome_faixa, 'ordem': stmt.excluded.ordem, 'ativo': True}
+            ),
+            list(faixas_linhas.values())
+        )
+        faixas = mapa_faixas()
+
+    # 5. Regras de desconto
+    faixas_ids = {}
+    regras_chaves = {}
+    regras_linhas = []
+    for chave_faixa, regras_faixa in regras_por_faixa.items():
+        distribuidora_id, faixa_id = chave_faixa[0], faixas[chave_faixa]
+        faixas_ids.setdefault(distribuidora_id, set()).add(faixa_id)
+        for codigo, campos in regras_faixa.items():
+            if codigo not in tipos_bonus:
+                continue
+            regras_chaves.setdefault(distribuidora_id, set()).add((faixa_id, tipos_bonus[codigo]))
+            regras_linhas.append(dict(
+                campos, faixa_consumo_id=faixa_id, tipo_bonus_id=tipos_bonus[codigo]
+            ))
+    if regras_linhas:
+        stmt = insert(RegraDesconto.__table__)
+        colunas_atualizadas = [
+            'desconto_percentual', 'desconto_opcional_1', 'desconto_opcional_2',
+            'desconto_opcional_3', 'desconto_opcional_4', 'analise_credito',
+            'observacoes', 'ativo'
+        ]
+        session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=['faixa_consumo_id', 'tipo_bonus_id'],
+                set_={coluna: stmt.excluded[coluna] for coluna in colunas_atualizadas}
+            ),
+            regras_linhas
+        )
+
+    return {
+        'distribuidoras_criadas': len(novas_distribuidoras),
+        'faixas_criadas': faixas_criadas,
+        'faixas_no_arquivo': len(faixas_linhas),
+        'regras_gravadas': len(regras_linhas),
+        'distribuidoras_arquivo': distribuidoras_arquivo,
+        'faixas_ids': faixas_ids,
+        'regras_chaves': regras_chaves
+    }
+
+def _imprimir_relatorio(titulo, linhas, erros, avisos, inicio):
+    """Relatório final no mesmo formato do carregamento linha a linha"""
+    print("\n" + "="*60)
+    print(titulo)
+    print("="*60)
+    for linha in linhas:
+        print(linha)
+    print(f"Erros encontrados: {len(erros)}")
+    print(f"Avisos de extração: {len(avisos)}")
+    print(f"Tempo total: {time.perf_counter() - inicio:.3f}s")
+
+    if erros:
+        print("\nERROS DETALHADOS:")
+        for erro in erros:
+            print(f"- {erro}")
+
+    if avisos:
+        print("\nAVISOS DE EXTRAÇÃO:")
+        for aviso in resumir_erros(avisos):
+            print(f"- {aviso}")
+
+    print("\nImportação concluída!")
+
+def carregar_regras_json_bulk(arquivo_json='regras.json'):
+    """
+    Carrega regras.json em modo bulk, tudo em uma transação
+
+    Diferente do modo linha a linha, faixas e regras já existentes são
+    atualizadas com os valores do arquivo em vez de ignoradas.
+    """
+    print(f"Iniciando carregamento bulk de dados de {arquivo_json}...")
+    inicio = time.perf_counter()
+
+    init_database('database/sinergia.db', echo=False, **OPCOES_BANCO_IMPORTACAO)
+
+    erros = []
+    avisos = []
+    totais = dict.fromkeys(
+        ['entradas', 'distribuidoras_criadas', 'faixas_criadas', 'faixas_no_arquivo', 'regras_gravadas'], 0
+    )
+    with open(arquivo_json, 'r', encoding='utf-8') as f, DatabaseSession() as session:
+        for lote in _em_lotes(iterar_array_json(f), LOTE_IMPORTACAO):
+            resultado = _importar_entradas(session, lote, erros, avisos)
+            totais['entradas'] += len(lote)
+            for campo in ('distribuidoras_criadas', 'faixas_criadas', 'faixas_no_arquivo', 'regras_gravadas'):
+                totais[campo] += resultado[campo]
+
+    _imprimir_relatorio("RELATÓRIO DE IMPORTAÇÃO (BULK)", [
+        f"Distribuidoras no arquivo: {totais['entradas']}",
+        f"Distribuidoras criadas: {totais['distribuidoras_criadas']}",
+        f"Faixas de consumo criadas: {totais['faixas_criadas']} (de {totais['faixas_no_arquivo']} no arquivo)",
+        f"Regras de desconto gravadas: {totais['regras_gravadas']}",
+    ], erros, avisos, inicio)
+
+def hash_entrada(distribuidora_data):
+    """Hash SHA-256 do conteúdo de uma entrada de regras.json (independe da ordem das chaves)"""
+    conteudo = json.dumps(distribuidora_data, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+def _desativar_ausentes(session, distribuidora_id, faixas_ids, regras_chaves):
+    """Desativa faixas e regras da distribuidora que não estão mais no arquivo; retorna o total de regras"""
+    faixas_distribuidora = select(FaixaConsumo.id).where(FaixaConsumo.distribuidora_id == distribuidora_id)
+    regras = session.execute(
+        select(RegraDesconto.id, RegraDesconto.faixa_consumo_id, RegraDesconto.tipo_bonus_id).where(
+            RegraDesconto.faixa_consumo_id.in_(faixas_distribuidora),
+            RegraDesconto.ativo == True
+        )
+    ).all()
+    regras_removidas = [
+        regra_id for regra_id, faixa_id, tipo_id in regras
+        if (faixa_id, tipo_id) not in regras_chaves
+    ]
+    if regras_removidas:
+        session.execute(
+            update(RegraDesconto).where(RegraDesconto.id.in_(regras_removidas)).values(ativo=False)
+        )
+    session.execute(
+        update(FaixaConsumo).where(
+            FaixaConsumo.distribuidora_id == distribuidora_id,
+            FaixaConsumo.id.notin_(faixas_ids),
+            FaixaConsumo.ativo == True
+        ).values(ativo=False)
+    )
+    return len(regras_removidas)
+
+def sincronizar_regras_json(arquivo_json='regras.json', forcar=False):
+    """
+    Sincroniza incrementalmente o banco com regras.json
+
+    Cada entrada do arquivo (identificada pelo campo "id", ex.: cemig-mg) tem
+    seu hash comparado ao gravado em sincronizacao_regras na última execução;
+    só as entradas novas ou alteradas são gravadas. Regras e faixas dessas
+    distribuidoras que sumiram do arquivo são desativadas (ativo = 0).
+
+    Uma entrada removida do arquivo desativa a própria distribuidora, além de
+    todas as suas faixas e regras, para que o snapshot deixe de cotá-la (sem
+    regras ela cairia no desconto padrão por perfil). Se a entrada voltar ao
+    arquivo, a distribuidora é reativada junto com as regras gravadas. A
+    primeira execução, sem hashes gravados, sincroniza todas as entradas.
+
+    Args:
+        arquivo_json: caminho do regras.json
+        forcar: ignora os hashes gravados e sincroniza todas as entradas
+    """
+    print(f"Iniciando sincronização incremental de {arquivo_json}...")
+    inicio = time.perf_counter()
+
+    init_database('database/sinergia.db', echo=False, **OPCOES_BANCO_IMPORTACAO)
+
+    chaves_arquivo = set()
+    alteradas = []
+    erros = []
+    avisos = []
+    regras_desativadas = 0
+    totais = dict.fromkeys(['entradas', 'distribuidoras_criadas', 'faixas_criadas', 'regras_gravadas'], 0)
+
+    with open(arquivo_json, 'r', encoding='utf-8') as f, DatabaseSession() as session:
+        sincronizadas = {
+            registro.chave: registro
+            for registro in session.query(SincronizacaoRegras).all()
+        }
+
+        for lote in _em_lotes(iterar_array_json(f), LOTE_IMPORTACAO):
+            totais['entradas'] += len(lote)
+            hashes = {entrada['id']: hash_entrada(entrada) for entrada in lote}
+            chaves_arquivo.update(hashes)
+            alteradas_lote = [
+                entrada for entrada in lote
+                if forcar or entrada['id'] not in sincronizadas
+                or sincronizadas[entrada['id']].hash_conteudo != hashes[entrada['id']]
+            ]
+            if not alteradas_lote:
+                continue
+            alteradas.extend(entrada['id'] for entrada in alteradas_lote)
+
+            resultado = _importar_entradas(session, alteradas_lote, erros, avisos)
+            for campo in ('distribuidoras_criadas', 'faixas_criadas', 'regras_gravadas'):
+                totais[campo] += resultado[campo]
+
+            # Entradas presentes no arquivo mantêm (ou voltam a ter) a distribuidora ativa
+            session.execute(
+                update(Distribuidora).where(
+                    Distribuidora.id.in_(resultado['distribuidoras_arquivo'].values()),
+                    Distribuidora.ativo == False
+                ).values(ativo=True)
+            )
+
+            for entrada in alteradas_lote:
+                distribuidora_id = resultado['distribuidoras_arquivo'].get(entrada['id'])
+                if distribuidora_id is None:
+                    continue
+                regras_desativadas += _desativar_ausentes(
+                    session, distribuidora_id,
+                    resultado['faixas_ids'].get(distribuidora_id, set()),
+                    resultado['regras_chaves'].get(distribuidora_id, set())
+                )
+                registro = sincronizadas.get(entrada['id'])
+                if registro is None:
+                    registro = SincronizacaoRegras(chave=entrada['id'])
+                    session.add(registro)
+                    sincronizadas[entrada['id']] = registro
+                registro.distribuidora_id = distribuidora_id
+                registro.hash_conteudo = hashes[entrada['id']]
+                registro.sincronizado_em = datetime.now()
+
+        # Entradas removidas do arquivo: a distribuidora e todas as suas regras saem
+        removidas = [registro for chave, registro in sincronizadas.items() if chave not in chaves_arquivo]
+        # Distribuidora que ainda é destino de outra entrada do arquivo continua ativa
+        presentes = {
+            registro.distribuidora_id for chave, registro in sincronizadas.items() if chave in chaves_arquivo
+        }
+        for registro in removidas:
+            if registro.distribuidora_id not in presentes:
+                regras_desativadas += _desativar_ausentes(session, registro.distribuidora_id, set(), set())
+                session.execute(
+                    update(Distribuidora).where(Distribuidora.id == registro.distribuidora_id).values(ativo=False)
+                )
+            session.delete(registro)
+
+    _imprimir_relatorio("RELATÓRIO DE SINCRONIZAÇÃO", [
+        f"Distribuidoras no arquivo: {totais['entradas']}",
+        f"Distribuidoras alteradas: {len(alteradas)}"
+        + (f" ({', '.join(alteradas)})" if alteradas and len(alteradas) <= 10 else ""),
+        f"Distribuidoras removidas do arquivo: {len(removidas)}",
+        f"Distribuidoras criadas: {totais['distribuidoras_criadas']}",
+        f"Faixas de consumo criadas: {totais['faixas_criadas']}",
+        f"Regras de desconto gravadas: {totais['regras_gravadas']}",
+        f"Regras de desconto desativadas: {regras_desativadas}",
+    ], erros, avisos, inicio)
+
 def verificar_dados_carregados():
     """
     Verifica os dados carregados no banco
@@ -361,7 +744,15 @@ if __name__ == "__main__":
     print("="*60)
     
     try:
-        carregar_regras_json()
+        # Padrão: sincronização incremental (--forcar reprocessa todas as entradas)
+        # --completo usa o carregamento bulk sem hashes
+        # --legado usa o carregamento linha a linha original
+        if '--legado' in sys.argv:
+            carregar_regras_json()
+        elif '--completo' in sys.argv:
+            carregar_regras_json_bulk()
+        else:
+            sincronizar_regras_json(forcar='--forcar' in sys.argv)
         verificar_dados_carregados()
     except Exception as e:
         print(f"Erro geral na importação: {str(e)}")
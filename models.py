@@ -144,6 +144,22 @@ class Simulacao(Base):
     def __repr__(self):
         return f"<Simulacao(id={self.id}, distribuidora_id={self.distribuidora_id}, consumo_kwh={self.consumo_kwh}, desconto_aplicado={self.desconto_aplicado})>"
 
+class SincronizacaoRegras(Base):
+    """Model para o controle da sincronização incremental de regras.json"""
+    __tablename__ = 'sincronizacao_regras'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    chave = Column(String(100), nullable=False, unique=True)  # campo "id" da entrada, ex: "cemig-mg"
+    distribuidora_id = Column(Integer, ForeignKey('distribuidoras.id'), nullable=False)
+    hash_conteudo = Column(String(64), nullable=False)  # SHA-256 da entrada
+    sincronizado_em = Column(DateTime, default=func.current_timestamp())
+    
+    # Relacionamentos
+    distribuidora = relationship("Distribuidora")
+    
+    def __repr__(self):
+        return f"<SincronizacaoRegras(chave='{self.chave}', distribuidora_id={self.distribuidora_id}, hash_conteudo='{self.hash_conteudo[:12]}')>"
+
 # Índices adicionais (SQLAlchemy criará automaticamente os índices de FK)
 # Os índices definidos no schema SQL serão criados pelo próprio banco
 
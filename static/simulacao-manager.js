@@ -11,10 +11,34 @@ class SimulacaoManager {
         this.tiposBonus = null;
         this.faixasConsumo = null;
         this.regrasDesconto = null;
+        // Bundle pré-processado (simulacao.<hash>.json ou fragmentos); null = arquivos separados
+        this.bundle = null;
+        this.regrasPorFaixa = null;
+        // Fragmentos: manifesto atual e carregamentos por ID da distribuidora
+        this.manifesto = null;
+        this.fragmentos = new Map();
         this.initialized = false;
     }
 
     async inicializar() {
+        try {
+            await this.carregarFragmentos();
+            this.initialized = true;
+            console.log('✅ Simulador inicializado com sucesso');
+            return;
+        } catch (error) {
+            console.warn('Fragmentos do simulador indisponíveis, carregando o bundle:', error);
+        }
+
+        try {
+            await this.carregarBundle();
+            this.initialized = true;
+            console.log('✅ Simulador inicializado com sucesso');
+            return;
+        } catch (error) {
+            console.warn('Bundle do simulador indisponível, carregando arquivos separados:', error);
+        }
+
         try {
             // Carregar todos os dados necessários
             const [config, distribuidoras, estados, tiposBonus, faixasConsumo, regrasDesconto] = await Promise.all([
@@ -40,6 +64,141 @@ class SimulacaoManager {
         }
     }
 
+    /**
+     * Carrega o bundle único gerado por database/static_export.py
+     * O ponteiro é pequeno e sempre revalidado; o bundle tem o hash no nome
+     * e pode ficar em cache indefinidamente
+     */
+    async carregarBundle() {
+        const ponteiro = await fetch('static/data/simulacao-bundle.json', { cache: 'no-cache' })
+            .then(r => {
+                if (!r.ok) throw new Error(`HTTP ${r.status}`);
+                return r.json();
+            });
+        if (ponteiro.versao !== 1) {
+            throw new Error(`Versão de bundle não suportada: ${ponteiro.versao}`);
+        }
+
+        const bundle = await fetch(`static/data/${ponteiro.arquivo}`).then(r => {
+            if (!r.ok) throw new Error(`HTTP ${r.status}`);
+            return r.json();
+        });
+
+        this.usarBundle(bundle);
+    }
+
+    /**
+     * Busca um arquivo de static/data/distribuidoras/
+     * @param {string} arquivo - Nome do arquivo
+     * @param {Object} [opcoes] - Opções do fetch
+     * @returns {Promise<Object>} JSON do arquivo
+     */
+    buscarFragmento(arquivo, opcoes) {
+        return fetch(`static/data/distribuidoras/${arquivo}`, opcoes).then(r => {
+            if (!r.ok) throw new Error(`HTTP ${r.status}`);
+            return r.json();
+        });
+    }
+
+    /**
+     * Carrega o manifesto e o comum de static/data/distribuidoras/
+     * O comum traz o cadastro das distribuidoras (sem faixas); o fragmento de
+     * cada uma só é baixado quando ela é escolhida (carregarDistribuidora).
+     * Cada fragmento tem o hash no nome: após uma exportação o navegador só
+     * baixa de novo os fragmentos das distribuidoras que mudaram
+     */
+    async carregarFragmentos() {
+        const manifesto = await this.buscarFragmento('manifest.json', { cache: 'no-cache' });
+        if (manifesto.versao !== 2) {
+            throw new Error(`Versão de fragmentos não suportada: ${manifesto.versao}`);
+        }
+        const comum = await this.buscarFragmento(manifesto.comum.arquivo);
+
+        // Mesma estrutura do bundle único, com as faixas ainda por carregar
+        this.usarBundle({
+            config: comum.config,
+            estados: comum.estados,
+            tipos_bonus: comum.tipos_bonus,
+            distribuidoras: comum.distribuidoras
+        });
+        this.manifesto = manifesto;
+        this.fragmentos = new Map();
+    }
+
+    /**
+     * Garante que faixas, segmentos e cotação da distribuidora estão em memória
+     * Com fragmentos baixa o arquivo da distribuidora uma única vez; com o
+     * bundle único ou os arquivos separados não há nada a carregar
+     * @param {number} distribuidoraId - ID da distribuidora
+     * @returns {Promise<void>}
+     */
+    carregarDistribuidora(distribuidoraId) {
+        const item = this.manifesto && this.manifesto.distribuidoras[distribuidoraId];
+        if (!item) return Promise.resolve();
+
+        let carregamento = this.fragmentos.get(distribuidoraId);
+        if (!carregamento) {
+            carregamento = this.buscarFragmento(item.arquivo).then(fragmento => {
+                const distribuidora = this.buscarDistribuidora(distribuidoraId);
+                if (!distribuidora) return;
+                Object.assign(distribuidora, fragmento);
+                for (const faixa of fragmento.faixas) {
+                    this.regrasPorFaixa.set(faixa[0], faixa[5]);
+                }
+            }).catch(error => {
+                // Permite tentar de novo na próxima chamada
+                this.fragmentos.delete(distribuidoraId);
+                throw error;
+            });
+            this.fragmentos.set(distribuidoraId, carregamento);
+        }
+        return carregamento;
+    }
+
+    /**
+     * Passa a responder a partir de um bundle (único ou montado dos fragmentos)
+     * @param {Object} bundle - {config, estados, tipos_bonus, distribuidoras}
+     */
+    usarBundle(bundle) {
+        // Regras de cada faixa ({tipo_bonus_id: [desconto, observacoes]}) por ID da faixa
+        this.regrasPorFaixa = new Map();
+        for (const distribuidora of bundle.distribuidoras) {
+            for (const faixa of distribuidora.faixas || []) {
+                this.regrasPorFaixa.set(faixa[0], faixa[5]);
+            }
+        }
+
+        this.bundle = bundle;
+        this.manifesto = null;
+        this.config = bundle.config;
+        this.distribuidoras = bundle.distribuidoras; // ordenadas por id
+        this.estados = bundle.estados;
+        this.tiposBonus = bundle.tipos_bonus;
+    }
+
+    /**
+     * Busca uma distribuidora pelo ID (busca binária no bundle)
+     * @param {number} distribuidoraId - ID da distribuidora
+     * @returns {Object|undefined} Distribuidora encontrada
+     */
+    buscarDistribuidora(distribuidoraId) {
+        if (!this.distribuidoras) return undefined;
+        if (!this.bundle) {
+            return this.distribuidoras.find(d => d.id === distribuidoraId);
+        }
+
+        let inicio = 0;
+        let fim = this.distribuidoras.length - 1;
+        while (inicio <= fim) {
+            const meio = (inicio + fim) >> 1;
+            const id = this.distribuidoras[meio].id;
+            if (id === distribuidoraId) return this.distribuidoras[meio];
+            if (id < distribuidoraId) inicio = meio + 1;
+            else fim = meio - 1;
+        }
+        return undefined;
+    }
+
     /**
      * Verifica elegibilidade básica
      * @param {number} distribuidoraId - ID da distribuidora
@@ -48,7 +207,7 @@ class SimulacaoManager {
      */
     verificarElegibilidade(distribuidoraId, consumoKwh) {
         // Buscar distribuidora
-        const distribuidora = this.distribuidoras.find(d => d.id === distribuidoraId);
+        const distribuidora = this.buscarDistribuidora(distribuidoraId);
         
         if (!distribuidora) {
             return {
@@ -104,6 +263,9 @@ class SimulacaoManager {
                 };
             }
 
+            // Faixas da distribuidora (fragmento baixado na primeira simulação)
+            await this.carregarDistribuidora(distribuidoraId);
+
             // Verificar elegibilidade básica
             const elegibilidade = this.verificarElegibilidade(distribuidoraId, consumoKwh);
             if (!elegibilidade.elegivel) {
@@ -173,6 +335,9 @@ class SimulacaoManager {
      * @returns {Object|null} Faixa de consumo encontrada
      */
     encontrarFaixaConsumo(distribuidoraId, consumoKwh) {
+        if (this.bundle) {
+            return this.encontrarFaixaNoBundle(distribuidoraId, consumoKwh);
+        }
         if (!this.faixasConsumo) return null;
         
         return this.faixasConsumo.find(faixa => 
@@ -182,6 +347,51 @@ class SimulacaoManager {
         );
     }
 
+    /**
+     * Busca binária nos segmentos pré-calculados da distribuidora
+     * Cada segmento é [inicio, inicioAberto, fim, fimAberto, indiceFaixa]
+     * (fim null = sem limite) e reproduz o resultado da busca linear
+     * @param {number} distribuidoraId - ID da distribuidora
+     * @param {number} consumoKwh - Consumo em kWh
+     * @returns {Object|null} Faixa de consumo encontrada
+     */
+    encontrarFaixaNoBundle(distribuidoraId, consumoKwh) {
+        const distribuidora = this.buscarDistribuidora(distribuidoraId);
+        if (!distribuidora || !distribuidora.segmentos) return null;
+
+        const segmentos = distribuidora.segmentos;
+        let inicio = 0;
+        let fim = segmentos.length - 1;
+        let achado = -1;
+        while (inicio <= fim) {
+            const meio = (inicio + fim) >> 1;
+            const [segInicio, inicioAberto] = segmentos[meio];
+            if (consumoKwh > segInicio || (consumoKwh === segInicio && !inicioAberto)) {
+                achado = meio;
+                inicio = meio + 1;
+            } else {
+                fim = meio - 1;
+            }
+        }
+        if (achado < 0) return null;
+
+        const [, , segFim, fimAberto, indiceFaixa] = segmentos[achado];
+        if (segFim !== null && (consumoKwh > segFim || (consumoKwh === segFim && fimAberto))) {
+            return null;
+        }
+
+        const [id, consumoMin, consumoMax, nomeFaixa, ordem] = distribuidora.faixas[indiceFaixa];
+        return {
+            id: id,
+            distribuidora_id: distribuidora.id,
+            consumo_min: consumoMin,
+            consumo_max: consumoMax,
+            nome_faixa: nomeFaixa,
+            ordem: ordem,
+            ativo: true
+        };
+    }
+
     /**
      * Encontra a regra de desconto para uma faixa e tipo de bonus
      * @param {number} faixaConsumoId - ID da faixa de consumo
@@ -189,6 +399,17 @@ class SimulacaoManager {
      * @returns {Object|null} Regra de desconto encontrada
      */
     encontrarRegraDesconto(faixaConsumoId, tipoBonusId) {
+        if (this.bundle) {
+            const regras = this.regrasPorFaixa.get(faixaConsumoId);
+            const regra = regras && regras[tipoBonusId];
+            if (!regra) return null;
+            return {
+                faixa_consumo_id: faixaConsumoId,
+                tipo_bonus_id: tipoBonusId,
+                desconto_percentual: regra[0],
+                observacoes: regra[1]
+            };
+        }
         if (!this.regrasDesconto) return null;
         
         return this.regrasDesconto.find(regra => 
@@ -197,6 +418,44 @@ class SimulacaoManager {
         );
     }
 
+    /**
+     * Cotação pela tabela pré-calculada do bundle (database/tabela_cotacao.py):
+     * um único bisect nos pontos de quebra da distribuidora e tipo de bônus.
+     * Mesmo resultado de GET /api/cotacao; o consumo é truncado para kWh inteiro.
+     * Com fragmentos, a distribuidora precisa ter passado por carregarDistribuidora
+     * @param {number} distribuidoraId - ID da distribuidora
+     * @param {number} consumoKwh - Consumo em kWh (não negativo)
+     * @param {number} [tipoBonusId] - ID do tipo de bonus (padrão da configuração)
+     * @returns {Object|null} {desconto_percentual, elegivel, motivo} ou null sem tabela
+     */
+    cotar(distribuidoraId, consumoKwh, tipoBonusId) {
+        if (!this.bundle) return null;
+        const distribuidora = this.buscarDistribuidora(distribuidoraId);
+        if (!distribuidora || !distribuidora.cotacao) return null;
+
+        const tipoId = tipoBonusId ?? this.config.configuracao.tipo_bonus_padrao_id;
+        const degraus = distribuidora.cotacao.degraus[tipoId];
+        if (!degraus) return null;
+
+        const [pontos, valores] = degraus;
+        const kwh = Math.trunc(consumoKwh);
+        // Último ponto <= kwh; pontos[0] é sempre 0
+        let inicio = 0;
+        let fim = pontos.length - 1;
+        while (inicio < fim) {
+            const meio = (inicio + fim + 1) >> 1;
+            if (pontos[meio] <= kwh) inicio = meio;
+            else fim = meio - 1;
+        }
+
+        const [descontoPercentual, elegivel, indiceMotivo] = valores[inicio];
+        return {
+            desconto_percentual: descontoPercentual,
+            elegivel: elegivel,
+            motivo: indiceMotivo === null ? null : distribuidora.cotacao.motivos[indiceMotivo]
+        };
+    }
+
     /**
      * Obtém lista de distribuidoras por estado (apenas ativas)
      * @param {number} estadoId - ID do estado
@@ -233,9 +492,7 @@ class SimulacaoManager {
      * @returns {Object|null} Informações da distribuidora
      */
     obterInfoDistribuidora(distribuidoraId) {
-        if (!this.distribuidoras) return null;
-        
-        const distribuidora = this.distribuidoras.find(d => d.id === distribuidoraId);
+        const distribuidora = this.buscarDistribuidora(distribuidoraId);
         if (!distribuidora) return null;
 
         return {